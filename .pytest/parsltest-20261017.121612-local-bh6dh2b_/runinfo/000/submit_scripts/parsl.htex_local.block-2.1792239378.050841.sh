@@ -0,0 +1,35 @@
+
+export JOBNAME=$parsl.htex_local.block-2.1792239378.050841
+set -e
+export CORES=$(getconf _NPROCESSORS_ONLN)
+[[ "1" == "1" ]] && echo "Found cores : $CORES"
+WORKERCOUNT=1
+FAILONANY=0
+PIDS=""
+
+CMD() {
+process_worker_pool.py  --max_workers_per_node=1 -a 127.0.0.1 -p 0 -c 1.0 -m None --poll 100 --task_port=54445 --result_port=54452 --cert_dir /root/package/.pytest/parsltest-current/runinfo/000/htex_local/certificates --logdir=/root/package/.pytest/parsltest-current/runinfo/000/htex_local --block_id=2 --hb_period=1  --hb_threshold=2 --drain_period=None --cpu-affinity none  --mpi-launcher=mpiexec --mpi_slots_per_node=None --function_cache_size=128 --result_cache_dir=None --result_cache_size=1073741824 --shm_threshold=1048576 --available-accelerators 
+}
+for COUNT in $(seq 1 1 $WORKERCOUNT); do
+    [[ "1" == "1" ]] && echo "Launching worker: $COUNT"
+    CMD $COUNT &
+    PIDS="$PIDS $!"
+done
+
+ALLFAILED=1
+ANYFAILED=0
+for PID in $PIDS ; do
+    wait $PID
+    if [ "$?" != "0" ]; then
+        ANYFAILED=1
+    else
+        ALLFAILED=0
+    fi
+done
+
+[[ "1" == "1" ]] && echo "All workers done"
+if [ "$FAILONANY" == "1" ]; then
+    exit $ANYFAILED
+else
+    exit $ALLFAILED
+fi
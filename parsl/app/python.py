@@ -81,3 +81,54 @@ class PythonApp(AppBase):
                              join=self.join)
 
         return app_fut
+
+    def map(self, *iterables, **kwargs):
+        """Invoke this app once for each set of positional arguments drawn
+        from iterables, in the style of the builtin map, submitting all of
+        the invocations to the DataFlowKernel as a single batch.
+
+        Each keyword argument is passed to every invocation.
+
+        Args:
+             - Iterables of positional arguments
+        Kwargs:
+             - Arbitrary
+
+        Returns:
+                   List of App_futs, one per invocation
+        """
+        invocation_kwargs = {}
+        invocation_kwargs.update(self.kwargs)
+        invocation_kwargs.update(kwargs)
+
+        if self.data_flow_kernel is None:
+            dfk = DataFlowKernelLoader.dfk()
+        else:
+            dfk = self.data_flow_kernel
+
+        walltime = invocation_kwargs.get('walltime')
+        if walltime is not None:
+            func = timeout(self.func, walltime)
+        else:
+            func = self.func
+
+        app_args_list = [tuple(args) for args in zip(*iterables)]
+
+        # The DFK rewrites kwargs (and the inputs and outputs lists) of each
+        # task in place, so each invocation needs its own copy.
+        app_kwargs_list = []
+        for _ in app_args_list:
+            task_kwargs = invocation_kwargs.copy()
+            for kw in ['inputs', 'outputs']:
+                if kw in task_kwargs:
+                    task_kwargs[kw] = list(task_kwargs[kw])
+            app_kwargs_list.append(task_kwargs)
+
+        app_futs = dfk.submit_many(func, app_args_list=app_args_list,
+                                   executors=self.executors,
+                                   cache=self.cache,
+                                   ignore_for_cache=self.ignore_for_cache,
+                                   app_kwargs_list=app_kwargs_list,
+                                   join=self.join)
+
+        return app_futs
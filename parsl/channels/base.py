@@ -1,6 +1,6 @@
 from abc import ABCMeta, abstractmethod, abstractproperty
 
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 
 class Channel(metaclass=ABCMeta):
@@ -41,6 +41,29 @@ class Channel(metaclass=ABCMeta):
         '''
         pass
 
+    def execute_many(self, cmds: Sequence[str], walltime: Optional[int] = None,
+                     envs: Dict[str, str] = {}) -> List[Tuple[int, str, str]]:
+        ''' Executes several commands, each with a defined walltime.
+
+        This runs the commands one after another, but channels for which
+        each command is a round trip to a remote system may run them
+        concurrently.
+
+        Args:
+            - cmds (list of string): Command strings to execute over the channel
+            - walltime (int) : Timeout in seconds for each command. If None, the
+              default timeout of execute_wait is used.
+
+        KWargs:
+            - envs (Dict[str, str]) : Environment variables to push to the remote side
+
+        Returns:
+            - list of (exit_code, stdout, stderr) (int, string, string), one for each command
+        '''
+        if walltime is None:
+            return [self.execute_wait(cmd, envs=envs) for cmd in cmds]
+        return [self.execute_wait(cmd, walltime, envs) for cmd in cmds]
+
     @abstractproperty
     def script_dir(self) -> str:
         ''' This is a property. Returns the directory assigned for storing all internal scripts such as
@@ -74,6 +97,18 @@ class Channel(metaclass=ABCMeta):
         '''
         pass
 
+    def push_files(self, sources: Sequence[str], dest_dir: str) -> List[str]:
+        ''' Move several files to the destination directory
+
+        Args:
+            sources (list of string) : Full filepaths of the files to be moved
+            dest_dir (string) : Absolute path of the directory to move to
+
+        Returns:
+            destination_paths (list of string)
+        '''
+        return [self.push_file(source, dest_dir) for source in sources]
+
     @abstractmethod
     def pull_file(self, remote_source: str, local_dir: str) -> str:
         ''' Transport file on the remote side to a local directory
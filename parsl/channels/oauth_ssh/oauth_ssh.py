@@ -49,6 +49,9 @@ class OAuthSSHChannel(SSHChannel):
         if envs is not None:
             self.envs = envs
 
+        self.max_connections = 1
+        self._init_pool()
+
         try:
             access_token = find_access_token(hostname)
         except Exception:
@@ -106,5 +109,8 @@ class OAuthSSHChannel(SSHChannel):
 
         return exit_status, stdout, stderr
 
+    def push_files(self, local_sources, remote_dir):
+        return [self.push_file(local_source, remote_dir) for local_source in local_sources]
+
     def close(self):
         return self.transport.close()
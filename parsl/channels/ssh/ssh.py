@@ -1,6 +1,10 @@
 import errno
 import logging
 import os
+import shlex
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 import paramiko
 from parsl.channels.base import Channel
@@ -9,6 +13,10 @@ from parsl.utils import RepresentationMixin
 
 logger = logging.getLogger(__name__)
 
+# The number of commands which execute_many runs at once over each
+# connection. This stays under the default MaxSessions (10) of OpenSSH.
+SESSIONS_PER_CONNECTION = 8
+
 
 class NoAuthSSHClient(paramiko.SSHClient):
     def _auth(self, username, *args):
@@ -24,10 +32,16 @@ class SSHChannel(Channel, RepresentationMixin):
 
     >>> ssh <username>@<hostname>
 
+    Commands are run over a pool of up to max_connections authenticated
+    connections, which are opened as they are needed, so that commands
+    issued from several threads at once do not queue up behind each other.
+    execute_many runs a batch of commands concurrently over the pool.
+
     '''
 
     def __init__(self, hostname, username=None, password=None, script_dir=None, envs=None,
-                 gssapi_auth=False, skip_auth=False, port=22, key_filename=None, host_keys_filename=None):
+                 gssapi_auth=False, skip_auth=False, port=22, key_filename=None, host_keys_filename=None,
+                 max_connections=1):
         ''' Initialize a persistent connection to the remote system.
         We should know at this point whether ssh connectivity is possible
 
@@ -42,6 +56,7 @@ class SSHChannel(Channel, RepresentationMixin):
               generated scripts could be sent to.
             - envs (dict) : A dictionary of environment variables to be set when executing commands
             - key_filename (string or list): the filename, or list of filenames, of optional private key(s)
+            - max_connections (int) : The maximum number of connections to open to the remote system. Default is 1.
 
         Raises:
         '''
@@ -55,51 +70,74 @@ class SSHChannel(Channel, RepresentationMixin):
         self.gssapi_auth = gssapi_auth
         self.key_filename = key_filename
         self.host_keys_filename = host_keys_filename
+        self.max_connections = max_connections
 
-        if self.skip_auth:
-            self.ssh_client = NoAuthSSHClient()
-        else:
-            self.ssh_client = paramiko.SSHClient()
-        self.ssh_client.load_system_host_keys(filename=host_keys_filename)
-        self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.ssh_client = self._new_ssh_client()
         self.sftp_client = None
 
         self.envs = {}
         if envs is not None:
             self.envs = envs
 
+        self._init_pool()
+
+    def _new_ssh_client(self):
+        if self.skip_auth:
+            ssh_client = NoAuthSSHClient()
+        else:
+            ssh_client = paramiko.SSHClient()
+        ssh_client.load_system_host_keys(filename=self.host_keys_filename)
+        ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        return ssh_client
+
+    def _init_pool(self):
+        """Set up the pool of connections used to execute commands. The
+        pool starts with just the main connection, self.ssh_client."""
+        self._pool_lock = threading.Lock()
+        self._pool_clients = []
+        # The number of commands running on each client which has any
+        self._pool_sessions = {}
+        # The number of connections being opened, outside the lock
+        self._pool_connecting = 0
+        # Remote directories known to exist, so that pushing several files
+        # to the same directory only creates it once
+        self._known_dirs = set()
+
     def _is_connected(self):
         transport = self.ssh_client.get_transport() if self.ssh_client else None
         return transport and transport.is_active()
 
     def _connect(self):
         if not self._is_connected():
-            logger.debug(f"connecting to {self.hostname}:{self.port}")
-            try:
-                self.ssh_client.connect(
-                    self.hostname,
-                    username=self.username,
-                    password=self.password,
-                    port=self.port,
-                    allow_agent=True,
-                    gss_auth=self.gssapi_auth,
-                    gss_kex=self.gssapi_auth,
-                    key_filename=self.key_filename
-                )
-                transport = self.ssh_client.get_transport()
-                self.sftp_client = paramiko.SFTPClient.from_transport(transport)
-
-            except paramiko.BadHostKeyException as e:
-                raise BadHostKeyException(e, self.hostname)
-
-            except paramiko.AuthenticationException as e:
-                raise AuthException(e, self.hostname)
-
-            except paramiko.SSHException as e:
-                raise SSHException(e, self.hostname)
-
-            except Exception as e:
-                raise SSHException(e, self.hostname)
+            self._connect_client(self.ssh_client)
+            transport = self.ssh_client.get_transport()
+            self.sftp_client = paramiko.SFTPClient.from_transport(transport)
+
+    def _connect_client(self, ssh_client):
+        logger.debug(f"connecting to {self.hostname}:{self.port}")
+        try:
+            ssh_client.connect(
+                self.hostname,
+                username=self.username,
+                password=self.password,
+                port=self.port,
+                allow_agent=True,
+                gss_auth=self.gssapi_auth,
+                gss_kex=self.gssapi_auth,
+                key_filename=self.key_filename
+            )
+
+        except paramiko.BadHostKeyException as e:
+            raise BadHostKeyException(e, self.hostname)
+
+        except paramiko.AuthenticationException as e:
+            raise AuthException(e, self.hostname)
+
+        except paramiko.SSHException as e:
+            raise SSHException(e, self.hostname)
+
+        except Exception as e:
+            raise SSHException(e, self.hostname)
 
     def _valid_sftp_client(self):
         self._connect()
@@ -109,6 +147,44 @@ class SSHChannel(Channel, RepresentationMixin):
         self._connect()
         return self.ssh_client
 
+    def _acquire_ssh_client(self):
+        """Return a connected client from the pool for running a command,
+        which must be given back with _release_ssh_client.
+
+        The client running the fewest commands is chosen. If it is already
+        busy and the pool is not full, a new connection is opened instead.
+        Connections are opened without the pool lock held, so that commands
+        on existing connections are not held up meanwhile.
+        """
+        main_client = self._valid_ssh_client()
+        with self._pool_lock:
+            self._pool_clients = [c for c in self._pool_clients
+                                  if c.get_transport() is not None and c.get_transport().is_active()]
+            clients = [main_client] + self._pool_clients
+            client = min(clients, key=lambda c: self._pool_sessions.get(c, 0))
+            if self._pool_sessions.get(client, 0) == 0 or len(clients) + self._pool_connecting >= self.max_connections:
+                self._pool_sessions[client] = self._pool_sessions.get(client, 0) + 1
+                return client
+            self._pool_connecting += 1
+
+        client = self._new_ssh_client()
+        try:
+            self._connect_client(client)
+        finally:
+            with self._pool_lock:
+                self._pool_connecting -= 1
+        with self._pool_lock:
+            self._pool_clients.append(client)
+            self._pool_sessions[client] = 1
+            logger.debug(f"Opened connection {len(self._pool_clients) + 1} of {self.max_connections} to {self.hostname}")
+        return client
+
+    def _release_ssh_client(self, client):
+        with self._pool_lock:
+            sessions = self._pool_sessions.pop(client, 0) - 1
+            if sessions > 0:
+                self._pool_sessions[client] = sessions
+
     def prepend_envs(self, cmd, env={}):
         env.update(self.envs)
 
@@ -136,13 +212,38 @@ class SSHChannel(Channel, RepresentationMixin):
         None.
         '''
 
-        # Execute the command
-        stdin, stdout, stderr = self._valid_ssh_client().exec_command(
-            self.prepend_envs(cmd, envs), bufsize=-1, timeout=walltime
-        )
-        # Block on exit status from the command
-        exit_status = stdout.channel.recv_exit_status()
-        return exit_status, stdout.read().decode("utf-8"), stderr.read().decode("utf-8")
+        client = self._acquire_ssh_client()
+        try:
+            # Execute the command
+            stdin, stdout, stderr = client.exec_command(
+                self.prepend_envs(cmd, envs), bufsize=-1, timeout=walltime
+            )
+            # Block on exit status from the command
+            exit_status = stdout.channel.recv_exit_status()
+            return exit_status, stdout.read().decode("utf-8"), stderr.read().decode("utf-8")
+        finally:
+            self._release_ssh_client(client)
+
+    def execute_many(self, cmds, walltime=2, envs={}):
+        ''' Synchronously execute several commandline strings on the shell,
+        concurrently over the connection pool.
+
+        Args:
+            - cmds (list of string) : Commandline strings to execute
+            - walltime (int) : walltime in seconds for each command
+
+        Kwargs:
+            - envs (dict) : Dictionary of env variables
+
+        Returns:
+            - list of (retcode, stdout, stderr), one for each command
+        '''
+        if len(cmds) <= 1:
+            return [self.execute_wait(cmd, walltime, envs) for cmd in cmds]
+
+        max_workers = min(len(cmds), SESSIONS_PER_CONNECTION * self.max_connections)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="SSHChannel") as pool:
+            return list(pool.map(lambda cmd: self.execute_wait(cmd, walltime, dict(envs)), cmds))
 
     def push_file(self, local_source, remote_dir):
         ''' Transport a local file to a directory on a remote machine
@@ -162,6 +263,70 @@ class SSHChannel(Channel, RepresentationMixin):
         '''
         remote_dest = os.path.join(remote_dir, os.path.basename(local_source))
 
+        self._ensure_remote_dir(remote_dir, local_source)
+        try:
+            self._valid_sftp_client().put(local_source, remote_dest, confirm=True)
+            # Set perm because some systems require the script to be executable
+            self._valid_sftp_client().chmod(remote_dest, 0o700)
+        except Exception as e:
+            logger.exception("File push from local source {} to remote destination {} failed".format(
+                local_source, remote_dest))
+            raise FileCopyException(e, self.hostname)
+
+        return remote_dest
+
+    def push_files(self, local_sources, remote_dir):
+        ''' Transport several local files to a directory on a remote machine.
+
+        The files are streamed as a single tar archive into one remote
+        command, which creates the directory and unpacks them, rather than
+        being copied one at a time over SFTP. This requires tar on the
+        remote side.
+
+        Args:
+            - local_sources (list of string): Paths
+            - remote_dir (string): Remote path
+
+        Returns:
+            - list of str: Paths to copied files on remote machine
+
+        Raises:
+            - FileCopyException : FileCopy failed.
+        '''
+        if len(local_sources) <= 1:
+            return [self.push_file(local_source, remote_dir) for local_source in local_sources]
+
+        cmd = 'mkdir -p {0} && tar -x -f - -C {0}'.format(shlex.quote(remote_dir))
+        client = self._acquire_ssh_client()
+        try:
+            stdin, stdout, stderr = client.exec_command(cmd, bufsize=-1)
+            with tarfile.open(fileobj=stdin, mode='w|') as tar:
+                for local_source in local_sources:
+                    info = tar.gettarinfo(local_source, arcname=os.path.basename(local_source))
+                    # Set perm because some systems require the script to be executable
+                    info.mode = 0o700
+                    with open(local_source, 'rb') as f:
+                        tar.addfile(info, f)
+            stdin.flush()
+            stdin.channel.shutdown_write()
+            exit_status = stdout.channel.recv_exit_status()
+        except Exception as e:
+            logger.exception("File push of {} to remote destination {} failed".format(local_sources, remote_dir))
+            raise FileCopyException(e, self.hostname)
+        finally:
+            self._release_ssh_client(client)
+
+        if exit_status != 0:
+            message = stderr.read().decode("utf-8")
+            logger.error("File push of {} to remote destination {} failed: {}".format(local_sources, remote_dir, message))
+            raise FileCopyException(Exception(message), self.hostname)
+
+        self._known_dirs.add(remote_dir)
+        return [os.path.join(remote_dir, os.path.basename(local_source)) for local_source in local_sources]
+
+    def _ensure_remote_dir(self, remote_dir, local_source):
+        if remote_dir in self._known_dirs:
+            return
         try:
             self.makedirs(remote_dir, exist_ok=True)
         except IOError as e:
@@ -173,16 +338,7 @@ class SSHChannel(Channel, RepresentationMixin):
             else:
                 logger.exception("File push failed due to SFTP client failure")
                 raise FileCopyException(e, self.hostname)
-        try:
-            self._valid_sftp_client().put(local_source, remote_dest, confirm=True)
-            # Set perm because some systems require the script to be executable
-            self._valid_sftp_client().chmod(remote_dest, 0o700)
-        except Exception as e:
-            logger.exception("File push from local source {} to remote destination {} failed".format(
-                local_source, remote_dest))
-            raise FileCopyException(e, self.hostname)
-
-        return remote_dest
+        self._known_dirs.add(remote_dir)
 
     def pull_file(self, remote_source, local_dir):
         ''' Transport file on the remote side to a local directory
@@ -218,6 +374,12 @@ class SSHChannel(Channel, RepresentationMixin):
         return local_dest
 
     def close(self):
+        with self._pool_lock:
+            for client in self._pool_clients:
+                client.close()
+            self._pool_clients = []
+            self._pool_sessions.clear()
+            self._known_dirs.clear()
         if self._is_connected():
             return self.ssh_client.close()
 
@@ -43,6 +43,9 @@ class SSHInteractiveLoginChannel(SSHChannel):
         if envs is not None:
             self.envs = envs
 
+        self.max_connections = 1
+        self._init_pool()
+
         try:
             self.ssh_client.connect(
                 hostname, username=username, password=password, allow_agent=True
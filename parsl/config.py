@@ -8,6 +8,8 @@ from parsl.utils import RepresentationMixin
 from parsl.executors.base import ParslExecutor
 from parsl.executors.threads import ThreadPoolExecutor
 from parsl.errors import ConfigurationError
+from parsl.dataflow.executor_selection import ExecutorSelector
+from parsl.dataflow.memostore import MemoStore
 from parsl.dataflow.taskrecord import TaskRecord
 from parsl.monitoring import MonitoringHub
 
@@ -34,6 +36,15 @@ class Config(RepresentationMixin):
     checkpoint_period : str, optional
         Time interval (in "HH:MM:SS") at which to checkpoint completed tasks. Only has an effect if
         ``checkpoint_mode='periodic'``.
+    checkpoint_compression : bool, optional
+        Compress checkpointed results with zlib. Default is False.
+    memo_store : MemoStore, optional
+        Where app cache results are stored. Use :class:`~parsl.dataflow.memostore.SQLiteMemoStore`
+        to persist results across runs. Default is None, which holds results in memory.
+    memo_hash_algorithm : str, optional
+        Hash algorithm used to identify app invocations for app caching and checkpointing: the name
+        of any algorithm in :mod:`hashlib`, such as ``'blake2b'``, or ``'xxhash'`` to use the optional
+        xxhash module. Changing this invalidates existing checkpoints. Default is ``'md5'``.
     garbage_collect : bool. optional.
         Delete task records from DFK when tasks have completed. Default: True
     internal_tasks_max_threads : int, optional
@@ -51,8 +62,8 @@ class Config(RepresentationMixin):
     run_dir : str, optional
         Path to run directory. Default is 'runinfo'.
     strategy : str, optional
-        Strategy to use for scaling blocks according to workflow needs. Can be 'simple', 'htex_auto_scale', 'none'
-        or `None`.
+        Strategy to use for scaling blocks according to workflow needs. Can be 'simple', 'htex_auto_scale',
+        'predictive', 'none' or `None`.
         If 'none' or `None`, dynamic scaling will be disabled. Default is 'simple'. The literal value `None` is
         deprecated.
     strategy_period : float or int, optional
@@ -71,6 +82,10 @@ class Config(RepresentationMixin):
         is when parsl is used as a library in a bigger system which
         wants to configure logging in a way that makes sense for that
         bigger system as a whole.
+    executor_selector : ExecutorSelector, optional
+        Chooses the executor for a task whose app may run on several executors. Use
+        :class:`~parsl.dataflow.executor_selection.DataLocalitySelector` to send tasks to the executors
+        which already hold their inputs. Default is None, which chooses at random.
     """
 
     @typeguard.typechecked
@@ -84,6 +99,9 @@ class Config(RepresentationMixin):
                                         Literal['dfk_exit'],
                                         Literal['manual']] = None,
                  checkpoint_period: Optional[str] = None,
+                 checkpoint_compression: bool = False,
+                 memo_store: Optional[MemoStore] = None,
+                 memo_hash_algorithm: str = 'md5',
                  garbage_collect: bool = True,
                  internal_tasks_max_threads: int = 10,
                  retries: int = 0,
@@ -94,7 +112,8 @@ class Config(RepresentationMixin):
                  max_idletime: float = 120.0,
                  monitoring: Optional[MonitoringHub] = None,
                  usage_tracking: bool = False,
-                 initialize_logging: bool = True) -> None:
+                 initialize_logging: bool = True,
+                 executor_selector: Optional[ExecutorSelector] = None) -> None:
 
         executors = tuple(executors or [])
         if not executors:
@@ -118,6 +137,9 @@ class Config(RepresentationMixin):
         if checkpoint_mode == 'periodic' and checkpoint_period is None:
             checkpoint_period = "00:30:00"
         self.checkpoint_period = checkpoint_period
+        self.checkpoint_compression = checkpoint_compression
+        self.memo_store = memo_store
+        self.memo_hash_algorithm = memo_hash_algorithm
         self.garbage_collect = garbage_collect
         self.internal_tasks_max_threads = internal_tasks_max_threads
         self.retries = retries
@@ -128,6 +150,7 @@ class Config(RepresentationMixin):
         self.max_idletime = max_idletime
         self.usage_tracking = usage_tracking
         self.initialize_logging = initialize_logging
+        self.executor_selector = executor_selector
         self.monitoring = monitoring
 
     @property
@@ -1,6 +1,6 @@
 import logging
 from concurrent.futures import Future
-from typing import Any, Callable, List, Optional, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, TYPE_CHECKING
 
 from parsl.app.futures import DataFuture
 from parsl.data_provider.files import File
@@ -35,67 +35,114 @@ class DataManager:
 
         self.dfk = dfk
 
-    def replace_task_stage_out(self, file: File, func: Callable, executor: str) -> Callable:
-        """This will give staging providers the chance to wrap (or replace entirely!) the task function."""
+        # The labels of the executors to which each file, by URL, has been
+        # staged in
+        self._staged_to: Dict[str, Set[str]] = {}
+
+        # The staging provider for files by executor, direction, URL scheme
+        # and network location, or None if no provider accepts them
+        self._providers: Dict[Tuple[str, bool, str, str], Optional[Staging]] = {}
+
+    def staged_locations(self, file: File) -> Set[str]:
+        """Return the labels of the executors to which file has been staged
+        in. Files on the local file system are not counted as staged."""
+        return self._staged_to.get(file.url, set())
+
+    def _provider(self, file: File, executor: str, stage_out: bool) -> Optional[Staging]:
+        """Return the first staging provider of executor which can stage file
+        in (or out, if stage_out is True), or None if there is none.
+
+        The answer is cached by the scheme and network location of file.
+        """
+        key = (executor, stage_out, file.scheme, file.netloc)
+        try:
+            return self._providers[key]
+        except KeyError:
+            pass
+
         executor_obj = self.dfk.executors[executor]
         if hasattr(executor_obj, "storage_access") and executor_obj.storage_access is not None:
             storage_access = executor_obj.storage_access  # type: List[Staging]
         else:
             storage_access = default_staging
 
+        direction = "stage_out" if stage_out else "stage_in"
+        found = None
         for provider in storage_access:
-            logger.debug("stage_out checking Staging provider {}".format(provider))
-            if provider.can_stage_out(file):
-                newfunc = provider.replace_task_stage_out(self, executor, file, func)
-                if newfunc:
-                    return newfunc
-                else:
-                    return func
-
-        logger.debug("reached end of staging provider list")
-        # if we reach here, we haven't found a suitable staging mechanism
-        raise ValueError("Executor {} cannot stage file {}".format(executor, repr(file)))
-
-    def optionally_stage_in(self, input, func, executor):
-        if isinstance(input, DataFuture):
-            file = input.file_obj.cleancopy()
-            # replace the input DataFuture with a new DataFuture which will complete at
-            # the same time as the original one, but will contain the newly
-            # copied file
-            input = DataFuture(input, file, tid=input.tid)
-        elif isinstance(input, File):
-            file = input.cleancopy()
-            input = file
+            logger.debug("{} checking Staging provider {}".format(direction, provider))
+            if provider.can_stage_out(file) if stage_out else provider.can_stage_in(file):
+                found = provider
+                break
         else:
-            return (input, func)
+            logger.debug("reached end of staging provider list")
 
-        replacement_input = self.stage_in(file, input, executor)
+        self._providers[key] = found
+        return found
 
-        func = self.replace_task(file, func, executor)
+    def replace_task_stage_out(self, file: File, func: Callable, executor: str) -> Callable:
+        """This will give staging providers the chance to wrap (or replace entirely!) the task function."""
+        return self.replace_task_stage_out_many([file], func, executor)
 
-        return (replacement_input, func)
+    def replace_task_stage_out_many(self, files: Sequence[File], func: Callable, executor: str) -> Callable:
+        """Like replace_task_stage_out, for all of the output files of a task,
+        so that each staging provider wraps the task function only once."""
+        for (provider, provider_files) in self._group_by_provider(files, executor, stage_out=True):
+            newfunc = provider.replace_task_stage_out_many(self, executor, provider_files, func)
+            if newfunc:
+                func = newfunc
+        return func
+
+    def optionally_stage_in(self, input, func, executor):
+        (replacements, func) = self.optionally_stage_in_many([input], func, executor)
+        return (replacements[0], func)
+
+    def optionally_stage_in_many(self, inputs: Sequence[Any], func: Callable, executor: str) -> Tuple[List[Any], Callable]:
+        """Stage in each of inputs which is file-like, returning the values to
+        pass to the task in place of inputs, and the task function wrapped
+        once by each staging provider which needs to wrap it."""
+        replacements = []
+        files = []
+        for input in inputs:
+            if isinstance(input, DataFuture):
+                file = input.file_obj.cleancopy()
+                # replace the input DataFuture with a new DataFuture which will complete at
+                # the same time as the original one, but will contain the newly
+                # copied file
+                input = DataFuture(input, file, tid=input.tid)
+            elif isinstance(input, File):
+                file = input.cleancopy()
+                input = file
+            else:
+                replacements.append(input)
+                continue
+
+            replacements.append(self.stage_in(file, input, executor))
+            files.append(file)
+
+        for (provider, provider_files) in self._group_by_provider(files, executor, stage_out=False):
+            newfunc = provider.replace_task_many(self, executor, provider_files, func)
+            if newfunc:
+                func = newfunc
+
+        return (replacements, func)
+
+    def _group_by_provider(self, files: Sequence[File], executor: str,
+                           stage_out: bool) -> List[Tuple[Staging, List[File]]]:
+        groups: Dict[int, Tuple[Staging, List[File]]] = {}
+        for file in files:
+            provider = self._provider(file, executor, stage_out)
+            if provider is None:
+                raise ValueError("Executor {} cannot stage file {}".format(executor, repr(file)))
+            groups.setdefault(id(provider), (provider, []))[1].append(file)
+        return list(groups.values())
 
     def replace_task(self, file: File, func: Callable, executor: str) -> Callable:
         """This will give staging providers the chance to wrap (or replace entirely!) the task function."""
-
-        executor_obj = self.dfk.executors[executor]
-        if hasattr(executor_obj, "storage_access") and executor_obj.storage_access is not None:
-            storage_access = executor_obj.storage_access
-        else:
-            storage_access = default_staging
-
-        for provider in storage_access:
-            logger.debug("stage_in checking Staging provider {}".format(provider))
-            if provider.can_stage_in(file):
-                newfunc = provider.replace_task(self, executor, file, func)
-                if newfunc:
-                    return newfunc
-                else:
-                    return func
-
-        logger.debug("reached end of staging provider list")
-        # if we reach here, we haven't found a suitable staging mechanism
-        raise ValueError("Executor {} cannot stage file {}".format(executor, repr(file)))
+        provider = self._provider(file, executor, stage_out=False)
+        if provider is None:
+            # if we reach here, we haven't found a suitable staging mechanism
+            raise ValueError("Executor {} cannot stage file {}".format(executor, repr(file)))
+        return provider.replace_task(self, executor, file, func) or func
 
     def stage_in(self, file: File, input: Any, executor: str) -> Any:
         """Transport the input from the input source to the executor, if it is file-like,
@@ -119,24 +166,18 @@ class DataManager:
         else:
             raise ValueError("Internal consistency error - should have checked DataFuture/File earlier")
 
-        executor_obj = self.dfk.executors[executor]
-        if hasattr(executor_obj, "storage_access") and executor_obj.storage_access is not None:
-            storage_access = executor_obj.storage_access
-        else:
-            storage_access = default_staging
+        provider = self._provider(file, executor, stage_out=False)
+        if provider is None:
+            # if we reach here, we haven't found a suitable staging mechanism
+            raise ValueError("Executor {} cannot stage file {}".format(executor, repr(file)))
 
-        for provider in storage_access:
-            logger.debug("stage_in checking Staging provider {}".format(provider))
-            if provider.can_stage_in(file):
-                staging_fut = provider.stage_in(self, executor, file, parent_fut=parent_fut)
-                if staging_fut:
-                    return staging_fut
-                else:
-                    return input
-
-        logger.debug("reached end of staging provider list")
-        # if we reach here, we haven't found a suitable staging mechanism
-        raise ValueError("Executor {} cannot stage file {}".format(executor, repr(file)))
+        if file.scheme != 'file':
+            self._staged_to.setdefault(file.url, set()).add(executor)
+        staging_fut = provider.stage_in(self, executor, file, parent_fut=parent_fut)
+        if staging_fut:
+            return staging_fut
+        else:
+            return input
 
     def stage_out(self, file: File, executor: str, app_fu: Future) -> Optional[Future]:
         """Transport the file from the local filesystem to the remote Globus endpoint.
@@ -151,17 +192,8 @@ class DataManager:
             - app_fu (Future) - a future representing the main body of the task that should
                                 complete before stageout begins.
         """
-        executor_obj = self.dfk.executors[executor]
-        if hasattr(executor_obj, "storage_access") and executor_obj.storage_access is not None:
-            storage_access = executor_obj.storage_access
-        else:
-            storage_access = default_staging
-
-        for provider in storage_access:
-            logger.debug("stage_out checking Staging provider {}".format(provider))
-            if provider.can_stage_out(file):
-                return provider.stage_out(self, executor, file, app_fu)
-
-        logger.debug("reached end of staging provider list")
-        # if we reach here, we haven't found a suitable staging mechanism
-        raise ValueError("Executor {} cannot stage out file {}".format(executor, repr(file)))
+        provider = self._provider(file, executor, stage_out=True)
+        if provider is None:
+            # if we reach here, we haven't found a suitable staging mechanism
+            raise ValueError("Executor {} cannot stage out file {}".format(executor, repr(file)))
+        return provider.stage_out(self, executor, file, app_fu)
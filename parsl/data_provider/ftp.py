@@ -1,11 +1,14 @@
 import ftplib
 import logging
 import os
+from functools import partial
+from typing import Optional
 
 import parsl
 
 from parsl.utils import RepresentationMixin
 from parsl.data_provider.staging import Staging
+from parsl.data_provider.staging_cache import StagingCache
 
 
 logger = logging.getLogger(__name__)
@@ -30,7 +33,18 @@ class FTPSeparateTaskStaging(Staging, RepresentationMixin):
 
 
 class FTPInTaskStaging(Staging, RepresentationMixin):
-    """Performs FTP staging as a wrapper around the application task."""
+    """Performs FTP staging as a wrapper around the application task.
+
+    Parameters
+    ----------
+    cache : StagingCache | None
+        If given, files are staged through this node-local cache, and
+        only downloaded again when their size or modification time
+        changes. Default: None
+    """
+
+    def __init__(self, cache: Optional[StagingCache] = None):
+        self.cache = cache
 
     def can_stage_in(self, file):
         logger.debug("FTPInTaskStaging checking file {}".format(file.__repr__()))
@@ -46,33 +60,32 @@ class FTPInTaskStaging(Staging, RepresentationMixin):
         return None
 
     def replace_task(self, dm, executor, file, f):
+        return self.replace_task_many(dm, executor, [file], f)
+
+    def replace_task_many(self, dm, executor, files, f):
         working_dir = dm.dfk.executors[executor].working_dir
-        return in_task_transfer_wrapper(f, file, working_dir)
+        return in_task_transfer_wrapper(f, files, working_dir, self.cache)
 
 
-def in_task_transfer_wrapper(func, file, working_dir):
+def in_task_transfer_wrapper(func, files, working_dir, cache=None):
     def wrapper(*args, **kwargs):
-        import ftplib
         if working_dir:
             os.makedirs(working_dir, exist_ok=True)
-
-        with open(file.local_path, 'wb') as f:
-            ftp = ftplib.FTP(file.netloc)
-            ftp.login()
-            ftp.cwd(os.path.dirname(file.path))
-            ftp.retrbinary('RETR {}'.format(file.filename), f.write)
-            ftp.quit()
+        for file in files:
+            if cache is None:
+                _ftp_download(file, file.local_path)
+            else:
+                cache.stage(file.url, file.local_path,
+                            partial(_ftp_download, file),
+                            _ftp_validator(file))
 
         result = func(*args, **kwargs)
         return result
     return wrapper
 
 
-def _ftp_stage_in(working_dir, parent_fut=None, outputs=[], _parsl_staging_inhibit=True):
-    file = outputs[0]
-    if working_dir:
-        os.makedirs(working_dir, exist_ok=True)
-    with open(file.local_path, 'wb') as f:
+def _ftp_download(file, path):
+    with open(path, 'wb') as f:
         ftp = ftplib.FTP(file.netloc)
         ftp.login()
         ftp.cwd(os.path.dirname(file.path))
@@ -80,5 +93,32 @@ def _ftp_stage_in(working_dir, parent_fut=None, outputs=[], _parsl_staging_inhib
         ftp.quit()
 
 
+def _ftp_validator(file):
+    """Describe a file by its size and modification time, for a
+    StagingCache, or return None if the server does not describe it."""
+    try:
+        ftp = ftplib.FTP(file.netloc)
+        ftp.login()
+        ftp.cwd(os.path.dirname(file.path))
+        ftp.voidcmd('TYPE I')
+        size = ftp.size(file.filename)
+        try:
+            modified = ftp.voidcmd('MDTM {}'.format(file.filename)).split()[-1]
+        except ftplib.error_perm:
+            modified = None
+        ftp.quit()
+    except ftplib.all_errors:
+        logger.warning("Could not check {} against staging cache".format(file.url), exc_info=True)
+        return None
+    return {'size': size, 'modified': modified}
+
+
+def _ftp_stage_in(working_dir, parent_fut=None, outputs=[], _parsl_staging_inhibit=True):
+    file = outputs[0]
+    if working_dir:
+        os.makedirs(working_dir, exist_ok=True)
+    _ftp_download(file, file.local_path)
+
+
 def _ftp_stage_in_app(dm, executor):
     return parsl.python_app(executors=[executor], data_flow_kernel=dm.dfk)(_ftp_stage_in)
@@ -3,11 +3,14 @@ import json
 import globus_sdk
 import os
 import parsl
+import threading
+import time
 import typeguard
 
-from functools import partial
-from typing import Optional
-from parsl.app.app import python_app
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from parsl.app.futures import DataFuture
+from parsl.process_loggers import wrap_with_logs
 from parsl.utils import RepresentationMixin
 from parsl.data_provider.staging import Staging
 
@@ -79,7 +82,7 @@ class Globus:
     @classmethod
     def transfer_file(cls, src_ep, dst_ep, src_path, dst_path):
         tc = globus_sdk.TransferClient(authorizer=cls.authorizer)
-        td = globus_sdk.TransferData(tc, src_ep, dst_ep)
+        td = globus_sdk.TransferData(source_endpoint=src_ep, destination_endpoint=dst_ep)
         td.add_item(src_path, dst_path)
         try:
             task = tc.submit_transfer(td)
@@ -181,6 +184,154 @@ class Globus:
             on_refresh=cls._update_tokens_file_on_refresh)
 
 
+class TransferBatcher:
+    """Submits and monitors Globus transfers on behalf of a GlobusStaging
+    provider.
+
+    Requests made within batch_window seconds of each other are submitted
+    together, as one Globus transfer task for each pair of endpoints. A
+    single thread submits the batches and polls every active task each
+    poll_period seconds, completing the Future of each request as its file
+    is transferred. The thread only runs while there are requests waiting
+    or transfers in progress, and is not a daemon thread, so that the
+    interpreter waits for transfers to finish before exiting.
+    """
+
+    def __init__(self, transfer_client: Callable[[], Any], batch_window: float, poll_period: float) -> None:
+        self._transfer_client = transfer_client
+        self.batch_window = batch_window
+        self.poll_period = poll_period
+
+        self._cv = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        # Requests not yet submitted, as (src_ep, dst_ep, src_path, dst_path, future)
+        self._pending: List[Tuple[str, str, str, str, Future]] = []
+        self._pending_since = 0.0
+        # Active transfer tasks, by task ID
+        self._active: Dict[str, Dict[str, Any]] = {}
+        self._last_poll = 0.0
+
+    def transfer(self, src_ep: str, dst_ep: str, src_path: str, dst_path: str) -> Future:
+        """Request a file transfer, returning a Future which completes
+        when the file has been transferred."""
+        fut: Future = Future()
+        with self._cv:
+            if not self._pending:
+                self._pending_since = time.time()
+            self._pending.append((src_ep, dst_ep, src_path, dst_path, fut))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="Globus-Transfers")
+                self._thread.start()
+            self._cv.notify()
+        return fut
+
+    @wrap_with_logs
+    def _run(self) -> None:
+        tc = self._transfer_client()
+        while True:
+            with self._cv:
+                while True:
+                    if not self._pending and not self._active:
+                        self._thread = None
+                        return
+                    now = time.time()
+                    submit_due = self._pending and now >= self._pending_since + self.batch_window
+                    poll_due = self._active and now >= self._last_poll + self.poll_period
+                    if submit_due or poll_due:
+                        break
+                    deadlines = []
+                    if self._pending:
+                        deadlines.append(self._pending_since + self.batch_window)
+                    if self._active:
+                        deadlines.append(self._last_poll + self.poll_period)
+                    self._cv.wait(min(deadlines) - now)
+
+                if submit_due:
+                    batch, self._pending = self._pending, []
+                else:
+                    batch = []
+
+            if batch:
+                self._submit(tc, batch)
+            if poll_due:
+                self._last_poll = time.time()
+                self._poll(tc)
+
+    def _submit(self, tc: Any, batch: List[Tuple[str, str, str, str, Future]]) -> None:
+        groups: Dict[Tuple[str, str], Dict[str, Tuple[str, List[Future]]]] = {}
+        for (src_ep, dst_ep, src_path, dst_path, fut) in batch:
+            items = groups.setdefault((src_ep, dst_ep), {})
+            # The same file may be requested several times, but is only
+            # transferred once.
+            items.setdefault(dst_path, (src_path, []))[1].append(fut)
+
+        for (src_ep, dst_ep), items in groups.items():
+            td = globus_sdk.TransferData(source_endpoint=src_ep, destination_endpoint=dst_ep)
+            for dst_path, (src_path, _) in items.items():
+                td.add_item(src_path, dst_path)
+            try:
+                task = tc.submit_transfer(td)
+            except Exception as e:
+                for dst_path, (src_path, futs) in items.items():
+                    exc = Exception('Globus transfer from {}{} to {}{} failed due to error: {}'.format(
+                        src_ep, src_path, dst_ep, dst_path, e))
+                    for fut in futs:
+                        fut.set_exception(exc)
+                continue
+            logger.debug('Submitted Globus transfer {} of {} files from {} to {}'.format(
+                task['task_id'], len(items), src_ep, dst_ep))
+            with self._cv:
+                self._active[task['task_id']] = {'src_ep': src_ep, 'dst_ep': dst_ep, 'items': items,
+                                                 'transferred': 0, 'nice_status': None}
+
+    def _poll(self, tc: Any) -> None:
+        for task_id, transfer in list(self._active.items()):
+            try:
+                task = tc.get_task(task_id)
+            except Exception:
+                logger.warning('Could not get the status of Globus transfer {}. Retrying...'.format(task_id),
+                               exc_info=True)
+                continue
+            items = transfer['items']
+
+            if task['status'] == 'SUCCEEDED':
+                logger.debug('Globus transfer {} from {} to {} succeeded'.format(
+                    task_id, transfer['src_ep'], transfer['dst_ep']))
+                self._complete(items, list(items))
+            elif task['status'] == 'FAILED':
+                logger.debug('Globus Transfer task: {}'.format(task))
+                events = tc.task_event_list(task_id)
+                event = events.data[0]
+                for dst_path, (src_path, futs) in items.items():
+                    exc = Exception('Globus transfer {}, from {}{} to {}{} failed due to error: "{}"'.format(
+                        task_id, transfer['src_ep'], src_path, transfer['dst_ep'], dst_path, event['details']))
+                    for fut in futs:
+                        fut.set_exception(exc)
+                items.clear()
+            else:
+                # Still in progress, so complete the requests for files
+                # which have been transferred so far.
+                if task.get('files_transferred', 0) > transfer['transferred']:
+                    transfer['transferred'] = task['files_transferred']
+                    done = [t['destination_path'] for t in tc.task_successful_transfers(task_id)]
+                    self._complete(items, [d for d in done if d in items])
+                if task.get('nice_status') not in (None, 'OK', 'Queued', transfer['nice_status']):
+                    logger.warning('Non-critical Globus Transfer error event for transfer {}: "{}". Retrying...'.format(
+                        task_id, task.get('nice_status_short_description', task['nice_status'])))
+                transfer['nice_status'] = task.get('nice_status')
+
+            if not items:
+                with self._cv:
+                    del self._active[task_id]
+
+    @staticmethod
+    def _complete(items: Dict[str, Tuple[str, List[Future]]], dst_paths: List[str]) -> None:
+        for dst_path in dst_paths:
+            _, futs = items.pop(dst_path)
+            for fut in futs:
+                fut.set_result(None)
+
+
 class GlobusStaging(Staging, RepresentationMixin):
     """Specification for accessing data on a remote executor via Globus.
 
@@ -193,6 +344,12 @@ class GlobusStaging(Staging, RepresentationMixin):
         FIXME
     local_path : str, optional
         FIXME
+    batch_window : float
+        Number of seconds for which stage-in and stage-out requests are gathered up, so that
+        files requested within this window are transferred together, in one Globus transfer
+        task for each pair of endpoints. Default: 1
+    poll_period : float
+        Number of seconds between checks on the progress of transfers. Default: 15
     """
 
     def can_stage_in(self, file):
@@ -206,38 +363,74 @@ class GlobusStaging(Staging, RepresentationMixin):
     def stage_in(self, dm, executor, file, parent_fut):
         globus_provider = _get_globus_provider(dm.dfk, executor)
         globus_provider._update_local_path(file, executor, dm.dfk)
-        stage_in_app = globus_provider._globus_stage_in_app(executor=executor, dfk=dm.dfk)
-        app_fut = stage_in_app(outputs=[file], _parsl_staging_inhibit=True, parent_fut=parent_fut)
-        return app_fut._outputs[0]
+        executor_obj = dm.dfk.executors[executor]
+        transfer_fut = globus_provider._after(parent_fut, lambda: _globus_stage_in(globus_provider, executor_obj, file))
+        return DataFuture(transfer_fut, file)
 
     def stage_out(self, dm, executor, file, app_fu):
         globus_provider = _get_globus_provider(dm.dfk, executor)
         globus_provider._update_local_path(file, executor, dm.dfk)
-        stage_out_app = globus_provider._globus_stage_out_app(executor=executor, dfk=dm.dfk)
-        return stage_out_app(app_fu, _parsl_staging_inhibit=True, inputs=[file])
+        executor_obj = dm.dfk.executors[executor]
+        return globus_provider._after(app_fu, lambda: _globus_stage_out(globus_provider, executor_obj, file))
 
     @typeguard.typechecked
-    def __init__(self, endpoint_uuid: str, endpoint_path: Optional[str] = None, local_path: Optional[str] = None):
+    def __init__(self, endpoint_uuid: str, endpoint_path: Optional[str] = None, local_path: Optional[str] = None,
+                 batch_window: float = 1, poll_period: float = 15):
         self.endpoint_uuid = endpoint_uuid
         self.endpoint_path = endpoint_path
         self.local_path = local_path
+        self.batch_window = batch_window
+        self.poll_period = poll_period
         self.globus = None
-
-    def _globus_stage_in_app(self, executor, dfk):
-        executor_obj = dfk.executors[executor]
-        f = partial(_globus_stage_in, self, executor_obj)
-        return python_app(executors=['_parsl_internal'], data_flow_kernel=dfk)(f)
-
-    def _globus_stage_out_app(self, executor, dfk):
-        executor_obj = dfk.executors[executor]
-        f = partial(_globus_stage_out, self, executor_obj)
-        return python_app(executors=['_parsl_internal'], data_flow_kernel=dfk)(f)
+        self._batcher: Optional[TransferBatcher] = None
+        self._batcher_lock = threading.Lock()
 
     # could this happen at __init__ time?
     def initialize_globus(self):
         if self.globus is None:
             self.globus = get_globus()
 
+    def _get_batcher(self) -> TransferBatcher:
+        with self._batcher_lock:
+            if self._batcher is None:
+                self.initialize_globus()
+                authorizer = get_globus().get_authorizer()
+                self._batcher = TransferBatcher(lambda: globus_sdk.TransferClient(authorizer=authorizer),
+                                                self.batch_window, self.poll_period)
+            return self._batcher
+
+    @staticmethod
+    def _after(parent_fut: Optional[Future], start: Callable[[], Future]) -> Future:
+        """Return a Future for the transfer made by start, which is only
+        called once parent_fut (if any) has completed successfully.
+
+        Transfers are made without tying up a DataFlowKernel task, or a
+        thread, while they wait for parent_fut or for Globus.
+        """
+        fut: Future = Future()
+
+        def chain(transfer_fut: Future) -> None:
+            e = transfer_fut.exception()
+            if e is not None:
+                fut.set_exception(e)
+            else:
+                fut.set_result(transfer_fut.result())
+
+        def begin(parent: Optional[Future]) -> None:
+            if parent is not None and parent.exception() is not None:
+                fut.set_exception(parent.exception())
+                return
+            try:
+                start().add_done_callback(chain)
+            except Exception as e:
+                fut.set_exception(e)
+
+        if parent_fut is None:
+            begin(None)
+        else:
+            parent_fut.add_done_callback(begin)
+        return fut
+
     def _get_globus_endpoint(self, executor):
         if executor.working_dir:
             working_dir = os.path.normpath(executor.working_dir)
@@ -263,37 +456,26 @@ class GlobusStaging(Staging, RepresentationMixin):
         file.local_path = os.path.join(globus_ep['working_dir'], file.filename)
 
 
-# this cannot be a class method, but must be a function, because I want
-# to be able to use partial() on it - and partial() does not work on
-# class methods
-def _globus_stage_in(provider, executor, parent_fut=None, outputs=[], _parsl_staging_inhibit=True):
+def _globus_stage_in(provider, executor, file):
     globus_ep = provider._get_globus_endpoint(executor)
-    file = outputs[0]
     dst_path = os.path.join(
             globus_ep['endpoint_path'], file.filename)
 
-    provider.initialize_globus()
-
-    provider.globus.transfer_file(
+    return provider._get_batcher().transfer(
             file.netloc, globus_ep['endpoint_uuid'],
             file.path, dst_path)
 
 
-def _globus_stage_out(provider, executor, app_fu, inputs=[], _parsl_staging_inhibit=True):
+def _globus_stage_out(provider, executor, file):
     """
-    Although app_fu isn't directly used in the stage out code,
-    it is needed as an input dependency to ensure this code
-    doesn't run until the app_fu is complete. The actual change
-    that is represented by the app_fu completing is that the
-    executor filesystem will now contain the file to stage out.
+    This is only called once the app which writes the file has
+    completed, so that the executor filesystem contains the file
+    to stage out.
     """
     globus_ep = provider._get_globus_endpoint(executor)
-    file = inputs[0]
     src_path = os.path.join(globus_ep['endpoint_path'], file.filename)
 
-    provider.initialize_globus()
-
-    provider.globus.transfer_file(
+    return provider._get_batcher().transfer(
         globus_ep['endpoint_uuid'], file.netloc,
         src_path, file.path
     )
@@ -1,19 +1,55 @@
 import logging
 import os
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+from urllib3.util.retry import Retry
 
 import parsl
 
 from parsl.utils import RepresentationMixin
 from parsl.data_provider.staging import Staging
+from parsl.data_provider.staging_cache import StagingCache
 
 logger = logging.getLogger(__name__)
 
+# Size of the chunks in which downloads are written to disk
+CHUNK_SIZE = 1024 * 1024
+
+# Files are only split into byte ranges of at least this size for parallel
+# download, so small files are fetched over a single connection
+MIN_RANGE_SIZE = 16 * 1024 * 1024
+
+# Number of times a download is resumed without making any progress before
+# it fails
+RETRIES = 5
+
+# Seconds to wait to connect to a server, and between bytes from it
+TIMEOUT = 60
+
 
 class HTTPSeparateTaskStaging(Staging, RepresentationMixin):
     """A staging provider that Performs HTTP and HTTPS staging
     as a separate parsl-level task. This requires a shared file
-    system on the executor."""
+    system on the executor.
+
+    Parameters
+    ----------
+    streams : int
+        Number of connections over which a large file is downloaded in
+        parallel, as byte ranges, if the server supports range requests.
+        Default: 4
+    max_connections_per_host : int
+        Maximum number of connections each worker process makes to one
+        server at a time, across all the files it is staging. Default: 8
+    """
+
+    def __init__(self, streams: int = 4, max_connections_per_host: int = 8):
+        self.streams = streams
+        self.max_connections_per_host = max_connections_per_host
 
     def can_stage_in(self, file):
         logger.debug("HTTPSeparateTaskStaging checking file {}".format(repr(file)))
@@ -28,7 +64,8 @@ class HTTPSeparateTaskStaging(Staging, RepresentationMixin):
             file.local_path = file.filename
 
         stage_in_app = _http_stage_in_app(dm, executor=executor)
-        app_fut = stage_in_app(working_dir, outputs=[file], _parsl_staging_inhibit=True, parent_fut=parent_fut)
+        app_fut = stage_in_app(working_dir, self.streams, self.max_connections_per_host,
+                               outputs=[file], _parsl_staging_inhibit=True, parent_fut=parent_fut)
         return app_fut._outputs[0]
 
 
@@ -36,7 +73,26 @@ class HTTPInTaskStaging(Staging, RepresentationMixin):
     """A staging provider that performs HTTP and HTTPS staging
     as in a wrapper around each task. In contrast to
     HTTPSeparateTaskStaging, this provider does not require a
-    shared file system."""
+    shared file system.
+
+    Parameters
+    ----------
+    cache : StagingCache | None
+        If given, files are staged through this node-local cache, and
+        only downloaded again when their ETag or size changes. Default: None
+    streams : int
+        Number of connections over which a large file is downloaded in
+        parallel, as byte ranges, if the server supports range requests.
+        Default: 4
+    max_connections_per_host : int
+        Maximum number of connections each worker process makes to one
+        server at a time, across all the files it is staging. Default: 8
+    """
+
+    def __init__(self, cache: Optional[StagingCache] = None, streams: int = 4, max_connections_per_host: int = 8):
+        self.cache = cache
+        self.streams = streams
+        self.max_connections_per_host = max_connections_per_host
 
     def can_stage_in(self, file):
         logger.debug("HTTPInTaskStaging checking file {}".format(repr(file)))
@@ -53,35 +109,186 @@ class HTTPInTaskStaging(Staging, RepresentationMixin):
         return None
 
     def replace_task(self, dm, executor, file, f):
+        return self.replace_task_many(dm, executor, [file], f)
+
+    def replace_task_many(self, dm, executor, files, f):
         working_dir = dm.dfk.executors[executor].working_dir
-        return in_task_transfer_wrapper(f, file, working_dir)
+        return in_task_transfer_wrapper(f, files, working_dir, self.cache,
+                                        self.streams, self.max_connections_per_host)
 
 
-def in_task_transfer_wrapper(func, file, working_dir):
+def in_task_transfer_wrapper(func, files, working_dir, cache=None, streams=1, max_connections_per_host=8):
     def wrapper(*args, **kwargs):
-        import requests
         if working_dir:
             os.makedirs(working_dir, exist_ok=True)
-        resp = requests.get(file.url, stream=True)
-        with open(file.local_path, 'wb') as f:
-            for chunk in resp.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
+
+        for file in files:
+            _in_task_download(file, cache, streams, max_connections_per_host)
 
         result = func(*args, **kwargs)
         return result
     return wrapper
 
 
-def _http_stage_in(working_dir, parent_fut=None, outputs=[], _parsl_staging_inhibit=True):
+def _in_task_download(file, cache, streams, max_connections_per_host):
+    def download(path):
+        _http_download(file.url, path, streams, max_connections_per_host)
+
+    if cache is None:
+        download(file.local_path)
+    else:
+        cache.stage(file.url, file.local_path, download,
+                    _http_validator(file.url, max_connections_per_host))
+
+
+class _IncompleteDownload(IOError):
+    pass
+
+
+# Failures after which a download is resumed from where it stopped
+_TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout,
+                     requests.exceptions.ChunkedEncodingError, _IncompleteDownload)
+
+# One session is shared by all the downloads in a process, so that
+# connections to a server are pooled and reused between files and ranges.
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+# Limits on the number of connections to each host, by (host, limit)
+_host_slots: Dict[Tuple[str, int], threading.BoundedSemaphore] = {}
+
+
+def _get_session(max_connections_per_host):
+    global _session, _session_pid
+    with _session_lock:
+        # A session inherited across a fork would share its connections
+        # with the parent process, so each process makes its own.
+        if _session is None or _session_pid != os.getpid():
+            # Connection failures and server errors before any data is
+            # received are retried here; failures part way through a
+            # response are resumed by _fetch.
+            retry = Retry(total=RETRIES, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                          allowed_methods=['HEAD', 'GET'])
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_connections_per_host, max_retries=retry)
+            _session = requests.Session()
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+            _session_pid = os.getpid()
+        return _session
+
+
+@contextmanager
+def _connection(url, max_connections_per_host) -> Iterator[requests.Session]:
+    """Hold one of the connections this process may make to the host of
+    url, while making a request over it."""
+    key = (urlparse(url).netloc, max_connections_per_host)
+    with _session_lock:
+        slots = _host_slots.setdefault(key, threading.BoundedSemaphore(max_connections_per_host))
+    with slots:
+        yield _get_session(max_connections_per_host)
+
+
+def _http_download(url, path, streams=1, max_connections_per_host=8):
+    """Download the file at url to path.
+
+    If the file is large enough, and the server accepts range requests, it
+    is downloaded over up to streams connections at once, each fetching one
+    byte range. A download which fails part way through is resumed from
+    where it stopped, using a range request if the server accepts them.
+    """
+    size = None
+    ranged = False
+    if streams > 1:
+        with _connection(url, max_connections_per_host) as session:
+            resp = session.head(url, allow_redirects=True, timeout=TIMEOUT)
+        if resp.ok:
+            ranged = resp.headers.get('Accept-Ranges') == 'bytes'
+            length = resp.headers.get('Content-Length')
+            size = int(length) if length is not None else None
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        if ranged and size is not None and size >= 2 * MIN_RANGE_SIZE:
+            parts = min(streams, size // MIN_RANGE_SIZE)
+            bounds = [size * i // parts for i in range(parts + 1)]
+            logger.debug("Downloading {} in {} ranges".format(url, parts))
+            # The file is extended to its full size first, so that each
+            # range can be written in place as it arrives.
+            os.ftruncate(fd, size)
+            with ThreadPoolExecutor(max_workers=parts) as pool:
+                fetches = [pool.submit(_fetch, url, fd, bounds[i], bounds[i + 1], max_connections_per_host)
+                           for i in range(parts)]
+                for fetch in fetches:
+                    fetch.result()
+        else:
+            _fetch(url, fd, 0, None, max_connections_per_host)
+    finally:
+        os.close(fd)
+
+
+def _fetch(url, fd, start, end, max_connections_per_host):
+    """Write the bytes of url from start up to end (or the end of the file,
+    if end is None) into fd at their offsets, resuming after failures."""
+    offset = start
+    failures = 0
+    # Whether the download can be resumed from the middle of the file
+    resumable = end is not None
+    while end is None or offset < end:
+        progress = offset
+        headers = {}
+        if offset > start or end is not None:
+            headers['Range'] = 'bytes={}-{}'.format(offset, '' if end is None else end - 1)
+        try:
+            with _connection(url, max_connections_per_host) as session:
+                with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as resp:
+                    resp.raise_for_status()
+                    if headers and resp.status_code != 206:
+                        raise IOError("Server did not honour range request for {}".format(url))
+                    if end is None:
+                        resumable = resp.headers.get('Accept-Ranges') == 'bytes'
+                    for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+            if end is None:
+                break
+            if offset < end:
+                raise _IncompleteDownload("Connection closed after {} of {} bytes of {}".format(
+                    offset - start, end - start, url))
+        except _TRANSIENT_ERRORS:
+            failures = 0 if offset > progress else failures + 1
+            if failures > RETRIES:
+                raise
+            logger.warning("Download of {} failed at byte {}, {}".format(
+                url, offset, "resuming" if resumable else "restarting"), exc_info=True)
+            if not resumable:
+                offset = start
+                os.ftruncate(fd, 0)
+
+
+def _http_validator(url, max_connections_per_host=8):
+    """Describe the file at url by its ETag and size, for a StagingCache,
+    or return None if the server does not describe it."""
+    try:
+        with _connection(url, max_connections_per_host) as session:
+            resp = session.head(url, allow_redirects=True, timeout=TIMEOUT)
+        resp.raise_for_status()
+    except requests.RequestException:
+        logger.warning("Could not check {} against staging cache".format(url), exc_info=True)
+        return None
+    etag = resp.headers.get('ETag')
+    length = resp.headers.get('Content-Length')
+    if etag is None and length is None:
+        return None
+    return {'etag': etag, 'size': int(length) if length is not None else None}
+
+
+def _http_stage_in(working_dir, streams=1, max_connections_per_host=8, parent_fut=None, outputs=[],
+                   _parsl_staging_inhibit=True):
     file = outputs[0]
     if working_dir:
         os.makedirs(working_dir, exist_ok=True)
-    resp = requests.get(file.url, stream=True)
-    with open(file.local_path, 'wb') as f:
-        for chunk in resp.iter_content(chunk_size=1024):
-            if chunk:
-                f.write(chunk)
+    _http_download(file.url, file.local_path, streams, max_connections_per_host)
 
 
 def _http_stage_in_app(dm, executor):
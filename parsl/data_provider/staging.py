@@ -1,5 +1,5 @@
 from concurrent.futures import Future
-from typing import Optional, Callable
+from typing import Callable, Optional, Sequence
 from parsl.app.futures import DataFuture
 from parsl.data_provider.files import File
 
@@ -28,21 +28,29 @@ class Staging:
     methods should be overridden to match the appropriate files, and then
     the corresponding ``stage_*`` and/or ``replace_task*`` methods should be
     implemented.
+
+    The data manager remembers which provider accepted a file, and uses the
+    same provider for other files with the same URL scheme and network
+    location on the same executor, without asking again.
     """
 
     def can_stage_in(self, file: File) -> bool:
         """
         Given a File object, decide if this staging provider can
-        stage the file. Usually this is be based on the URL
-        scheme, but does not have to be. If this returns True,
-        then other methods of this Staging object will be called
-        to perform the staging.
+        stage the file. If this returns True, then other methods
+        of this Staging object will be called to perform the staging.
+
+        The decision must depend only on the URL scheme and network
+        location of the file: the data manager caches the answer for
+        each executor, direction, scheme and network location, and
+        does not ask again about other files which share them.
         """
         return False
 
     def can_stage_out(self, file: File) -> bool:
         """
-        Like can_stage_in, but for staging out.
+        Like can_stage_in, but for staging out. The answer is cached
+        in the same way, separately from the answer for staging in.
         """
         return False
 
@@ -97,6 +105,21 @@ class Staging:
         """
         return None
 
+    def replace_task_many(self, dm: "DataManager", executor: str, files: Sequence[File], func: Callable) -> Optional[Callable]:
+        """
+        Like replace_task, for all of the files of one task which this
+        provider stages in. The default implementation calls replace_task
+        for each file in turn; providers may override it to wrap the app
+        function once for all of the files.
+        """
+        replaced = False
+        for file in files:
+            newfunc = self.replace_task(dm, executor, file, func)
+            if newfunc:
+                func = newfunc
+                replaced = True
+        return func if replaced else None
+
     def replace_task_stage_out(self, dm: "DataManager", executor: str, file: File, func: Callable) -> Optional[Callable]:
         """
         For a file to be staged out, optionally return a replacement app
@@ -104,3 +127,17 @@ class Staging:
         in staging code.
         """
         return None
+
+    def replace_task_stage_out_many(self, dm: "DataManager", executor: str, files: Sequence[File],
+                                    func: Callable) -> Optional[Callable]:
+        """
+        Like replace_task_stage_out, for all of the files of one task which
+        this provider stages out.
+        """
+        replaced = False
+        for file in files:
+            newfunc = self.replace_task_stage_out(dm, executor, file, func)
+            if newfunc:
+                func = newfunc
+                replaced = True
+        return func if replaced else None
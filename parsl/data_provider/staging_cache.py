@@ -0,0 +1,168 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from parsl.utils import RepresentationMixin
+
+logger = logging.getLogger(__name__)
+
+
+class StagingCache(RepresentationMixin):
+    """A node-local cache of files staged in by in-task staging providers,
+    so that a file used by many tasks on a node is only downloaded once.
+
+    Files are cached by URL, along with a validator describing the remote
+    file, such as its HTTP ETag and size. A cached copy is used only while
+    the validator of the remote file still matches it. Workers on a node
+    share the cache, and take a lock on an entry while they stage it, so
+    that when several tasks need the same file at once, one of them
+    downloads it and the others wait for it.
+
+    Staged files are hard links to their cached copies where possible, so
+    apps should not modify them in place.
+
+    Parameters
+    ----------
+    cache_dir : str | None
+        Node-local directory in which to cache files. If None, a directory
+        named parsl_staging_cache in the temporary directory of each node is
+        used. Default: None
+    max_size : int | None
+        Size in bytes beyond which the least recently used files are removed
+        from the cache. If None, the cache is not bounded. Default: None
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size: Optional[int] = None) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+    def _directory(self) -> str:
+        # Resolved where the cache is used, rather than when it is
+        # configured, so that the default is local to each worker node.
+        directory = self.cache_dir or os.path.join(tempfile.gettempdir(), 'parsl_staging_cache')
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def stage(self, url: str, dest: str, fetch: Callable[[str], None],
+              validator: Optional[Dict[str, Any]] = None) -> None:
+        """Place the file at url at dest, calling fetch to download it to a
+        given path if the cache does not hold a copy matching validator.
+
+        If validator is None, because the remote file could not be
+        described, any cached copy is used.
+        """
+        directory = self._directory()
+        key = hashlib.sha256(url.encode()).hexdigest()
+        data_path = os.path.join(directory, key)
+        meta_path = data_path + '.json'
+
+        with _locked(data_path + '.lock'):
+            meta = _read_meta(meta_path)
+            if not _is_valid(meta, validator, data_path):
+                logger.debug("Downloading {} into staging cache".format(url))
+                tmp_path = '{}.{}.part'.format(data_path, os.getpid())
+                try:
+                    fetch(tmp_path)
+                    size = os.path.getsize(tmp_path)
+                    if validator and validator.get('size') is not None and size != validator['size']:
+                        raise IOError("Downloaded {} bytes of {}, expected {}".format(size, url, validator['size']))
+                    os.replace(tmp_path, data_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+                with open(meta_path, 'w') as f:
+                    json.dump({'url': url, 'validator': validator, 'size': size}, f)
+            else:
+                logger.debug("Staging {} from staging cache".format(url))
+
+            # The modification time of a cached file records when it was
+            # last used, for eviction.
+            os.utime(data_path)
+            _link_or_copy(data_path, dest)
+
+        if self.max_size is not None:
+            self._evict(directory, keep=key)
+
+    def _evict(self, directory: str, keep: str) -> None:
+        """Remove least recently used files until the cache fits in
+        max_size, leaving out the entry keep and entries in use."""
+        assert self.max_size is not None
+        with _locked(os.path.join(directory, 'evict.lock')):
+            entries = []
+            for name in os.listdir(directory):
+                if not name.endswith('.json'):
+                    continue
+                data_path = os.path.join(directory, name[:-len('.json')])
+                try:
+                    stat = os.stat(data_path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, data_path))
+
+            total = sum(size for (_, size, _) in entries)
+            for (_, size, data_path) in sorted(entries):
+                if total <= self.max_size:
+                    break
+                if os.path.basename(data_path) == keep:
+                    continue
+                with _locked(data_path + '.lock', blocking=False) as acquired:
+                    if not acquired:
+                        continue
+                    logger.debug("Evicting {} from staging cache".format(data_path))
+                    os.unlink(data_path + '.json')
+                    os.unlink(data_path)
+                    total -= size
+
+
+@contextmanager
+def _locked(lock_path: str, blocking: bool = True) -> Iterator[bool]:
+    """Hold an exclusive lock on lock_path, which is shared between
+    processes. If blocking is False, yield whether the lock was acquired
+    rather than waiting for it."""
+    with open(lock_path, 'a') as f:
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(f, flags)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_meta(meta_path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_valid(meta: Optional[Dict[str, Any]], validator: Optional[Dict[str, Any]], data_path: str) -> bool:
+    if meta is None:
+        return False
+    try:
+        if os.path.getsize(data_path) != meta['size']:
+            return False
+    except OSError:
+        return False
+    return validator is None or meta['validator'] == validator
+
+
+def _link_or_copy(src: str, dest: str) -> None:
+    """Place src at dest, replacing any existing file, by a hard link if
+    src and dest are on the same file system or by a copy if not."""
+    tmp_dest = '{}.{}.tmp'.format(dest, os.getpid())
+    try:
+        os.link(src, tmp_dest)
+    except OSError:
+        shutil.copyfile(src, tmp_dest)
+    os.replace(tmp_dest, dest)
@@ -13,7 +13,7 @@ import sys
 import datetime
 from getpass import getuser
 from typeguard import typechecked
-from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
 from uuid import uuid4
 from socket import gethostname
 from concurrent.futures import Future
@@ -27,8 +27,10 @@ from parsl.config import Config
 from parsl.data_provider.data_manager import DataManager
 from parsl.data_provider.files import File
 from parsl.dataflow.errors import BadCheckpoint, DependencyError, JoinError
+from parsl.dataflow.executor_selection import RandomExecutorSelector
 from parsl.dataflow.futures import AppFuture
 from parsl.dataflow.memoization import Memoizer
+from parsl.dataflow.memostore import CheckpointIndex, write_checkpoint_record
 from parsl.dataflow.rundirs import make_rundir
 from parsl.dataflow.states import States, FINAL_STATES, FINAL_FAILURE_STATES
 from parsl.dataflow.taskrecord import TaskRecord
@@ -41,6 +43,7 @@ from parsl.executors.threads import ThreadPoolExecutor
 from parsl.monitoring import MonitoringHub
 from parsl.process_loggers import wrap_with_logs
 from parsl.providers.base import ExecutionProvider
+from parsl.serialize.lazy import LazyResultFuture
 from parsl.utils import get_version, get_std_fname_mode, get_all_checkpoints, Timer
 
 from parsl.monitoring.message_type import MessageType
@@ -166,12 +169,14 @@ class DataFlowKernel:
         elif config.checkpoint_files is None and config.checkpoint_mode is not None:
             checkpoints = self.load_checkpoints(get_all_checkpoints(self.run_dir))
         else:
-            checkpoints = {}
+            checkpoints = None
 
-        self.memoizer = Memoizer(self, memoize=config.app_cache, checkpoint=checkpoints)
+        self.memoizer = Memoizer(self, memoize=config.app_cache, checkpoint=checkpoints, memo_store=config.memo_store,
+                                 hash_algorithm=config.memo_hash_algorithm)
         self.checkpointed_tasks = 0
         self._checkpoint_timer = None
         self.checkpoint_mode = config.checkpoint_mode
+        self.checkpoint_compression = config.checkpoint_compression
         self.checkpointable_tasks: List[TaskRecord] = []
 
         # this must be set before executors are added since add_executors calls
@@ -184,6 +189,7 @@ class DataFlowKernel:
         self.executors: Dict[str, ParslExecutor] = {}
 
         self.data_manager = DataManager(self)
+        self.executor_selector = config.executor_selector or RandomExecutorSelector()
         parsl_internal_executor = ThreadPoolExecutor(max_threads=config.internal_tasks_max_threads, label='_parsl_internal')
         self.add_executors(config.executors)
         self.add_executors([parsl_internal_executor])
@@ -203,6 +209,10 @@ class DataFlowKernel:
         self.tasks: Dict[int, TaskRecord] = {}
         self.submitter_lock = threading.Lock()
 
+        # The IDs of tasks which launch_many_if_ready has claimed for launch,
+        # but which it is launching without their task_launch_lock held.
+        self._launching: Set[int] = set()
+
         atexit.register(self.atexit_cleanup)
 
     def __enter__(self):
@@ -574,7 +584,11 @@ class DataFlowKernel:
 
     @staticmethod
     def _unwrap_remote_exception_wrapper(future: Future) -> Any:
-        result = future.result()
+        if isinstance(future, LazyResultFuture):
+            # Leave the result serialized until it is needed.
+            result = future.serialized_result()
+        else:
+            result = future.result()
         if isinstance(result, RemoteExceptionWrapper):
             result.reraise()
         return result
@@ -610,23 +624,13 @@ class DataFlowKernel:
         """
         exec_fu = None
 
-        task_id = task_record['id']
         with task_record['task_launch_lock']:
 
-            if task_record['status'] != States.pending:
-                logger.debug(f"Task {task_id} is not pending, so launch_if_ready skipping")
-                return
-
-            if self._count_deps(task_record['depends']) != 0:
-                logger.debug(f"Task {task_id} has outstanding dependencies, so launch_if_ready skipping")
+            if not self._ready_to_launch(task_record):
                 return
 
             # We can now launch the task or handle any dependency failures
-
-            new_args, kwargs, exceptions_tids = self._unwrap_futures(task_record['args'],
-                                                                     task_record['kwargs'])
-            task_record['args'] = new_args
-            task_record['kwargs'] = kwargs
+            exceptions_tids = self._unwrap_task_futures(task_record)
 
             if not exceptions_tids:
                 # There are no dependency errors
@@ -645,30 +649,117 @@ class DataFlowKernel:
                     exec_fu = Future()
                     exec_fu.set_exception(e)
             else:
-                logger.info(
-                    "Task {} failed due to dependency failure".format(task_id))
-                # Raise a dependency exception
-                self.update_task_state(task_record, States.dep_fail)
+                exec_fu = self._dependency_failure_future(task_record, exceptions_tids)
 
-                self._send_task_log_info(task_record)
+        if exec_fu:
+            self._add_exec_callback(task_record, exec_fu)
 
-                exec_fu = Future()
-                exec_fu.set_exception(DependencyError(exceptions_tids,
-                                                      task_id))
+    def launch_many_if_ready(self, task_records: Sequence[TaskRecord]) -> None:
+        """Launch each of the specified tasks that is ready to run, in the
+        same way as launch_if_ready, but handing all of the ready tasks which
+        are destined for the same executor to that executor in a single
+        ``submit_many`` call.
 
-        if exec_fu:
-            assert isinstance(exec_fu, Future)
-            try:
-                exec_fu.add_done_callback(partial(self.handle_exec_update, task_record))
-            except Exception:
-                # this exception is ignored here because it is assumed that exception
-                # comes from directly executing handle_exec_update (because exec_fu is
-                # done already). If the callback executes later, then any exception
-                # coming out of the callback will be ignored and not propate anywhere,
-                # so this block attempts to keep the same behaviour here.
-                logger.error("add_done_callback got an exception which will be ignored", exc_info=True)
+        Tasks which are not ready to run (because they are not pending, or
+        have outstanding dependencies) are skipped, and will be launched
+        later through launch_if_ready by their dependency callbacks.
+
+        Each task's task_launch_lock is held only while that task is checked
+        and claimed for launch, rather than across the whole batch, so that
+        a large batch does not hold up the launch of other tasks.
+
+        launch_many_if_ready is thread safe, so may be called from any thread
+        or callback.
+        """
+        exec_fus: List[Tuple[TaskRecord, Future]] = []
+        to_launch: List[TaskRecord] = []
+
+        for task_record in task_records:
+            with task_record['task_launch_lock']:
+                if not self._ready_to_launch(task_record):
+                    continue
+
+                exceptions_tids = self._unwrap_task_futures(task_record)
+                if not exceptions_tids:
+                    self._launching.add(task_record['id'])
+                    to_launch.append(task_record)
+                else:
+                    exec_fus.append((task_record, self._dependency_failure_future(task_record, exceptions_tids)))
+
+        try:
+            exec_fus.extend(self.launch_tasks(to_launch))
+        finally:
+            for task_record in to_launch:
+                self._launching.discard(task_record['id'])
+
+        for (task_record, exec_fu) in exec_fus:
+            self._add_exec_callback(task_record, exec_fu)
+
+    def _ready_to_launch(self, task_record: TaskRecord) -> bool:
+        """Checks whether a task is pending, is not already being launched,
+        and has no outstanding dependencies. The caller must hold the
+        task_launch_lock of the task.
+        """
+        task_id = task_record['id']
+
+        if task_record['status'] != States.pending:
+            logger.debug(f"Task {task_id} is not pending, so launch_if_ready skipping")
+            return False
+
+        if task_id in self._launching:
+            logger.debug(f"Task {task_id} is already being launched, so launch_if_ready skipping")
+            return False
+
+        if self._count_deps(task_record['depends']) != 0:
+            logger.debug(f"Task {task_id} has outstanding dependencies, so launch_if_ready skipping")
+            return False
 
-            task_record['exec_fu'] = exec_fu
+        return True
+
+    def _unwrap_task_futures(self, task_record: TaskRecord) -> List[Tuple[Exception, str]]:
+        """Replace the futures in a task's arguments with their results,
+        returning any dependency failures.
+        """
+        executor = self.executors.get(task_record['executor'])
+        forward_serialized = getattr(executor, 'accepts_serialized_results', False)
+        new_args, kwargs, exceptions_tids = self._unwrap_futures(task_record['args'],
+                                                                 task_record['kwargs'],
+                                                                 forward_serialized=forward_serialized)
+        task_record['args'] = new_args
+        task_record['kwargs'] = kwargs
+        return exceptions_tids
+
+    def _dependency_failure_future(self, task_record: TaskRecord,
+                                   exceptions_tids: List[Tuple[Exception, str]]) -> Future:
+        """Move a task into dep_fail state, returning a failed Future which
+        can be used in place of an execution future.
+        """
+        task_id = task_record['id']
+        logger.info(
+            "Task {} failed due to dependency failure".format(task_id))
+        # Raise a dependency exception
+        self.update_task_state(task_record, States.dep_fail)
+
+        self._send_task_log_info(task_record)
+
+        exec_fu: Future = Future()
+        exec_fu.set_exception(DependencyError(exceptions_tids,
+                                              task_id))
+        return exec_fu
+
+    def _add_exec_callback(self, task_record: TaskRecord, exec_fu: Future) -> None:
+        assert isinstance(exec_fu, Future)
+        try:
+            exec_fu.add_done_callback(partial(self.handle_exec_update, task_record))
+        except Exception:
+            # this exception is ignored here because it is assumed that exception
+            # comes from directly executing handle_exec_update (because exec_fu is
+            # done already). If the callback executes later, then any exception
+            # coming out of the callback will be ignored and not propate anywhere,
+            # so this block attempts to keep the same behaviour here.
+            logger.error("add_done_callback got an exception which will be ignored", exc_info=True)
+
+        task_record['exec_fu'] = exec_fu
 
     def launch_task(self, task_record: TaskRecord) -> Future:
         """Handle the actual submission of the task to the executor layer.
@@ -687,21 +778,98 @@ class DataFlowKernel:
         Returns:
             Future that tracks the execution of the submitted function
         """
-        task_id = task_record['id']
-        function = task_record['func']
-        args = task_record['args']
-        kwargs = task_record['kwargs']
+        memo_fu = self._launch_from_memo(task_record)
+        if memo_fu:
+            return memo_fu
+
+        executor, function, args, kwargs = self._prepare_submission(task_record)
 
+        with self.submitter_lock:
+            exec_fu = executor.submit(function, task_record['resource_specification'], *args, **kwargs)
+
+        self._record_launch(task_record, executor, exec_fu)
+
+        return exec_fu
+
+    def launch_tasks(self, task_records: Sequence[TaskRecord]) -> List[Tuple[TaskRecord, Future]]:
+        """Handle the submission of several tasks to the executor layer,
+        grouping tasks by executor so that each executor receives one
+        ``submit_many`` call.
+
+        Unlike launch_task, failures are not raised: a task which could not
+        be launched is paired with a Future holding the launch exception.
+
+        Args:
+            task_records : The task records, which must all be ready to run
+
+        Returns:
+            List of (task record, Future that tracks execution) pairs
+        """
+        launched: List[Tuple[TaskRecord, Future]] = []
+        batches: Dict[str, List[Tuple[TaskRecord, Callable, Sequence[Any], Dict[str, Any]]]] = {}
+
+        for task_record in task_records:
+            try:
+                memo_fu = self._launch_from_memo(task_record)
+                if memo_fu:
+                    launched.append((task_record, memo_fu))
+                    continue
+                executor, function, args, kwargs = self._prepare_submission(task_record)
+            except Exception as e:
+                logger.debug("Got an exception preparing task for launch", exc_info=True)
+                exec_fu: Future = Future()
+                exec_fu.set_exception(e)
+                launched.append((task_record, exec_fu))
+            else:
+                batches.setdefault(executor.label, []).append((task_record, function, args, kwargs))
+
+        for (label, batch) in batches.items():
+            executor = self.executors[label]
+            logger.debug(f"Submitting batch of {len(batch)} tasks to executor {label}")
+            try:
+                with self.submitter_lock:
+                    exec_fus = executor.submit_many([(function, task_record['resource_specification'], args, kwargs)
+                                                     for (task_record, function, args, kwargs) in batch])
+                if len(exec_fus) != len(batch):
+                    raise InternalConsistencyError(f"Executor {label} returned {len(exec_fus)} futures for {len(batch)} tasks")
+            except Exception as e:
+                logger.debug("Got an exception launching batch of tasks", exc_info=True)
+                for (task_record, _, _, _) in batch:
+                    exec_fu = Future()
+                    exec_fu.set_exception(e)
+                    launched.append((task_record, exec_fu))
+            else:
+                for ((task_record, _, _, _), exec_fu) in zip(batch, exec_fus):
+                    self._record_launch(task_record, executor, exec_fu)
+                    launched.append((task_record, exec_fu))
+
+        return launched
+
+    def _launch_from_memo(self, task_record: TaskRecord) -> Optional[Future]:
+        """Start a launch attempt for a task, returning the memoized result
+        future if there is one.
+        """
         task_record['try_time_launched'] = datetime.datetime.now()
 
         memo_fu = self.memoizer.check_memo(task_record)
         if memo_fu:
-            logger.info("Reusing cached result for task {}".format(task_id))
+            logger.info("Reusing cached result for task {}".format(task_record['id']))
             task_record['from_memo'] = True
             assert isinstance(memo_fu, Future)
             return memo_fu
 
         task_record['from_memo'] = False
+        return None
+
+    def _prepare_submission(self, task_record: TaskRecord) -> Tuple[ParslExecutor, Callable, Sequence[Any], Dict[str, Any]]:
+        """Look up the executor for a task, and apply any submit-side wrapping
+        (such as resource monitoring) to the task function and arguments.
+        """
+        task_id = task_record['id']
+        function = task_record['func']
+        args = task_record['args']
+        kwargs = task_record['kwargs']
+
         executor_label = task_record["executor"]
         try:
             executor = self.executors[executor_label]
@@ -722,8 +890,14 @@ class DataFlowKernel:
                                                                        executor.monitor_resources(),
                                                                        self.run_dir)
 
-        with self.submitter_lock:
-            exec_fu = executor.submit(function, task_record['resource_specification'], *args, **kwargs)
+        return executor, function, args, kwargs
+
+    def _record_launch(self, task_record: TaskRecord, executor: ParslExecutor, exec_fu: Future) -> None:
+        """Record that a task has been handed to an executor.
+        """
+        task_id = task_record['id']
+        try_id = task_record['fail_count']
+
         self.update_task_state(task_record, States.launched)
 
         self._send_task_log_info(task_record)
@@ -738,8 +912,6 @@ class DataFlowKernel:
 
         self._log_std_streams(task_record)
 
-        return exec_fu
-
     def _add_input_deps(self, executor: str, args: Sequence[Any], kwargs: Dict[str, Any], func: Callable) -> Tuple[Sequence[Any], Dict[str, Any],
                                                                                                                    Callable]:
         """Look for inputs of the app that are files. Give the data manager
@@ -758,16 +930,19 @@ class DataFlowKernel:
             logger.debug("Not performing input staging")
             return args, kwargs, func
 
+        # All the files of the task are staged together, so that each staging
+        # provider wraps func once for the whole task.
         inputs = kwargs.get('inputs', [])
-        for idx, f in enumerate(inputs):
-            (inputs[idx], func) = self.data_manager.optionally_stage_in(f, func, executor)
+        kwarg_names = list(kwargs)
+        (replacements, func) = self.data_manager.optionally_stage_in_many(
+            list(inputs) + [kwargs[k] for k in kwarg_names] + list(args), func, executor)
 
-        for kwarg, f in kwargs.items():
-            (kwargs[kwarg], func) = self.data_manager.optionally_stage_in(f, func, executor)
-
-        newargs = list(args)
-        for idx, f in enumerate(newargs):
-            (newargs[idx], func) = self.data_manager.optionally_stage_in(f, func, executor)
+        for idx in range(len(inputs)):
+            inputs[idx] = replacements[idx]
+        replacements = replacements[len(inputs):]
+        for kwarg, replacement in zip(kwarg_names, replacements):
+            kwargs[kwarg] = replacement
+        newargs = replacements[len(kwarg_names):]
 
         return tuple(newargs), kwargs, func
 
@@ -775,6 +950,7 @@ class DataFlowKernel:
         logger.debug("Adding output dependencies")
         outputs = kwargs.get('outputs', [])
         app_fut._outputs = []
+        staged_out = []
         for idx, f in enumerate(outputs):
             if isinstance(f, File) and not self.check_staging_inhibited(kwargs):
                 # replace a File with a DataFuture - either completing when the stageout
@@ -795,14 +971,15 @@ class DataFlowKernel:
                     logger.debug("No stageout dependency for {}".format(repr(f)))
                     app_fut._outputs.append(DataFuture(app_fut, f, tid=app_fut.tid))
 
-                # this is a hook for post-task stageout
-                # note that nothing depends on the output - which is maybe a bug
-                # in the not-very-tested stageout system?
-                func = self.data_manager.replace_task_stage_out(f_copy, func, executor)
+                staged_out.append(f_copy)
             else:
                 logger.debug("Not performing output staging for: {}".format(repr(f)))
                 app_fut._outputs.append(DataFuture(app_fut, f, tid=app_fut.tid))
-        return func
+
+        # this is a hook for post-task stageout
+        # note that nothing depends on the output - which is maybe a bug
+        # in the not-very-tested stageout system?
+        return self.data_manager.replace_task_stage_out_many(staged_out, func, executor)
 
     def _gather_all_deps(self, args: Sequence[Any], kwargs: Dict[str, Any]) -> List[Future]:
         """Assemble a list of all Futures passed as arguments, kwargs or in the inputs kwarg.
@@ -836,11 +1013,20 @@ class DataFlowKernel:
 
         return depends
 
-    def _unwrap_futures(self, args, kwargs):
+    @staticmethod
+    def _dependency_result(dep: Future, forward_serialized: bool) -> Any:
+        if forward_serialized and isinstance(dep, LazyResultFuture):
+            return dep.serialized_result()
+        return dep.result()
+
+    def _unwrap_futures(self, args, kwargs, forward_serialized=False):
         """This function should be called when all dependencies have completed.
 
         It will rewrite the arguments for that task, replacing each Future
-        with the result of that future.
+        with the result of that future. If forward_serialized is True,
+        results which have not been deserialized yet are left serialized, as
+        :class:`~parsl.serialize.lazy.SerializedResult` objects, for the
+        executor to pass on as they are.
 
         If the user hid futures a level below, we will not catch
         it, and will (most likely) result in a type error.
@@ -848,6 +1034,7 @@ class DataFlowKernel:
         Args:
              args (List) : Positional args to app function
              kwargs (Dict) : Kwargs to app function
+             forward_serialized (bool) : Whether to leave results serialized
 
         Return:
             a rewritten args list
@@ -862,7 +1049,7 @@ class DataFlowKernel:
         for dep in args:
             if isinstance(dep, Future):
                 try:
-                    new_args.extend([dep.result()])
+                    new_args.extend([self._dependency_result(dep, forward_serialized)])
                 except Exception as e:
                     # If this Future is associated with a task inside this DFK,
                     # then refer to the task ID.
@@ -880,7 +1067,7 @@ class DataFlowKernel:
             dep = kwargs[key]
             if isinstance(dep, Future):
                 try:
-                    kwargs[key] = dep.result()
+                    kwargs[key] = self._dependency_result(dep, forward_serialized)
                 except Exception as e:
                     if hasattr(dep, 'task_record'):
                         tid = dep.task_record['id']
@@ -894,7 +1081,7 @@ class DataFlowKernel:
             for dep in kwargs['inputs']:
                 if isinstance(dep, Future):
                     try:
-                        new_inputs.extend([dep.result()])
+                        new_inputs.extend([self._dependency_result(dep, forward_serialized)])
                     except Exception as e:
                         if hasattr(dep, 'task_record'):
                             tid = dep.task_record['id']
@@ -908,6 +1095,26 @@ class DataFlowKernel:
 
         return new_args, kwargs, dep_failures
 
+    def _select_executor(self, choices: List[str], args: Sequence[Any], kwargs: Dict[str, Any]) -> str:
+        """Choose which of the executors labelled in choices a task with
+        the given arguments will be sent to, using the configured executor
+        selector."""
+        if len(choices) == 1 or any(c not in self.executors for c in choices):
+            # An invalid executor label is reported when the task is launched
+            return random.choice(choices)
+
+        data_locations = []
+        for dep in list(args) + list(kwargs.values()) + list(kwargs.get('inputs', [])):
+            if isinstance(dep, DataFuture):
+                # A file produced by a task, rather than staged out by one
+                dep = dep.parent
+            if isinstance(dep, AppFuture):
+                data_locations.append(dep.task_record['executor'])
+            elif isinstance(dep, File):
+                data_locations.extend(self.data_manager.staged_locations(dep))
+
+        return self.executor_selector.select([self.executors[c] for c in choices], data_locations).label
+
     def submit(self,
                func: Callable,
                app_args: Sequence[Any],
@@ -938,6 +1145,69 @@ class DataFlowKernel:
                (AppFuture) [DataFutures,]
 
         """
+        task_record = self._create_task(func, app_args, executors, cache, ignore_for_cache, app_kwargs, join)
+
+        self.launch_if_ready(task_record)
+
+        return task_record['app_fu']
+
+    def submit_many(self,
+                    func: Callable,
+                    app_args_list: Sequence[Sequence[Any]],
+                    executors: Union[str, Sequence[str]],
+                    cache: bool,
+                    ignore_for_cache: Optional[Sequence[str]],
+                    app_kwargs_list: Sequence[Dict[str, Any]],
+                    join: bool = False) -> List[AppFuture]:
+        """Add a batch of tasks, all invoking the same function, to the
+        dataflow system.
+
+        This behaves like calling submit once for each pair of entries in
+        app_args_list and app_kwargs_list, except that the tasks which are
+        ready to run immediately are handed to each executor in a single
+        ``submit_many`` call, amortizing submission costs over the batch.
+        Tasks with outstanding dependencies are launched individually as
+        their dependencies complete, as with submit.
+
+        Args:
+            - func : A function object
+
+        KWargs :
+            - app_args_list : A sequence of args to the function, one entry per task
+            - executors (list or string) : List of executors these calls could go to.
+                    Default='all'
+            - cache (Bool) : To enable memoization or not
+            - ignore_for_cache (sequence) : List of kwargs to be ignored for memoization/checkpointing
+            - app_kwargs_list : A sequence of kwargs dicts to the function, one entry per task
+
+        Returns:
+               List of AppFutures, in the same order as app_args_list
+        """
+        if len(app_args_list) != len(app_kwargs_list):
+            raise ValueError("submit_many requires the same number of args and kwargs entries, got {} and {}".format(
+                len(app_args_list), len(app_kwargs_list)))
+
+        task_records = [self._create_task(func, app_args, executors, cache, ignore_for_cache, app_kwargs, join)
+                        for (app_args, app_kwargs) in zip(app_args_list, app_kwargs_list)]
+
+        self.launch_many_if_ready(task_records)
+
+        return [task_record['app_fu'] for task_record in task_records]
+
+    def _create_task(self,
+                     func: Callable,
+                     app_args: Sequence[Any],
+                     executors: Union[str, Sequence[str]],
+                     cache: bool,
+                     ignore_for_cache: Optional[Sequence[str]],
+                     app_kwargs: Dict[str, Any],
+                     join: bool) -> TaskRecord:
+        """Create the task record for a new task, register it with the DFK,
+        and attach callbacks to its dependencies so that it will be launched
+        when they complete. The caller is responsible for calling
+        launch_if_ready (or launch_many_if_ready) once after this, to launch
+        tasks which have no outstanding dependencies.
+        """
 
         if ignore_for_cache is None:
             ignore_for_cache = []
@@ -956,7 +1226,7 @@ class DataFlowKernel:
             choices = executors
         else:
             raise ValueError("Task {} supplied invalid type for executors: {}".format(task_id, type(executors)))
-        executor = random.choice(choices)
+        executor = self._select_executor(choices, app_args, app_kwargs)
         logger.debug("Task {} will be sent to executor {}".format(task_id, executor))
 
         # The below uses func.__name__ before it has been wrapped by any staging code.
@@ -1053,11 +1323,12 @@ class DataFlowKernel:
         # call whenever a dependency completes.
 
         # we need to be careful about the order of setting the state to pending,
-        # adding the callbacks, and caling launch_if_ready explicitly once always below.
+        # adding the callbacks, and caling launch_if_ready explicitly once always, which
+        # our caller does after this method returns.
 
         # I think as long as we call launch_if_ready once after setting pending, then
         # we can add the callback dependencies at any point: if the callbacks all fire
-        # before then, they won't cause a launch, but the one below will. if they fire
+        # before then, they won't cause a launch, but the caller's one will. if they fire
         # after we set it pending, then the last one will cause a launch, and the
         # explicit one won't.
 
@@ -1071,9 +1342,7 @@ class DataFlowKernel:
             except Exception as e:
                 logger.error("add_done_callback got an exception {} which will be ignored".format(e))
 
-        self.launch_if_ready(task_record)
-
-        return app_fu
+        return task_record
 
     # it might also be interesting to assert that all DFK
     # tasks are in a "final" state (3,4,5) when the DFK
@@ -1237,6 +1506,9 @@ class DataFlowKernel:
         logger.info("Terminated executors")
         self.time_completed = datetime.datetime.now()
 
+        logger.info("Closing memo store")
+        self.memoizer.close()
+
         if self.monitoring:
             logger.info("Sending final monitoring message")
             self.monitoring.send(MessageType.WORKFLOW_INFO,
@@ -1269,7 +1541,7 @@ class DataFlowKernel:
         Returns:
             Checkpoint dir if checkpoints were written successfully.
             By default the checkpoints are written to the RUNDIR of the current
-            run under RUNDIR/checkpoints/{tasks.pkl, dfk.pkl}
+            run under RUNDIR/checkpoints/{tasks.pkl, dfk.pkl, results/}
         """
         with self.checkpoint_lock:
             if tasks:
@@ -1303,11 +1575,11 @@ class DataFlowKernel:
                         hashsum = task_record['hashsum']
                         if not hashsum:
                             continue
-                        t = {'hash': hashsum, 'exception': None, 'result': app_fu.result()}
 
                         # We are using pickle here since pickle dumps to a file in 'ab'
                         # mode behave like a incremental log.
-                        pickle.dump(t, f)
+                        write_checkpoint_record(f, checkpoint_dir, hashsum, app_fu.result(),
+                                                compress=self.checkpoint_compression)
                         count += 1
                         logger.debug("Task {} checkpointed".format(task_id))
 
@@ -1323,41 +1595,28 @@ class DataFlowKernel:
 
             return checkpoint_dir
 
-    def _load_checkpoints(self, checkpointDirs: Sequence[str]) -> Dict[str, Future[Any]]:
-        """Load a checkpoint file into a lookup table.
+    def _load_checkpoints(self, checkpointDirs: Sequence[str]) -> CheckpointIndex:
+        """Load checkpoint files into an index.
 
-        The data being loaded from the pickle file mostly contains input
-        attributes of the task: func, args, kwargs, env...
-        To simplify the check of whether the exact task has been completed
-        in the checkpoint, we hash these input params and use it as the key
-        for the memoized lookup table.
+        Each checkpoint record is keyed by the memoization hash of the task
+        which produced it. Only the record headers are read here: results
+        are read from the checkpoint files when a task with a matching hash
+        is looked up.
 
         Args:
             - checkpointDirs (list) : List of filepaths to checkpoints
               Eg. ['runinfo/001', 'runinfo/002']
 
         Returns:
-            - memoized_lookup_table (dict)
+            - CheckpointIndex
         """
-        memo_lookup_table = {}
+        checkpoint_index = CheckpointIndex()
 
         for checkpoint_dir in checkpointDirs:
             logger.info("Loading checkpoints from {}".format(checkpoint_dir))
             checkpoint_file = os.path.join(checkpoint_dir, 'tasks.pkl')
             try:
-                with open(checkpoint_file, 'rb') as f:
-                    while True:
-                        try:
-                            data = pickle.load(f)
-                            # Copy and hash only the input attributes
-                            memo_fu: Future = Future()
-                            assert data['exception'] is None
-                            memo_fu.set_result(data['result'])
-                            memo_lookup_table[data['hash']] = memo_fu
-
-                        except EOFError:
-                            # Done with the checkpoint file
-                            break
+                checkpoint_index.load(checkpoint_file)
             except FileNotFoundError:
                 reason = "Checkpoint file was not found: {}".format(
                     checkpoint_file)
@@ -1370,28 +1629,29 @@ class DataFlowKernel:
                 raise BadCheckpoint(reason)
 
             logger.info("Completed loading checkpoint: {0} with {1} tasks".format(checkpoint_file,
-                                                                                  len(memo_lookup_table.keys())))
-        return memo_lookup_table
+                                                                                  len(checkpoint_index)))
+        return checkpoint_index
 
     @typeguard.typechecked
-    def load_checkpoints(self, checkpointDirs: Optional[Sequence[str]]) -> Dict[str, Future]:
-        """Load checkpoints from the checkpoint files into a dictionary.
+    def load_checkpoints(self, checkpointDirs: Optional[Sequence[str]]) -> CheckpointIndex:
+        """Load checkpoints from the checkpoint files into an index.
 
-        The results are used to pre-populate the memoizer's lookup_table
+        The memoizer looks up results in the index when they are not in its
+        memo store.
 
         Kwargs:
              - checkpointDirs (list) : List of run folder to use as checkpoints
                Eg. ['runinfo/001', 'runinfo/002']
 
         Returns:
-             - dict containing, hashed -> future mappings
+             - CheckpointIndex mapping hashes to results
         """
         self.memo_lookup_table = None
 
         if checkpointDirs:
             return self._load_checkpoints(checkpointDirs)
         else:
-            return {}
+            return CheckpointIndex()
 
     @staticmethod
     def _log_std_streams(task_record: TaskRecord) -> None:
@@ -0,0 +1,86 @@
+import logging
+import math
+import random
+from abc import ABCMeta, abstractmethod
+from collections import Counter
+from typing import List, Sequence
+
+from parsl.executors.base import ParslExecutor
+from parsl.executors.status_handling import BlockProviderExecutor
+from parsl.utils import RepresentationMixin
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSelector(metaclass=ABCMeta):
+    """An ExecutorSelector chooses which executor a task is sent to, when its
+    app may run on more than one.
+    """
+
+    @abstractmethod
+    def select(self, choices: Sequence[ParslExecutor], data_locations: Sequence[str]) -> ParslExecutor:
+        """Choose one of choices to run a task.
+
+        data_locations holds the label of the executor on which each input of
+        the task was produced or staged in, for those inputs whose location is
+        known. An executor which holds several inputs appears several times.
+        """
+        pass
+
+
+class RandomExecutorSelector(ExecutorSelector, RepresentationMixin):
+    """Choose an executor at random.
+
+    This is the default executor selector.
+    """
+
+    def select(self, choices: Sequence[ParslExecutor], data_locations: Sequence[str]) -> ParslExecutor:
+        return random.choice(choices)
+
+
+class DataLocalitySelector(ExecutorSelector, RepresentationMixin):
+    """Choose the executor which holds the most inputs of a task, unless it is
+    much busier than the others.
+
+    Each executor is scored by the number of inputs it holds, multiplied by
+    locality_weight, less its backlog: the number of tasks it has
+    outstanding, divided by the number of workers in its blocks. The task is
+    sent to the executor with the highest score, choosing at random between
+    executors with equal scores. Executors which do not report their
+    outstanding tasks are taken to have no backlog.
+
+    Parameters
+    ----------
+    locality_weight : float
+        How many tasks per worker of additional backlog an input held by an
+        executor is worth. Default: 1
+    """
+
+    def __init__(self, locality_weight: float = 1) -> None:
+        self.locality_weight = locality_weight
+
+    def select(self, choices: Sequence[ParslExecutor], data_locations: Sequence[str]) -> ParslExecutor:
+        held = Counter(data_locations)
+        best: List[ParslExecutor] = []
+        best_score = -math.inf
+        for executor in choices:
+            score = self.locality_weight * held[executor.label] - _backlog(executor)
+            if score > best_score:
+                best, best_score = [executor], score
+            elif score == best_score:
+                best.append(executor)
+        return random.choice(best)
+
+
+def _backlog(executor: ParslExecutor) -> float:
+    """Return the number of outstanding tasks per worker of executor."""
+    if not isinstance(executor, BlockProviderExecutor):
+        return 0
+    outstanding = executor.outstanding
+    if outstanding == 0:
+        return 0
+    # Counting launched blocks, rather than asking the executor how many
+    # workers are connected, keeps selection cheap enough to do for every
+    # task.
+    capacity = len(executor.blocks) * executor.workers_per_node
+    return outstanding / max(capacity, 1)
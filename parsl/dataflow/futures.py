@@ -7,7 +7,6 @@ We have two basic types of futures:
 """
 from __future__ import annotations
 
-from concurrent.futures import Future
 import logging
 import threading
 from typing import Any, Optional, Sequence
@@ -16,6 +15,7 @@ import parsl.app.app as app
 
 from parsl.app.futures import DataFuture
 from parsl.dataflow.taskrecord import TaskRecord
+from parsl.serialize.lazy import LazyResultFuture
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +37,7 @@ _STATE_TO_DESCRIPTION_MAP = {
 }
 
 
-class AppFuture(Future):
+class AppFuture(LazyResultFuture):
     """An AppFuture wraps a sequence of Futures which may fail and be retried.
 
     The AppFuture will wait for the DFK to provide a result from an appropriate
@@ -60,6 +60,9 @@ class AppFuture(Future):
     and AppFuture will treat this an an exception for the above
     retry and result handling behaviour.
 
+    The result may be set to a SerializedResult, in which case it is
+    deserialized when .result() is first called.
+
     """
 
     def __init__(self, task_record: TaskRecord) -> None:
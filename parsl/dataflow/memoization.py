@@ -3,9 +3,13 @@ import hashlib
 from functools import lru_cache, singledispatch
 import logging
 import pickle
+from parsl.data_provider.files import File
+from parsl.dataflow.memostore import CheckpointIndex, InMemoryMemoStore, MemoStore
 from parsl.dataflow.taskrecord import TaskRecord
+from parsl.errors import OptionalModuleMissing
+from parsl.serialize.lazy import SerializedResult
 
-from typing import Dict, Any, List, Optional, TYPE_CHECKING
+from typing import Any, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from parsl import DataFlowKernel  # import loop at runtime - needed for typechecking - TODO turn into "if typing:"
@@ -46,6 +50,11 @@ def id_for_memo(obj: object, output_ref: bool = False) -> bytes:
     sense to do for output files: there is no meaningful content stored
     where an output filename points at memoization time.
     """
+    # numpy is not imported by parsl, so arrays are recognised here rather
+    # than through a registration.
+    if type(obj).__module__ == 'numpy' and type(obj).__name__ == 'ndarray':
+        return id_for_memo_ndarray(obj)
+
     logger.error("id_for_memo attempted on unknown type {}".format(type(obj)))
     raise ValueError("unknown type for memoization: {}".format(type(obj)))
 
@@ -103,6 +112,47 @@ def id_for_memo_dict(denormalized_dict: dict, output_ref: bool = False) -> bytes
     return pickle.dumps(normalized_list)
 
 
+@id_for_memo.register(bytes)
+@id_for_memo.register(bytearray)
+@id_for_memo.register(memoryview)
+def id_for_memo_bytes(obj: bytes | bytearray | memoryview, output_ref: bool = False) -> bytes:
+    """Binary data is identified by a digest of its content, rather than by
+    a copy of it, so that large buffers do not have to be pickled.
+    """
+    return pickle.dumps(["bytes", hashlib.blake2b(obj).digest()])
+
+
+def id_for_memo_ndarray(array: Any, output_ref: bool = False) -> bytes:
+    """A NumPy array is identified by its dtype and shape, and a digest of
+    its contents.
+    """
+    if array.dtype.hasobject:
+        raise ValueError("unknown type for memoization: numpy array of Python objects")
+    import numpy
+    contents = numpy.ascontiguousarray(array).data
+    return pickle.dumps(["numpy.ndarray", array.dtype.str, array.shape, hashlib.blake2b(contents).digest()])
+
+
+@id_for_memo.register(SerializedResult)
+def id_for_memo_serialized_result(result: SerializedResult, output_ref: bool = False) -> bytes:
+    # Hash the value, so that a result hashes the same whether or not it
+    # has been deserialized.
+    return id_for_memo(result.value(), output_ref=output_ref)
+
+
+@id_for_memo.register(File)
+def id_for_memo_file(file: File, output_ref: bool = False) -> bytes:
+    """A File is identified by its URL. Staging does not change the URL of
+    a File, so the result is cached on the File.
+    """
+    memo_id = getattr(file, '_memo_id', None)
+    if memo_id is None:
+        memo_id = pickle.dumps(["parsl.File", file.url])
+        file._memo_id = memo_id  # type: ignore[attr-defined]
+    assert isinstance(memo_id, bytes)
+    return memo_id
+
+
 # the LRU cache decorator must be applied closer to the id_for_memo_function call
 # that the .register() call, so that the cache-decorated version is registered.
 @id_for_memo.register(types.FunctionType)
@@ -115,6 +165,19 @@ def id_for_memo_function(f: types.FunctionType, output_ref: bool = False) -> byt
     return pickle.dumps(["types.FunctionType", f.__name__, f.__module__])
 
 
+def new_hash(algorithm: str) -> Any:
+    """Return a new hash object, for the hashlib algorithm of the given
+    name, or for 'xxhash', a 128 bit XXH3 hash from the xxhash module.
+    """
+    if algorithm == 'xxhash':
+        try:
+            import xxhash
+        except ImportError:
+            raise OptionalModuleMissing(['xxhash'], "The xxhash memo hash algorithm requires the xxhash module.")
+        return xxhash.xxh3_128()
+    return hashlib.new(algorithm)
+
+
 class Memoizer:
     """Memoizer is responsible for ensuring that identical work is not repeated.
 
@@ -138,15 +201,17 @@ class Memoizer:
               done    |
                     done
 
-    The memoizer creates a lookup table by hashing the function name
-    and its inputs, and storing the results of the function.
+    The memoizer hashes the function name and its inputs, and stores
+    the results of the function in a :class:`~parsl.dataflow.memostore.MemoStore`,
+    keyed by that hash.
 
     When a task is ready for launch, i.e., all of its arguments
     have resolved, we add its hash to the task datastructure.
 
     """
 
-    def __init__(self, dfk: DataFlowKernel, memoize: bool = True, checkpoint: Dict[str, Future[Any]] = {}):
+    def __init__(self, dfk: DataFlowKernel, memoize: bool = True, checkpoint: Optional[CheckpointIndex] = None,
+                 memo_store: Optional[MemoStore] = None, hash_algorithm: str = 'md5'):
         """Initialize the memoizer.
 
         Args:
@@ -154,17 +219,28 @@ class Memoizer:
 
         KWargs:
             - memoize (Bool): enable memoization or not.
-            - checkpoint (Dict): A checkpoint loaded as a dict.
+            - checkpoint (CheckpointIndex): Loaded checkpoints, which are
+              consulted when a result is not in the memo store.
+            - memo_store (MemoStore): Where results are stored. Default is
+              an InMemoryMemoStore.
+            - hash_algorithm (str): The hash used to combine the ids of the
+              task inputs: any algorithm in hashlib, or 'xxhash' to use the
+              xxhash module. Default is 'md5'.
         """
         self.dfk = dfk
         self.memoize = memoize
+        self.memo_store = memo_store or InMemoryMemoStore()
+
+        # Fail early on an unknown or unavailable algorithm
+        self.hash_algorithm = hash_algorithm
+        new_hash(hash_algorithm)
 
         if self.memoize:
             logger.info("App caching initialized")
-            self.memo_lookup_table = checkpoint
+            self.checkpoint = checkpoint
         else:
             logger.info("App caching disabled for all apps")
-            self.memo_lookup_table = {}
+            self.checkpoint = None
 
     def make_hash(self, task: TaskRecord) -> str:
         """Create a hash of the task inputs.
@@ -176,7 +252,7 @@ class Memoizer:
             - hash (str) : A unique hash string
         """
 
-        t: List[bytes] = []
+        h = new_hash(self.hash_algorithm)
 
         # if kwargs contains an outputs parameter, that parameter is removed
         # and normalised differently - with output_ref set to True.
@@ -194,15 +270,20 @@ class Memoizer:
         if 'outputs' in task['kwargs']:
             outputs = task['kwargs']['outputs']
             del filtered_kw['outputs']
-            t.append(id_for_memo(outputs, output_ref=True))
+            h.update(id_for_memo(outputs, output_ref=True))
 
-        t.extend(map(id_for_memo, (filtered_kw, task['func'], task['args'])))
+        # The ids are fed into the hash as they are made, rather than
+        # being joined together first.
+        for v in (filtered_kw, task['func'], task['args']):
+            h.update(id_for_memo(v))
 
-        x = b''.join(t)
-        return hashlib.md5(x).hexdigest()
+        hexdigest = h.hexdigest()
+        assert isinstance(hexdigest, str)
+        return hexdigest
 
     def check_memo(self, task: TaskRecord) -> Optional[Future[Any]]:
-        """Create a hash of the task and its inputs and check the lookup table for this hash.
+        """Create a hash of the task and its inputs and look up this hash in the
+        memo store, and then in the loaded checkpoints.
 
         If present, the results are returned.
 
@@ -224,9 +305,8 @@ class Memoizer:
 
         hashsum = self.make_hash(task)
         logger.debug("Task {} has memoization hash {}".format(task_id, hashsum))
-        result = None
-        if hashsum in self.memo_lookup_table:
-            result = self.memo_lookup_table[hashsum]
+        result = self._lookup(hashsum)
+        if result is not None:
             logger.info("Task %s using result from cache", task_id)
         else:
             logger.info("Task %s had no result in cache", task_id)
@@ -248,7 +328,22 @@ class Memoizer:
         Raises:
             - KeyError: if hash not in table
         """
-        return self.memo_lookup_table[hashsum]
+        result = self._lookup(hashsum)
+        if result is None:
+            raise KeyError(hashsum)
+        return result
+
+    def _lookup(self, hashsum: str) -> Optional[Future[Any]]:
+        """Look up a hash in the memo store, falling back to the loaded
+        checkpoints. A result found in a checkpoint is added to the memo
+        store, so that it is only loaded from the checkpoint once.
+        """
+        result = self.memo_store.get(hashsum)
+        if result is None and self.checkpoint is not None:
+            result = self.checkpoint.get(hashsum)
+            if result is not None:
+                self.memo_store.put(hashsum, result)
+        return result
 
     def update_memo(self, task: TaskRecord, r: Future[Any]) -> None:
         """Updates the memoization lookup table with the result from a task.
@@ -269,8 +364,9 @@ class Memoizer:
             logger.error("Attempting to update app cache entry but hashsum is not a string key")
             return
 
-        if task['hashsum'] in self.memo_lookup_table:
-            logger.info(f"Replacing app cache entry {task['hashsum']} with result from task {task_id}")
-        else:
-            logger.debug(f"Storing app cache entry {task['hashsum']} with result from task {task_id}")
-        self.memo_lookup_table[task['hashsum']] = r
+        logger.debug(f"Storing app cache entry {task['hashsum']} with result from task {task_id}")
+        self.memo_store.put(task['hashsum'], r)
+
+    def close(self) -> None:
+        """Close the memo store."""
+        self.memo_store.close()
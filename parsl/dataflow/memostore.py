@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import zlib
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
+from typing import OrderedDict as OrderedDictType
+
+from parsl.utils import RepresentationMixin
+
+logger = logging.getLogger(__name__)
+
+
+class MemoStore(metaclass=ABCMeta):
+    """A MemoStore holds the results of tasks for the
+    :class:`~parsl.dataflow.memoization.Memoizer`, keyed by the memoization
+    hashsum of each task.
+    """
+
+    @abstractmethod
+    def get(self, hashsum: str) -> Optional[Future[Any]]:
+        """Return the result stored for hashsum, as a completed Future, or
+        None if there is no result stored.
+        """
+        pass
+
+    @abstractmethod
+    def put(self, hashsum: str, result: Future[Any]) -> None:
+        """Store the result of a task, as a completed Future, replacing
+        any existing result for hashsum.
+        """
+        pass
+
+    def close(self) -> None:
+        """Release any resources held by the store. This is called when the
+        DataFlowKernel is cleaned up.
+        """
+        pass
+
+
+class InMemoryMemoStore(MemoStore, RepresentationMixin):
+    """Hold task results in memory, for the lifetime of the DataFlowKernel.
+
+    This is the default memo store.
+    """
+
+    def __init__(self) -> None:
+        self._results: Dict[str, Future[Any]] = {}
+
+    def get(self, hashsum: str) -> Optional[Future[Any]]:
+        return self._results.get(hashsum)
+
+    def put(self, hashsum: str, result: Future[Any]) -> None:
+        self._results[hashsum] = result
+
+
+class SQLiteMemoStore(MemoStore, RepresentationMixin):
+    """Hold task results in an SQLite database, so that they persist across
+    workflow runs.
+
+    Successful results are pickled into the database as soon as their
+    tasks complete, and are only unpickled when a later task with the same
+    hashsum looks them up. Failed results, and results which cannot be
+    pickled, are only held in memory for the current run, and only the
+    most recently used memory_size of them are kept.
+
+    Parameters
+    ----------
+    path : str
+        Path of the SQLite database file, which is created if it does not
+        exist. Default: 'memo.db'
+
+    memory_size : int
+        The number of results which are not persisted to keep in memory.
+        Default: 1024
+    """
+
+    def __init__(self, path: str = 'memo.db', memory_size: int = 1024) -> None:
+        self.path = path
+        self.memory_size = memory_size
+        self._futures: OrderedDictType[str, Future[Any]] = OrderedDict()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            logger.info("Opening memo database {}".format(self.path))
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS memo (hash TEXT PRIMARY KEY, result BLOB NOT NULL)")
+            self._connection.commit()
+        return self._connection
+
+    def get(self, hashsum: str) -> Optional[Future[Any]]:
+        with self._lock:
+            if hashsum in self._futures:
+                self._futures.move_to_end(hashsum)
+                return self._futures[hashsum]
+            row = self._connect().execute("SELECT result FROM memo WHERE hash = ?", (hashsum,)).fetchone()
+        if row is None:
+            return None
+        fu: Future[Any] = Future()
+        fu.set_result(pickle.loads(row[0]))
+        return fu
+
+    def put(self, hashsum: str, result: Future[Any]) -> None:
+        pickled_result = None
+        if result.done() and result.exception() is None:
+            try:
+                pickled_result = pickle.dumps(result.result())
+            except Exception:
+                logger.warning("Result for hashsum {} cannot be pickled, so will not be persisted".format(hashsum), exc_info=True)
+        with self._lock:
+            if pickled_result is None:
+                self._futures[hashsum] = result
+                self._futures.move_to_end(hashsum)
+                while len(self._futures) > self.memory_size:
+                    self._futures.popitem(last=False)
+            else:
+                self._futures.pop(hashsum, None)
+                connection = self._connect()
+                connection.execute("INSERT OR REPLACE INTO memo (hash, result) VALUES (?, ?)", (hashsum, pickled_result))
+                connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def write_checkpoint_record(index_file: BinaryIO, checkpoint_dir: str, hashsum: str, result: Any,
+                            compress: bool = False) -> None:
+    """Append the result of a task to a checkpoint.
+
+    The pickled result is stored in the results directory of the
+    checkpoint, in a file named by the digest of its content, so that
+    identical results are only stored once. A small record giving the
+    hashsum and the result file is appended to index_file. Keeping results
+    out of the index lets a :class:`CheckpointIndex` load the checkpoint
+    without reading them.
+
+    If compress is True, the result file is compressed with zlib.
+    """
+    pickled_result = pickle.dumps(result)
+    result_file = os.path.join('results', hashlib.sha256(pickled_result).hexdigest())
+    if compress:
+        result_file += '.zlib'
+
+    result_path = os.path.join(checkpoint_dir, result_file)
+    if not os.path.exists(result_path):
+        os.makedirs(os.path.dirname(result_path), exist_ok=True)
+        data = zlib.compress(pickled_result) if compress else pickled_result
+        # Write under a temporary name, so that an interrupted write does
+        # not leave a truncated result under its digest.
+        tmp_path = '{}.{}.tmp'.format(result_path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, result_path)
+
+    pickle.dump({'hash': hashsum,
+                 'exception': None,
+                 'result_file': result_file,
+                 'result_compressed': compress},
+                index_file)
+
+
+class CheckpointIndex:
+    """An index of the results in a set of checkpoints.
+
+    Loading a checkpoint only reads its index records, which name the file
+    holding each result. A result is read and unpickled only when a task
+    with its hashsum is looked up, so that large checkpoints are quick to
+    load and do not need to fit in memory.
+    """
+
+    def __init__(self) -> None:
+        # Either the location of a result, as (path, compressed), or (for
+        # checkpoints written before results were stored separately) the
+        # result itself.
+        self._entries: Dict[str, Union[Tuple[str, bool], Future[Any]]] = {}
+
+    def load(self, checkpoint_file: str) -> None:
+        """Add the records in a checkpoint index file to the index. Records
+        for a hashsum already in the index replace the existing entry.
+        """
+        checkpoint_dir = os.path.dirname(checkpoint_file)
+        with open(checkpoint_file, 'rb') as f:
+            while True:
+                try:
+                    record = pickle.load(f)
+                except EOFError:
+                    # Done with the checkpoint file
+                    break
+                assert record['exception'] is None
+                if 'result' in record:
+                    memo_fu: Future[Any] = Future()
+                    memo_fu.set_result(record['result'])
+                    self._entries[record['hash']] = memo_fu
+                else:
+                    self._entries[record['hash']] = (os.path.join(checkpoint_dir, record['result_file']),
+                                                     record.get('result_compressed', False))
+
+    def get(self, hashsum: str) -> Optional[Future[Any]]:
+        """Return the checkpointed result for hashsum, as a completed Future,
+        or None if there is no checkpointed result.
+        """
+        entry = self._entries.get(hashsum)
+        if entry is None or isinstance(entry, Future):
+            return entry
+
+        result_path, compressed = entry
+        with open(result_path, 'rb') as f:
+            data = f.read()
+        result = pickle.loads(zlib.decompress(data) if compressed else data)
+        memo_fu: Future[Any] = Future()
+        memo_fu.set_result(result)
+        return memo_fu
+
+    def __len__(self) -> int:
+        return len(self._entries)
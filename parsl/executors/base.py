@@ -1,6 +1,6 @@
 from abc import ABCMeta, abstractmethod
 from concurrent.futures import Future
-from typing import Any, Callable, Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List, Sequence, Tuple
 from typing_extensions import Literal, Self
 
 from parsl.jobs.states import JobStatus
@@ -40,10 +40,18 @@ class ParslExecutor(metaclass=ABCMeta):
               invariant, not co-variant, and it looks like @typeguard cannot be
               persuaded otherwise. So if you're implementing an executor and want to
               @typeguard the constructor, you'll have to use List[Any] here.
+
+       accepts_serialized_results: bool - if True, the results of earlier
+              tasks may be passed to submit as
+              :class:`~parsl.serialize.lazy.SerializedResult` objects, rather
+              than as their values. This is only correct for executors which
+              pickle task arguments on their way to the task, as unpickling a
+              SerializedResult deserializes it. Default: False
     """
 
     label: str = "undefined"
     radio_mode: str = "udp"
+    accepts_serialized_results: bool = False
 
     def __enter__(self) -> Self:
         return self
@@ -71,6 +79,31 @@ class ParslExecutor(metaclass=ABCMeta):
         """
         pass
 
+    def submit_many(self, tasks: Sequence[Tuple[Callable, Dict[str, Any], Sequence[Any], Dict[str, Any]]]) -> List[Future]:
+        """Submit a batch of tasks.
+
+        Each element of tasks is a tuple of (func, resource_specification,
+        args, kwargs), with the same meaning as the corresponding parameters
+        of ``submit``. The returned list contains one Future per task, in the
+        same order as tasks.
+
+        This default implementation calls ``submit`` once per task. A task
+        which ``submit`` rejects does not prevent the rest of the batch from
+        being submitted: its Future is returned already failed with the
+        error. Executors which can amortize per-task costs (such as locking,
+        serialization or network round trips) over a batch should override
+        this.
+        """
+        futs = []
+        for (func, resource_specification, args, kwargs) in tasks:  # type: ignore[misc]
+            try:
+                fut = self.submit(func, resource_specification, *args, **kwargs)  # type: ignore[misc]
+            except Exception as e:
+                fut = Future()
+                fut.set_exception(e)  # type: ignore[misc]
+            futs.append(fut)  # type: ignore[misc]
+        return futs  # type: ignore[misc]
+
     @abstractmethod
     def shutdown(self) -> None:
         """Shutdown the executor.
@@ -10,3 +10,31 @@ class WorkerLost(Exception):
 
     def __str__(self):
         return self.__repr__()
+
+
+class MissingFunction(Exception):
+    """Exception raised when a task arrives at a worker without its function,
+    and the function is not in the worker's cache
+    """
+    def __init__(self, digest):
+        self.digest = digest
+
+    def __repr__(self):
+        return "Task failure due to function {} missing from the worker function cache".format(self.digest.hex())
+
+    def __str__(self):
+        return self.__repr__()
+
+
+class ResultCacheMiss(Exception):
+    """Exception raised when a task refers to a result in the node-local
+    result cache, and the result is not cached on the node running the task
+    """
+    def __init__(self, key):
+        self.key = key
+
+    def __repr__(self):
+        return "Task failure due to result {} missing from the node-local result cache".format(self.key)
+
+    def __str__(self):
+        return self.__repr__()
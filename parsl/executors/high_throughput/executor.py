@@ -1,21 +1,27 @@
 import typing
 from collections import defaultdict
-from concurrent.futures import Future
+from concurrent.futures import Future, ThreadPoolExecutor
 import typeguard
 import logging
 import threading
+import time
 import queue
 import datetime
+import os
 import pickle
+import uuid
 from dataclasses import dataclass
 from multiprocessing import Process, Queue
 from typing import Dict, Sequence
 from typing import List, Optional, Tuple, Union, Callable
 import math
 import warnings
+import functools
 
 import parsl.launchers
-from parsl.serialize import pack_res_spec_apply_message, deserialize
+from parsl.serialize import serialize, deserialize
+from parsl.serialize.buffers import pack_buffers
+from parsl.serialize.lazy import LazyResultFuture, SerializedResult
 from parsl.serialize.errors import SerializationError, DeserializationError
 from parsl.app.errors import RemoteExceptionWrapper
 from parsl.jobs.states import JobStatus, JobState
@@ -26,8 +32,13 @@ from parsl.executors.errors import (
 )
 from parsl.executors.high_throughput.mpi_prefix_composer import (
     VALID_LAUNCHERS,
+    InvalidResourceSpecification,
     validate_resource_spec
 )
+from parsl.executors.high_throughput.manager_selector import ManagerSelector, RoundRobinManagerSelector
+from parsl.executors.high_throughput.function_cache import FunctionCache, function_digest
+from parsl.executors.high_throughput.errors import ResultCacheMiss
+from parsl.executors.high_throughput.result_cache import CachedResult, CachedResultRef
 
 from parsl import curvezmq
 from parsl.executors.status_handling import BlockProviderExecutor
@@ -60,9 +71,23 @@ DEFAULT_LAUNCH_CMD = ("process_worker_pool.py {debug} {max_workers_per_node} "
                       "--cpu-affinity {cpu_affinity} "
                       "{enable_mpi_mode} "
                       "--mpi-launcher={mpi_launcher} "
+                      "--mpi_slots_per_node={mpi_slots_per_node} "
+                      "--function_cache_size={function_cache_size} "
+                      "--result_cache_dir={result_cache_dir} "
+                      "--result_cache_size={result_cache_size} "
+                      "--shm_threshold={shm_threshold} "
                       "--available-accelerators {accelerators}")
 
 
+@functools.lru_cache
+def _serialize_function(func: Callable) -> Tuple[bytes, bytes]:
+    """Serialize a function and compute its digest, once per function
+    object, on the same assumption as the serializer that callables are
+    immutable."""
+    fn = serialize(func, buffer_threshold=1024 * 1024)
+    return fn, function_digest(fn)
+
+
 class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
     """Executor designed for cluster-scale
 
@@ -186,6 +211,38 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
         When there are a few tasks (<100) or when tasks are long running, this option should
         be set to 0 for better load balancing. Default is 0.
 
+    function_cache_size : int
+        Number of distinct app functions the interchange, each manager and each worker
+        keeps cached. A function is sent to the interchange, sent on to a manager, and
+        deserialized by a worker, only when it is not already in that cache, rather than
+        with every task. Default is 128.
+
+    result_threads : int
+        Number of threads which deserialize task results and complete the corresponding
+        futures, running any callbacks attached to them. Results are received on a thread
+        of their own, so that one large result or slow callback does not hold up the delivery
+        of other results. If 0, results are deserialized and completed on the receiving
+        thread. Default is 4.
+
+    result_cache_dir : str | None
+        Node-local directory, such as a local scratch or ``/tmp`` directory, in which workers
+        keep the result of each task. When a task depends on the result of an earlier task on
+        this executor, it is sent a reference to that result rather than the result itself,
+        and the worker reads the result from the cache on its node. If the result is not cached
+        on the node which runs the task, the task is sent again with the result included.
+        Cached results are removed when their worker pool exits. If None, results are not
+        cached. Default is None.
+
+    result_cache_size : int
+        Size in bytes beyond which the least recently used results are removed from the
+        result cache of each worker pool. Default is 1 GiB.
+
+    shared_memory_threshold : int | None
+        Size in bytes from which task arguments and results are passed between a manager and
+        its workers through files in ``/dev/shm``, rather than being pickled through
+        multiprocessing queues, which copy them through pipes. If None, or on nodes without
+        ``/dev/shm``, everything goes through the queues. Default is 1 MiB.
+
     address_probe_timeout : int | None
         Managers attempt connecting over many different addresses to determine a viable address.
         This option sets a time limit in seconds on the connection attempt.
@@ -225,8 +282,25 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
         list of supported MPI launchers = ("srun", "aprun", "mpiexec").
         default: "mpiexec"
 
+    mpi_slots_per_node: int | None
+        This field is only used if enable_mpi_mode is set. The number of MPI ranks
+        which may run on each node at once. Tasks occupy ``ranks_per_node`` slots on
+        each of their nodes, so that tasks with few ranks per node can share nodes.
+        If None, each task is given whole nodes. Default is None.
+
     encrypted : bool
         Flag to enable/disable encryption (CurveZMQ). Default is False.
+
+    manager_selector : :class:`~parsl.executors.high_throughput.manager_selector.ManagerSelector`
+        Determines the order in which the interchange offers tasks to managers. Options include
+        :class:`~parsl.executors.high_throughput.manager_selector.RoundRobinManagerSelector` to spread
+        tasks evenly across managers,
+        :class:`~parsl.executors.high_throughput.manager_selector.RandomManagerSelector`,
+        :class:`~parsl.executors.high_throughput.manager_selector.LeastLoadedManagerSelector` to favour
+        the least busy managers, and
+        :class:`~parsl.executors.high_throughput.manager_selector.PackingManagerSelector` to fill busy
+        managers first so that idle blocks can be scaled in.
+        Default: RoundRobinManagerSelector()
     """
 
     @typeguard.typechecked
@@ -248,6 +322,11 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
                  cpu_affinity: str = 'none',
                  available_accelerators: Union[int, Sequence[str]] = (),
                  prefetch_capacity: int = 0,
+                 function_cache_size: int = 128,
+                 result_threads: int = 4,
+                 result_cache_dir: Optional[str] = None,
+                 result_cache_size: int = 1024 ** 3,
+                 shared_memory_threshold: Optional[int] = 1024 * 1024,
                  heartbeat_threshold: int = 120,
                  heartbeat_period: int = 30,
                  drain_period: Optional[int] = None,
@@ -256,8 +335,10 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
                  worker_logdir_root: Optional[str] = None,
                  enable_mpi_mode: bool = False,
                  mpi_launcher: str = "mpiexec",
+                 mpi_slots_per_node: Optional[int] = None,
                  block_error_handler: Union[bool, Callable[[BlockProviderExecutor, Dict[str, JobStatus]], None]] = True,
-                 encrypted: bool = False):
+                 encrypted: bool = False,
+                 manager_selector: ManagerSelector = RoundRobinManagerSelector()):
 
         logger.debug("Initializing HighThroughputExecutor")
 
@@ -269,6 +350,19 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
         self.cores_per_worker = cores_per_worker
         self.mem_per_worker = mem_per_worker
         self.prefetch_capacity = prefetch_capacity
+        self.function_cache_size = function_cache_size
+        self.result_threads = result_threads
+        self._result_pool: Optional[ThreadPoolExecutor] = None
+        self.result_cache_dir = result_cache_dir
+        self.result_cache_size = result_cache_size
+        self.shared_memory_threshold = shared_memory_threshold
+        # Identifies the results cached by the workers of this executor in
+        # this run, set when the executor starts.
+        self._result_cache_id: Optional[str] = None
+        # The arguments of tasks which were sent references to cached
+        # results, so that they can be sent again with the results included
+        # if the results are not cached where the tasks run.
+        self._cache_fallbacks: Dict[int, Tuple[Callable, Dict[str, typing.Any], Sequence, Dict[str, typing.Any]]] = {}
         self.address = address
         self.address_probe_timeout = address_probe_timeout
         if self.address:
@@ -305,6 +399,14 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
             self._workers_per_node = 1  # our best guess-- we do not have any provider hints
 
         self._task_counter = 0
+
+        # The digests of the functions which the interchange has cached,
+        # mirroring the interchange's own function cache. Tasks are sent
+        # under _send_lock, so that this sees the same order of tasks as the
+        # interchange does.
+        self._interchange_functions: FunctionCache[bool] = FunctionCache(function_cache_size)
+        self._send_lock = threading.Lock()
+
         self.run_id = None  # set to the correct run_id in dfk
         self.hub_address = None  # set to the correct hub address in dfk
         self.hub_port = None  # set to the correct hub port in dfk
@@ -321,6 +423,7 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
         self.cpu_affinity = cpu_affinity
         self.encrypted = encrypted
         self.cert_dir = None
+        self.manager_selector = manager_selector
 
         self.enable_mpi_mode = enable_mpi_mode
         assert mpi_launcher in VALID_LAUNCHERS, \
@@ -330,12 +433,24 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
                 "mpi_mode requires the provider to be configured to use a SingleNodeLauncher"
 
         self.mpi_launcher = mpi_launcher
+        self.mpi_slots_per_node = mpi_slots_per_node
+
+        # The connected managers and the blocks which have ever connected,
+        # kept up to date from the manager events pushed by the interchange.
+        self._manager_events_lock = threading.Lock()
+        self._managers: Dict[str, Dict[str, typing.Any]] = {}
+        self._connected_block_history: List[str] = []
+
+        # The most recent status of each block, as reported by the provider
+        # or, for blocks with connected managers, by manager events.
+        self._block_status: Dict[str, JobStatus] = {}
 
         if not launch_cmd:
             launch_cmd = DEFAULT_LAUNCH_CMD
         self.launch_cmd = launch_cmd
 
     radio_mode = "htex"
+    accepts_serialized_results = True
 
     def _warn_deprecated(self, old: str, new: str):
         warnings.warn(
@@ -365,6 +480,12 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
             return "{}/{}".format(self.worker_logdir_root, self.label)
         return self.logdir
 
+    @property
+    def _result_cache_path(self) -> Optional[str]:
+        if self.result_cache_dir is None or self._result_cache_id is None:
+            return None
+        return os.path.join(self.result_cache_dir, self._result_cache_id)
+
     def initialize_scaling(self):
         """Compose the launch command and scale out the initial blocks.
         """
@@ -395,6 +516,11 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
                                        cpu_affinity=self.cpu_affinity,
                                        enable_mpi_mode=enable_mpi_opts,
                                        mpi_launcher=self.mpi_launcher,
+                                       mpi_slots_per_node=self.mpi_slots_per_node,
+                                       function_cache_size=self.function_cache_size,
+                                       result_cache_dir=self._result_cache_path,
+                                       result_cache_size=self.result_cache_size,
+                                       shm_threshold=self.shared_memory_threshold,
                                        accelerators=" ".join(self.available_accelerators))
         self.launch_cmd = l_cmd
         logger.debug("Launch command: {}".format(self.launch_cmd))
@@ -424,6 +550,13 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
             curvezmq.ClientContext(self.cert_dir), "127.0.0.1", self.interchange_port_range
         )
 
+        if self.result_cache_dir:
+            self._result_cache_id = uuid.uuid4().hex
+
+        if self.result_threads > 0:
+            self._result_pool = ThreadPoolExecutor(max_workers=self.result_threads,
+                                                   thread_name_prefix="HTEX-Result-Processing")
+
         self._queue_management_thread = None
         self._start_queue_management_thread()
         self._start_local_interchange_process()
@@ -483,6 +616,8 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
 
                         if msg['type'] == 'heartbeat':
                             continue
+                        elif msg['type'] == 'manager':
+                            self._handle_manager_event(msg)
                         elif msg['type'] == 'result':
                             try:
                                 tid = msg['task_id']
@@ -496,35 +631,79 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
                                 break
 
                             task_fut = self.tasks.pop(tid)
+                            fallback = self._cache_fallbacks.pop(tid, None)
 
-                            if 'result' in msg:
-                                result = deserialize(msg['result'])
-                                task_fut.set_result(result)
-
-                            elif 'exception' in msg:
-                                try:
-                                    s = deserialize(msg['exception'])
-                                    # s should be a RemoteExceptionWrapper... so we can reraise it
-                                    if isinstance(s, RemoteExceptionWrapper):
-                                        try:
-                                            s.reraise()
-                                        except Exception as e:
-                                            task_fut.set_exception(e)
-                                    elif isinstance(s, Exception):
-                                        task_fut.set_exception(s)
-                                    else:
-                                        raise ValueError("Unknown exception-like type received: {}".format(type(s)))
-                                except Exception as e:
-                                    # TODO could be a proper wrapped exception?
-                                    task_fut.set_exception(
-                                        DeserializationError("Received exception, but handling also threw an exception: {}".format(e)))
+                            if self._result_pool is None:
+                                self._complete_task(task_fut, msg, fallback)
                             else:
-                                raise BadMessage("Message received is neither result or exception")
+                                self._result_pool.submit(self._complete_task, task_fut, msg, fallback)
                         else:
                             raise BadMessage("Message received with unknown type {}".format(msg['type']))
 
         logger.info("Queue management worker finished")
 
+    @wrap_with_logs
+    def _complete_task(self, task_fut: Future, msg: Dict[str, typing.Any], fallback=None) -> None:
+        """Complete the future of a task with the result or exception in a
+        result message.
+
+        If the task failed because a result it refers to was not in the
+        result cache of its node, and fallback holds the task's original
+        arguments, the task is sent again with those results included.
+        """
+        if 'result' in msg:
+            # The result is only deserialized when it is needed, which might
+            # be never, if it is only passed on to other tasks on this
+            # executor.
+            if msg.get('cached') and self._result_cache_id is not None:
+                task_fut.set_result(CachedResult(msg['result'], self._result_cache_id, str(msg['task_id'])))
+            else:
+                task_fut.set_result(SerializedResult(msg['result']))
+
+        elif 'exception' in msg:
+            try:
+                s = deserialize(msg['exception'])
+                # s should be a RemoteExceptionWrapper... so we can reraise it
+                if isinstance(s, RemoteExceptionWrapper):
+                    try:
+                        s.reraise()
+                    except ResultCacheMiss as e:
+                        if fallback is None:
+                            task_fut.set_exception(e)
+                        else:
+                            logger.info("Sending task {} again after {}".format(msg['task_id'], e))
+                            self._send_without_cache_references(msg['task_id'], task_fut, fallback)
+                    except Exception as e:
+                        task_fut.set_exception(e)
+                elif isinstance(s, Exception):
+                    task_fut.set_exception(s)
+                else:
+                    raise ValueError("Unknown exception-like type received: {}".format(type(s)))
+            except Exception as e:
+                # TODO could be a proper wrapped exception?
+                task_fut.set_exception(
+                    DeserializationError("Received exception, but handling also threw an exception: {}".format(e)))
+        else:
+            task_fut.set_exception(BadMessage("Message received is neither result or exception"))
+
+    def _handle_manager_event(self, msg: Dict[str, typing.Any]) -> None:
+        """Update the record of connected managers from a manager event sent
+        by the interchange."""
+        logger.debug("Manager event: {}".format(msg))
+        manager_id = msg['manager']
+        with self._manager_events_lock:
+            if msg['event'] == 'registered':
+                self._managers[manager_id] = {'block_id': msg['block_id'],
+                                              'idle_since': msg['timestamp']}
+                self._connected_block_history.append(msg['block_id'])
+            elif msg['event'] in ('drained', 'lost'):
+                self._managers.pop(manager_id, None)
+            elif manager_id in self._managers:
+                if msg['event'] == 'idle':
+                    self._managers[manager_id]['idle_since'] = msg['timestamp']
+                elif msg['event'] == 'busy':
+                    self._managers[manager_id]['idle_since'] = None
+
     def _start_local_interchange_process(self):
         """ Starts the interchange process locally
 
@@ -547,6 +726,8 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
                                                     "poll_period": self.poll_period,
                                                     "logging_level": logging.DEBUG if self.worker_debug else logging.INFO,
                                                     "cert_dir": self.cert_dir,
+                                                    "manager_selector": self.manager_selector,
+                                                    "function_cache_size": self.function_cache_size,
                                                     },
                                             daemon=True,
                                             name="HTEX-Interchange"
@@ -591,9 +772,9 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
 
     @property
     def outstanding(self) -> int:
-        """Returns the count of tasks outstanding across the interchange
-        and managers"""
-        return self.command_client.run("OUTSTANDING_C")
+        """Returns the count of tasks which have been submitted and have
+        not yet returned a result"""
+        return len(self.tasks)
 
     @property
     def connected_workers(self) -> int:
@@ -609,21 +790,35 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
 
     def connected_blocks(self) -> List[str]:
         """List of connected block ids"""
-        return self.command_client.run("CONNECTED_BLOCKS")
-
-    def _hold_block(self, block_id):
-        """ Sends hold command to all managers which are in a specific block
+        with self._manager_events_lock:
+            return list(self._connected_block_history)
+
+    def _idle_blocks(self, max_idletime: float) -> List[str]:
+        """List of block ids all of whose connected managers have been idle
+        for longer than max_idletime, according to manager events."""
+        now = time.time()
+        busy = set()
+        blocks = set()
+        with self._manager_events_lock:
+            for m in self._managers.values():
+                blocks.add(m['block_id'])
+                if m['idle_since'] is None or now - m['idle_since'] <= max_idletime:
+                    busy.add(m['block_id'])
+        return list(blocks - busy)
+
+    def _hold_blocks(self, block_ids: List[str]) -> None:
+        """ Sends hold command to all managers which are in the specified blocks
 
         Parameters
         ----------
-        block_id : str
-             Block identifier of the block to be put on hold
+        block_ids : list of str
+             Block identifiers of the blocks to be put on hold
         """
 
         managers = self.connected_managers()
 
         for manager in managers:
-            if manager['block_id'] == block_id:
+            if manager['block_id'] in block_ids:
                 logger.debug("Sending hold to manager: {}".format(manager['manager']))
                 self.hold_worker(manager['manager'])
 
@@ -650,6 +845,62 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
         if self.bad_state_is_set:
             raise self.executor_exception
 
+        fut, msg = self._prepare_task(func, resource_specification, args, kwargs)
+
+        # Post task to the outgoing queue
+        self._send_tasks([msg])
+
+        # Return the future
+        return fut
+
+    def submit_many(self, tasks):
+        """Submits a batch of tasks to the outgoing_q as a single message.
+
+        Each element of tasks is a tuple of (func, resource_specification,
+        args, kwargs). All tasks in the batch are serialized and then sent to
+        the interchange together, so that the cost of a ZMQ send is paid
+        once per batch rather than once per task.
+
+        A task which has an invalid resource specification, or which cannot
+        be serialized, does not prevent the rest of the batch from being
+        sent: its Future is returned already failed with the error.
+
+        Returns:
+              List of Futures, in the same order as tasks
+        """
+        if self.bad_state_is_set:
+            raise self.executor_exception
+
+        futs = []
+        msgs = []
+        for (func, resource_specification, args, kwargs) in tasks:
+            try:
+                validate_resource_spec(resource_specification)
+                fut, msg = self._prepare_task(func, resource_specification, args, kwargs)
+            except (InvalidResourceSpecification, ValueError, SerializationError) as e:
+                fut = Future()
+                fut.set_exception(e)
+            else:
+                msgs.append(msg)
+            futs.append(fut)
+
+        if msgs:
+            logger.debug("Pushing batch of {} tasks to queue".format(len(msgs)))
+            self._send_tasks(msgs)
+
+        return futs
+
+    def _prepare_task(self, func, resource_specification, args, kwargs):
+        """Allocate an executor task ID and Future for a task, and serialize it
+        into a message for the interchange.
+
+        The Future is only registered in self.tasks once serialization has
+        succeeded, so that a task which fails to serialize does not linger as
+        outstanding.
+
+        Returns:
+              (Future, message dict)
+        """
         self._task_counter += 1
         task_id = self._task_counter
 
@@ -658,24 +909,88 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
             args_to_print = tuple([ar if len(ar := repr(arg)) < 100 else (ar[:100] + '...') for arg in args])
             logger.debug("Pushing function {} to queue with args {}".format(func, args_to_print))
 
-        fut = Future()
+        sent_args, sent_kwargs = args, kwargs
+        if self._result_cache_id is not None:
+            sent_args, sent_kwargs = self._reference_cached_results(args, kwargs)
+        msg = self._task_message(task_id, func, resource_specification, sent_args, sent_kwargs)
+
+        fut = LazyResultFuture()
         fut.parsl_executor_task_id = task_id
         self.tasks[task_id] = fut
-
+        if sent_args is not args or sent_kwargs is not kwargs:
+            self._cache_fallbacks[task_id] = (func, resource_specification, args, kwargs)
+
+        return fut, msg
+
+    def _task_message(self, task_id, func, resource_specification, args, kwargs):
+        """Serialize a task into a message for the interchange."""
+        # The function is sent alongside the buffer, rather than packed into
+        # it, so that it can be left out for the interchange and managers
+        # which already have it cached. Its slot in the buffer is left empty.
+        # The resource specification travels in the message header, so that
+        # the manager can schedule the task without deserializing the buffer.
         try:
-            fn_buf = pack_res_spec_apply_message(func, args, kwargs,
-                                                 resource_specification=resource_specification,
-                                                 buffer_threshold=1024 * 1024)
+            fn, digest = _serialize_function(func)
+            fn_buf = pack_buffers([b'',
+                                   serialize(args, buffer_threshold=1024 * 1024),
+                                   serialize(kwargs, buffer_threshold=1024 * 1024)])
         except TypeError:
             raise SerializationError(func.__name__)
 
-        msg = {"task_id": task_id, "buffer": fn_buf}
+        return {"task_id": task_id,
+                "function_digest": digest,
+                "resource_spec": resource_specification,
+                "function": fn,
+                "buffer": fn_buf}
 
-        # Post task to the outgoing queue
-        self.outgoing_q.put(msg)
+    def _reference_cached_results(self, args, kwargs):
+        """Replace the results in a task's arguments which are held in the
+        result caches of this executor's workers with references to them, in
+        the places where the DataFlowKernel substitutes results for futures.
 
-        # Return the future
-        return fut
+        Returns the new args and kwargs, which are the objects passed in if
+        nothing was replaced.
+        """
+        replaced = False
+
+        def reference(arg):
+            nonlocal replaced
+            if isinstance(arg, CachedResult) and arg.cache_id == self._result_cache_id:
+                replaced = True
+                return CachedResultRef(arg.key)
+            return arg
+
+        new_args = tuple(reference(arg) for arg in args)
+        new_kwargs = {key: reference(value) for key, value in kwargs.items()}
+        if isinstance(kwargs.get('inputs'), list):
+            new_kwargs['inputs'] = [reference(dep) for dep in kwargs['inputs']]
+
+        if not replaced:
+            return args, kwargs
+        return new_args, new_kwargs
+
+    def _send_without_cache_references(self, task_id, task_fut, fallback):
+        """Send a task again, with the cached results it refers to included
+        in its arguments, completing its future with any error."""
+        func, resource_specification, args, kwargs = fallback
+        try:
+            msg = self._task_message(task_id, func, resource_specification, args, kwargs)
+        except Exception as e:
+            task_fut.set_exception(e)
+            return
+        self.tasks[task_id] = task_fut
+        self._send_tasks([msg])
+
+    def _send_tasks(self, msgs):
+        """Send task messages to the interchange, leaving out the body of
+        each function which the interchange already has cached."""
+        with self._send_lock:
+            for msg in msgs:
+                if self._interchange_functions.get(msg['function_digest']):
+                    msg['function'] = b''
+                else:
+                    self._interchange_functions.put(msg['function_digest'], True)
+            self.outgoing_q.put_many(msgs)
 
     def create_monitoring_info(self, status):
         """ Create a msg for monitoring based on the poll status
@@ -725,6 +1040,12 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
         """
         logger.debug(f"Scale in called, blocks={blocks}")
 
+        # Only ask the interchange for the state of its managers if there
+        # might be a block idle for long enough to be scaled in.
+        if max_idletime is not None and not self._idle_blocks(max_idletime):
+            logger.debug("No blocks have been idle for longer than max_idletime")
+            return []
+
         @dataclass
         class BlockInfo:
             tasks: int  # sum of tasks in this block
@@ -761,9 +1082,8 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
             if len(block_ids_to_kill) < blocks:
                 logger.warning(f"Could not find enough blocks to kill: wanted {blocks} but only selected {len(block_ids_to_kill)}")
 
-        # Hold the block
-        for block_id in block_ids_to_kill:
-            self._hold_block(block_id)
+        # Hold the blocks
+        self._hold_blocks(block_ids_to_kill)
 
         # Now kill via provider
         # Potential issue with multiple threads trying to remove the same blocks
@@ -775,6 +1095,8 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
         # to_kill block_ids are fetched from self.blocks
         # If a block_id is in self.block, it must exist in self.block_mapping
         block_ids_killed = [self.block_mapping[jid] for jid in job_ids]
+        for block_id in block_ids_killed:
+            self._block_status[block_id] = JobStatus(JobState.CANCELLED)
 
         return block_ids_killed
 
@@ -784,20 +1106,52 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
         launch_cmd = self.launch_cmd.format(block_id=block_id)
         return launch_cmd
 
-    def status(self) -> Dict[str, JobStatus]:
-        job_status = super().status()
-        connected_blocks = self.connected_blocks()
-        for job_id in job_status:
-            job_info = job_status[job_id]
-            if job_info.terminal and job_id not in connected_blocks:
-                job_status[job_id].state = JobState.MISSING
-                if job_status[job_id].message is None:
-                    job_status[job_id].message = (
+    def status_job_ids(self) -> List[typing.Any]:
+        """Return the ids of the jobs which the provider must be asked the
+        status of.
+
+        A block with a manager connected to the interchange is running, and
+        a block which has finished stays finished, so the provider is only
+        asked for the status of the other blocks: those which are still
+        queued, or which have lost their managers. When every block is
+        running or finished, no scheduler command needs to be run.
+        """
+        with self._manager_events_lock:
+            running_blocks = {m['block_id'] for m in self._managers.values()}
+
+        block_ids, job_ids = self._get_block_and_job_ids()
+        return [job_id for block_id, job_id in zip(block_ids, job_ids)
+                if block_id not in running_blocks and
+                not (block_id in self._block_status and self._block_status[block_id].terminal)]
+
+    def status_from_jobs(self, job_status: Dict[typing.Any, JobStatus]) -> Dict[str, JobStatus]:
+        """Return the status of all blocks of this executor, given the status
+        reported by the provider for the jobs returned by status_job_ids."""
+        with self._manager_events_lock:
+            running_blocks = {m['block_id'] for m in self._managers.values()}
+            connected_blocks = set(self._connected_block_history)
+
+        block_ids, job_ids = self._get_block_and_job_ids()
+        for block_id, job_id in zip(block_ids, job_ids):
+            if job_id in job_status:
+                self._block_status[block_id] = job_status[job_id]
+
+        status = {}
+        for block_id in block_ids:
+            if block_id in running_blocks and not (block_id in self._block_status and self._block_status[block_id].terminal):
+                self._block_status[block_id] = JobStatus(JobState.RUNNING)
+            job_info = self._block_status.setdefault(block_id, JobStatus(JobState.PENDING))
+            if job_info.terminal and block_id not in connected_blocks:
+                job_info.state = JobState.MISSING
+                if job_info.message is None:
+                    job_info.message = (
                         "Job is marked as MISSING since the workers failed to register "
                         "to the executor. Check the stdout/stderr logs in the submit_scripts "
                         "directory for more debug information"
                     )
-        return job_status
+            status[block_id] = job_info
+        status.update(self._simulated_status)
+        return status
 
     def shutdown(self, timeout: float = 10.0):
         """Shutdown the executor, including the interchange. This does not
@@ -823,4 +1177,7 @@ class HighThroughputExecutor(BlockProviderExecutor, RepresentationMixin):
             logger.info("Unable to terminate Interchange process; sending SIGKILL")
             self.interchange_proc.kill()
 
+        if self._result_pool is not None:
+            self._result_pool.shutdown(wait=False)
+
         logger.info("Finished HighThroughputExecutor shutdown attempt")
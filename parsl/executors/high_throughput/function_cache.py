@@ -0,0 +1,51 @@
+import hashlib
+from collections import OrderedDict
+from typing import Generic, Optional, TypeVar
+from typing import OrderedDict as OrderedDictType
+
+V = TypeVar('V')
+
+
+def function_digest(serialized_function: bytes) -> bytes:
+    """Return the digest which identifies a serialized function in a
+    FunctionCache.
+    """
+    return hashlib.sha256(serialized_function).digest()
+
+
+class FunctionCache(Generic[V]):
+    """A least recently used mapping from function digests to functions,
+    holding at most size entries.
+
+    The interchange keeps one of these for each manager, recording which
+    functions it has sent to that manager, while the manager keeps one
+    holding the serialized functions themselves. Both see the same lookups
+    and insertions in the same (task) order, and so evict the same entries,
+    which lets the interchange leave out the body of a function that the
+    manager already holds.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._entries: OrderedDictType[bytes, V] = OrderedDict()
+
+    def get(self, digest: bytes) -> Optional[V]:
+        """Return the function with this digest, or None if it is not
+        cached, marking it as most recently used.
+        """
+        value = self._entries.get(digest)
+        if value is not None:
+            self._entries.move_to_end(digest)
+        return value
+
+    def put(self, digest: bytes, value: V) -> None:
+        """Cache a function, evicting the least recently used functions if
+        the cache is full.
+        """
+        self._entries[digest] = value
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,20 +1,20 @@
 #!/usr/bin/env python
+import collections
 import multiprocessing
 import zmq
 import os
 import sys
 import platform
-import random
 import time
 import datetime
 import pickle
 import signal
 import logging
-import queue
 import threading
 import json
 
-from typing import cast, Any, Dict, NoReturn, Sequence, Set, Optional, Tuple, List
+from typing import cast, Any, Deque, Dict, NoReturn, Sequence, Set, Optional, Tuple, List
+from typing import OrderedDict as OrderedDictType
 
 from parsl import curvezmq
 from parsl.utils import setproctitle
@@ -22,7 +22,9 @@ from parsl.version import VERSION as PARSL_VERSION
 from parsl.serialize import serialize as serialize_object
 
 from parsl.app.errors import RemoteExceptionWrapper
+from parsl.executors.high_throughput.function_cache import FunctionCache
 from parsl.executors.high_throughput.manager_record import ManagerRecord
+from parsl.executors.high_throughput.manager_selector import ManagerSelector, RoundRobinManagerSelector
 from parsl.monitoring.message_type import MessageType
 from parsl.process_loggers import wrap_with_logs
 
@@ -30,6 +32,17 @@ from parsl.process_loggers import wrap_with_logs
 PKL_HEARTBEAT_CODE = pickle.dumps((2 ** 32) - 1)
 PKL_DRAINED_CODE = pickle.dumps((2 ** 32) - 2)
 
+# A task waiting in the interchange, as (task_id, function digest, header
+# frame, function frame, buffer frame). The frames are kept exactly as
+# received from the client, so that they can be forwarded to a manager
+# without being unpickled and pickled again.
+PendingTask = Tuple[int, bytes, bytes, bytes, bytes]
+
+# Managers which may have capacity for more tasks, in the order in which
+# they should next be offered tasks. This is used as an ordered set: the
+# values are always None.
+InterestingManagers = OrderedDictType[bytes, None]
+
 LOGGER_NAME = "interchange"
 logger = logging.getLogger(LOGGER_NAME)
 
@@ -80,6 +93,10 @@ class Interchange:
                  logging_level: int = logging.INFO,
                  poll_period: int = 10,
                  cert_dir: Optional[str] = None,
+                 manager_selector: ManagerSelector = RoundRobinManagerSelector(),
+                 function_cache_size: int = 128,
+                 max_pending_tasks: int = 10 ** 6,
+                 manager_idle_delay: float = 1,
                  ) -> None:
         """
         Parameters
@@ -123,6 +140,26 @@ class Interchange:
 
         cert_dir : str | None
             Path to the certificate directory. Default: None
+
+        manager_selector : ManagerSelector
+            Chooses the order in which managers are offered pending tasks.
+            Default: RoundRobinManagerSelector()
+
+        function_cache_size : int
+            The number of function bodies received from the client which are
+            kept, so that the client need only send each function once. This
+            must match the size of the client's record of them. Default: 128
+
+        max_pending_tasks : int
+            The number of tasks waiting to be sent to managers at which the
+            interchange stops receiving tasks from the client, until some of
+            them have been sent. Default: 10 ** 6
+
+        manager_idle_delay : float
+            The number of seconds a manager must stay idle before the client
+            is told that it is idle, so that managers which are idle only
+            briefly between tasks do not cause a pair of events per task.
+            Default: 1
         """
         self.cert_dir = cert_dir
         self.logdir = logdir
@@ -153,9 +190,38 @@ class Interchange:
         self.hub_address = hub_address
         self.hub_port = hub_port
 
-        self.pending_task_queue: queue.Queue[Any] = queue.Queue(maxsize=10 ** 6)
+        self.manager_selector = manager_selector
+
+        # A deque is safe to append to from the task puller thread while the
+        # main thread pops from it, without the locking of a queue.Queue.
+        self.pending_task_queue: Deque[PendingTask] = collections.deque()
+
+        # The task puller waits on this while max_pending_tasks tasks are
+        # pending, so that further tasks back up in the client rather than
+        # in the interchange. get_tasks sets it once it has taken tasks.
+        self.max_pending_tasks = max_pending_tasks
+        self._pending_space = threading.Event()
+        self._pending_space.set()
         self.count = 0
 
+        # For each manager, the digests of the functions which that manager
+        # has cached. These mirror the managers' own function caches, so that
+        # a function body is only sent to a manager which does not have it.
+        self._manager_functions: Dict[bytes, FunctionCache[bool]] = {}
+
+        # Managers which the client has been told are idle, and managers
+        # which have become idle since they were last busy but which the
+        # client has not been told about yet, with the time at which they
+        # became idle, in that order.
+        self.manager_idle_delay = manager_idle_delay
+        self._reported_idle: Set[bytes] = set()
+        self._unreported_idle: OrderedDictType[bytes, float] = collections.OrderedDict()
+
+        # The function bodies received from the client, which mirror the
+        # client's record of what it has sent, so that the client can leave
+        # out the body of a function that it has sent before.
+        self._functions: FunctionCache[bytes] = FunctionCache(function_cache_size)
+
         self.worker_ports = worker_ports
         self.worker_port_range = worker_port_range
 
@@ -197,7 +263,7 @@ class Interchange:
 
         logger.info("Platform info: {}".format(self.current_platform))
 
-    def get_tasks(self, count: int) -> Sequence[dict]:
+    def get_tasks(self, count: int) -> Sequence[PendingTask]:
         """ Obtains a batch of tasks from the internal pending_task_queue
 
         Parameters
@@ -208,41 +274,81 @@ class Interchange:
         Returns
         -------
         List of upto count tasks. May return fewer than count down to an empty list
-            eg. [{'task_id':<x>, 'buffer':<buf>} ... ]
+            eg. [(<task_id>, <header frame>, <buffer frame>) ... ]
         """
         tasks = []
         for _ in range(0, count):
             try:
-                x = self.pending_task_queue.get(block=False)
-            except queue.Empty:
+                x = self.pending_task_queue.popleft()
+            except IndexError:
                 break
             else:
                 tasks.append(x)
 
+        if tasks and not self._pending_space.is_set():
+            self._pending_space.set()
+
         return tasks
 
     @wrap_with_logs(target="interchange")
     def task_puller(self) -> NoReturn:
         """Pull tasks from the incoming tasks zmq pipe onto the internal
         pending task queue
+
+        Each incoming multipart message carries a batch of tasks, as triples
+        of frames: the pickled task dict without its function and buffer,
+        the serialized function, and the buffer. Only the (small) header
+        frame is unpickled, to learn the task ID and function digest. The
+        function frame is empty if the client has sent that function before,
+        and its body is taken from the functions kept here.
+
+        While max_pending_tasks tasks are pending, no more are received.
         """
         logger.info("Starting")
         task_counter = 0
 
         while True:
-            logger.debug("launching recv_pyobj")
+            if len(self.pending_task_queue) >= self.max_pending_tasks:
+                self._pending_space.clear()
+                # Check again, in case get_tasks took tasks before the clear
+                if len(self.pending_task_queue) >= self.max_pending_tasks:
+                    logger.debug("{} tasks pending, so pausing task receipt".format(len(self.pending_task_queue)))
+                    self._pending_space.wait()
+                continue
+
+            logger.debug("launching recv_multipart")
             try:
-                msg = self.task_incoming.recv_pyobj()
+                frames = self.task_incoming.recv_multipart()
             except zmq.Again:
                 # We just timed out while attempting to receive
-                logger.debug("zmq.Again with {} tasks in internal queue".format(self.pending_task_queue.qsize()))
+                logger.debug("zmq.Again with {} tasks in internal queue".format(len(self.pending_task_queue)))
                 continue
 
-            logger.debug("putting message onto pending_task_queue")
-            self.pending_task_queue.put(msg)
-            task_counter += 1
+            logger.debug(f"putting {len(frames) // 3} messages onto pending_task_queue")
+            for (header_frame, function_frame, buffer_frame) in zip(frames[0::3], frames[1::3], frames[2::3]):
+                header = pickle.loads(header_frame)
+                function_frame = self._function_body(header['function_digest'], function_frame)
+                self.pending_task_queue.append((header['task_id'], header['function_digest'],
+                                                header_frame, function_frame, buffer_frame))
+            task_counter += len(frames) // 3
             logger.debug(f"Fetched {task_counter} tasks so far")
 
+    def _function_body(self, digest: bytes, function_frame: bytes) -> bytes:
+        """Return the body of the function with this digest, keeping it if
+        the client sent it, or looking it up if the client left it out.
+
+        If the body is not known, an empty frame is returned, and the
+        manager which receives the task will fail it.
+        """
+        if function_frame:
+            self._functions.put(digest, function_frame)
+            return function_frame
+        body = self._functions.get(digest)
+        if body is None:
+            logger.error("Function with digest {} is not cached".format(digest.hex()))
+            return b''
+        return body
+
     def _create_monitoring_channel(self) -> Optional[zmq.Socket]:
         if self.hub_address and self.hub_port:
             logger.info("Connecting to MonitoringHub")
@@ -265,6 +371,39 @@ class Interchange:
 
             hub_channel.send_pyobj((MessageType.NODE_INFO, d))
 
+    def _send_manager_event(self, event: str, manager_id: bytes, manager: ManagerRecord,
+                            timestamp: Optional[float] = None) -> None:
+        """Tell the executor about a change in the state of a manager, on the
+        results channel. The executor keeps track of the connected managers
+        from these events, so that it does not need to poll the interchange
+        or the provider for them.
+
+        event is one of 'registered', 'idle', 'busy', 'drained' or 'lost'.
+        timestamp is the time of the change, if it was not now.
+        """
+        msg = {'type': 'manager',
+               'event': event,
+               'manager': manager_id.decode('utf-8'),
+               'block_id': manager.get('block_id'),
+               'timestamp': time.time() if timestamp is None else timestamp}
+        self.results_outgoing.send(pickle.dumps(msg))
+
+    def _forget_manager_idleness(self, manager_id: bytes) -> None:
+        self._reported_idle.discard(manager_id)
+        self._unreported_idle.pop(manager_id, None)
+
+    def report_idle_managers(self) -> None:
+        """Tell the executor about managers which have now been idle for
+        manager_idle_delay seconds, giving the time they became idle."""
+        now = time.time()
+        while self._unreported_idle:
+            manager_id, idle_since = next(iter(self._unreported_idle.items()))
+            if now - idle_since < self.manager_idle_delay:
+                break
+            del self._unreported_idle[manager_id]
+            self._reported_idle.add(manager_id)
+            self._send_manager_event('idle', manager_id, self._ready_managers[manager_id], timestamp=idle_since)
+
     @wrap_with_logs(target="interchange")
     def _command_server(self) -> NoReturn:
         """ Command server to run async command to the interchange
@@ -281,7 +420,7 @@ class Interchange:
                 command_req = self.command_channel.recv_pyobj()
                 logger.debug("Received command request: {}".format(command_req))
                 if command_req == "OUTSTANDING_C":
-                    outstanding = self.pending_task_queue.qsize()
+                    outstanding = len(self.pending_task_queue)
                     for manager in self._ready_managers.values():
                         outstanding += len(manager['tasks'])
                     reply = outstanding
@@ -379,13 +518,14 @@ class Interchange:
         # for scheduling a job (or maybe any other attention?).
         # Anything altering the state of the manager should add it
         # onto this list.
-        interesting_managers: Set[bytes] = set()
+        interesting_managers: InterestingManagers = collections.OrderedDict()
 
         while not kill_event.is_set():
             self.socks = dict(poller.poll(timeout=poll_period))
 
             self.process_task_outgoing_incoming(interesting_managers, hub_channel, kill_event)
             self.process_results_incoming(interesting_managers, hub_channel)
+            self.report_idle_managers()
             self.expire_bad_managers(interesting_managers, hub_channel)
             self.expire_drained_managers(interesting_managers, hub_channel)
             self.process_tasks_to_send(interesting_managers)
@@ -397,7 +537,7 @@ class Interchange:
 
     def process_task_outgoing_incoming(
             self,
-            interesting_managers: Set[bytes],
+            interesting_managers: InterestingManagers,
             hub_channel: Optional[zmq.Socket],
             kill_event: threading.Event
     ) -> None:
@@ -438,7 +578,8 @@ class Interchange:
                                                     'tasks': []}
                 self.connected_block_history.append(msg['block_id'])
 
-                interesting_managers.add(manager_id)
+                self._manager_functions[manager_id] = FunctionCache(msg.get('function_cache_size', 0))
+                interesting_managers[manager_id] = None
                 logger.info("Adding manager: {!r} to ready queue".format(manager_id))
                 m = self._ready_managers[manager_id]
 
@@ -469,6 +610,9 @@ class Interchange:
                     logger.info("Manager {!r} has compatible Parsl version {}".format(manager_id, msg['parsl_v']))
                     logger.info("Manager {!r} has compatible Python version {}".format(manager_id,
                                                                                        msg['python_v'].rsplit(".", 1)[0]))
+                    # The executor takes a newly registered manager to be idle
+                    self._send_manager_event('registered', manager_id, m)
+                    self._reported_idle.add(manager_id)
             elif msg['type'] == 'heartbeat':
                 self._ready_managers[manager_id]['last_heartbeat'] = time.time()
                 logger.debug("Manager {!r} sent heartbeat via tasks connection".format(manager_id))
@@ -480,7 +624,7 @@ class Interchange:
                 logger.error(f"Unexpected message type received from manager: {msg['type']}")
             logger.debug("leaving task_outgoing section")
 
-    def expire_drained_managers(self, interesting_managers: Set[bytes], hub_channel: Optional[zmq.Socket]) -> None:
+    def expire_drained_managers(self, interesting_managers: InterestingManagers, hub_channel: Optional[zmq.Socket]) -> None:
 
         for manager_id in list(interesting_managers):
             # is it always true that a draining manager will be in interesting managers?
@@ -489,55 +633,84 @@ class Interchange:
             if m['draining'] and len(m['tasks']) == 0:
                 logger.info(f"Manager {manager_id!r} is drained - sending drained message to manager")
                 self.task_outgoing.send_multipart([manager_id, b'', PKL_DRAINED_CODE])
-                interesting_managers.remove(manager_id)
+                del interesting_managers[manager_id]
                 self._ready_managers.pop(manager_id)
+                self._manager_functions.pop(manager_id, None)
+                self._forget_manager_idleness(manager_id)
 
                 m['active'] = False
                 self._send_monitoring_info(hub_channel, m)
+                self._send_manager_event('drained', manager_id, m)
 
-    def process_tasks_to_send(self, interesting_managers: Set[bytes]) -> None:
+    def process_tasks_to_send(self, interesting_managers: InterestingManagers) -> None:
         # Check if there are tasks that could be sent to managers
 
         logger.debug("Managers count (interesting/total): {interesting}/{total}".format(
             total=len(self._ready_managers),
             interesting=len(interesting_managers)))
 
-        if interesting_managers and not self.pending_task_queue.empty():
-            shuffled_managers = list(interesting_managers)
-            random.shuffle(shuffled_managers)
-
-            while shuffled_managers and not self.pending_task_queue.empty():  # cf. the if statement above...
-                manager_id = shuffled_managers.pop()
+        # Managers are offered tasks in the order chosen by the manager
+        # selector. Managers which still have capacity after being offered
+        # tasks move to the back of interesting_managers, so that the
+        # managers which have waited longest come first on the next pass.
+        if interesting_managers and self.pending_task_queue:
+            sorted_managers = self.manager_selector.sort_managers(self._ready_managers,
+                                                                  interesting_managers,
+                                                                  len(self.pending_task_queue))
+
+            for manager_id in sorted_managers:
+                if not self.pending_task_queue:
+                    break
                 m = self._ready_managers[manager_id]
-                tasks_inflight = len(m['tasks'])
-                real_capacity = m['max_capacity'] - tasks_inflight
+                real_capacity = m['max_capacity'] - len(m['tasks'])
 
                 if (real_capacity and m['active'] and not m['draining']):
                     tasks = self.get_tasks(real_capacity)
                     if tasks:
-                        self.task_outgoing.send_multipart([manager_id, b'', pickle.dumps(tasks)])
+                        # The header and buffer frames of each task are
+                        # forwarded as received from the client. The function
+                        # frame is left empty if the manager already has the
+                        # function cached.
+                        functions = self._manager_functions[manager_id]
+                        frames = [manager_id, b'']
+                        for (_, digest, header_frame, function_frame, buffer_frame) in tasks:
+                            frames.append(header_frame)
+                            if functions.get(digest):
+                                frames.append(b'')
+                            else:
+                                if function_frame:
+                                    functions.put(digest, True)
+                                frames.append(function_frame)
+                            frames.append(buffer_frame)
+                        self.task_outgoing.send_multipart(frames)
                         task_count = len(tasks)
                         self.count += task_count
-                        tids = [t['task_id'] for t in tasks]
+                        tids = [task[0] for task in tasks]
                         m['tasks'].extend(tids)
-                        m['idle_since'] = None
+                        if m['idle_since'] is not None:
+                            m['idle_since'] = None
+                            if manager_id in self._reported_idle:
+                                self._reported_idle.remove(manager_id)
+                                self._send_manager_event('busy', manager_id, m)
+                            else:
+                                self._unreported_idle.pop(manager_id, None)
                         logger.debug("Sent tasks: {} to manager {!r}".format(tids, manager_id))
                         # recompute real_capacity after sending tasks
-                        real_capacity = m['max_capacity'] - tasks_inflight
-                        if real_capacity > 0:
-                            logger.debug("Manager {!r} has free capacity {}".format(manager_id, real_capacity))
-                            # ... so keep it in the interesting_managers list
-                        else:
-                            logger.debug("Manager {!r} is now saturated".format(manager_id))
-                            interesting_managers.remove(manager_id)
+                        real_capacity = m['max_capacity'] - len(m['tasks'])
+                    if real_capacity > 0:
+                        logger.debug("Manager {!r} has free capacity {}".format(manager_id, real_capacity))
+                        # ... so keep it interesting, behind the other interesting managers
+                        interesting_managers.move_to_end(manager_id)
+                    else:
+                        logger.debug("Manager {!r} is now saturated".format(manager_id))
+                        del interesting_managers[manager_id]
                 else:
-                    interesting_managers.remove(manager_id)
-                    # logger.debug("Nothing to send to manager {}".format(manager_id))
+                    del interesting_managers[manager_id]
             logger.debug("leaving _ready_managers section, with {} managers still interesting".format(len(interesting_managers)))
         else:
             logger.debug("either no interesting managers or no tasks, so skipping manager pass")
 
-    def process_results_incoming(self, interesting_managers: Set[bytes], hub_channel: Optional[zmq.Socket]) -> None:
+    def process_results_incoming(self, interesting_managers: InterestingManagers, hub_channel: Optional[zmq.Socket]) -> None:
         # Receive any results and forward to client
         if self.results_incoming in self.socks and self.socks[self.results_incoming] == zmq.POLLIN:
             logger.debug("entering results_incoming section")
@@ -595,17 +768,21 @@ class Interchange:
 
                 logger.debug(f"Current tasks on manager {manager_id!r}: {m['tasks']}")
                 if len(m['tasks']) == 0 and m['idle_since'] is None:
-                    m['idle_since'] = time.time()
+                    # The executor is told once the manager has stayed idle
+                    # for a while, by report_idle_managers
+                    now = time.time()
+                    m['idle_since'] = now
+                    self._unreported_idle[manager_id] = now
 
                 # A manager is only made interesting here if a result was
                 # received, which means there should be capacity for a new
                 # task now. Heartbeats and monitoring messages do not make a
                 # manager become interesting.
                 if got_result:
-                    interesting_managers.add(manager_id)
+                    interesting_managers[manager_id] = None
             logger.debug("leaving results_incoming section")
 
-    def expire_bad_managers(self, interesting_managers: Set[bytes], hub_channel: Optional[zmq.Socket]) -> None:
+    def expire_bad_managers(self, interesting_managers: InterestingManagers, hub_channel: Optional[zmq.Socket]) -> None:
         bad_managers = [(manager_id, m) for (manager_id, m) in self._ready_managers.items() if
                         time.time() - m['last_heartbeat'] > self.heartbeat_threshold]
         for (manager_id, m) in bad_managers:
@@ -624,9 +801,11 @@ class Interchange:
                     pkl_package = pickle.dumps(result_package)
                     self.results_outgoing.send(pkl_package)
             logger.warning("Sent failure reports, unregistering manager")
+            self._send_manager_event('lost', manager_id, m)
             self._ready_managers.pop(manager_id, 'None')
-            if manager_id in interesting_managers:
-                interesting_managers.remove(manager_id)
+            self._manager_functions.pop(manager_id, None)
+            self._forget_manager_idleness(manager_id)
+            interesting_managers.pop(manager_id, None)
 
 
 def start_file_logger(filename: str, level: int = logging.DEBUG, format_string: Optional[str] = None) -> None:
@@ -0,0 +1,100 @@
+import random
+from abc import ABCMeta, abstractmethod
+from itertools import islice
+from typing import Dict, Iterable, List
+
+from parsl.executors.high_throughput.manager_record import ManagerRecord
+from parsl.utils import RepresentationMixin
+
+
+class ManagerSelector(RepresentationMixin, metaclass=ABCMeta):
+    """A ManagerSelector decides which managers the interchange offers
+    pending tasks to, and in which order.
+
+    On each pass over the pending tasks, the interchange asks the selector
+    to order the interesting managers (those which may have capacity for
+    more tasks). The interchange then offers tasks to each manager in that
+    order, filling each one to capacity, until it runs out of tasks.
+    """
+
+    @abstractmethod
+    def sort_managers(self,
+                      ready_managers: Dict[bytes, ManagerRecord],
+                      interesting_managers: Iterable[bytes],
+                      task_count: int) -> List[bytes]:
+        """Return the managers which should be offered tasks, in order.
+
+        Parameters
+        ----------
+        ready_managers : dict
+            Manager records of all registered managers, keyed by manager ID.
+
+        interesting_managers : iterable of bytes
+            IDs of the managers which may have capacity, starting with the one
+            which has waited longest for tasks.
+
+        task_count : int
+            The number of tasks waiting to be sent. Since every manager which
+            is offered tasks receives at least one, a selector does not need
+            to return more managers than this.
+        """
+        pass
+
+
+class RoundRobinManagerSelector(ManagerSelector):
+    """Offer tasks to managers in turn, starting with the manager which has
+    waited longest. This spreads tasks evenly across managers, and only
+    looks at as many managers as there are tasks to send.
+    """
+
+    def sort_managers(self,
+                      ready_managers: Dict[bytes, ManagerRecord],
+                      interesting_managers: Iterable[bytes],
+                      task_count: int) -> List[bytes]:
+        return list(islice(interesting_managers, task_count))
+
+
+class RandomManagerSelector(ManagerSelector):
+    """Offer tasks to managers in a random order."""
+
+    def sort_managers(self,
+                      ready_managers: Dict[bytes, ManagerRecord],
+                      interesting_managers: Iterable[bytes],
+                      task_count: int) -> List[bytes]:
+        managers = list(interesting_managers)
+        random.shuffle(managers)
+        return managers
+
+
+class LeastLoadedManagerSelector(ManagerSelector):
+    """Offer tasks first to the managers with the smallest fraction of their
+    capacity in use, so that tasks go to idle nodes before busy ones.
+
+    This looks at every interesting manager on every pass.
+    """
+
+    def sort_managers(self,
+                      ready_managers: Dict[bytes, ManagerRecord],
+                      interesting_managers: Iterable[bytes],
+                      task_count: int) -> List[bytes]:
+        def load(manager_id: bytes) -> float:
+            m = ready_managers[manager_id]
+            return len(m['tasks']) / max(m['max_capacity'], 1)
+
+        return sorted(interesting_managers, key=load)
+
+
+class PackingManagerSelector(ManagerSelector):
+    """Offer tasks first to the managers with the most tasks already in
+    flight, so that work is packed onto as few managers as possible. This
+    leaves other managers idle, so that their blocks can be scaled in
+    sooner at the tail of a run.
+
+    This looks at every interesting manager on every pass.
+    """
+
+    def sort_managers(self,
+                      ready_managers: Dict[bytes, ManagerRecord],
+                      interesting_managers: Iterable[bytes],
+                      task_count: int) -> List[bytes]:
+        return sorted(interesting_managers, key=lambda manager_id: len(ready_managers[manager_id]['tasks']), reverse=True)
@@ -29,6 +29,7 @@ def validate_resource_spec(resource_spec: Dict[str, str]):
                       "num_nodes",
                       "num_ranks",
                       "launcher_options",
+                      "walltime",
                       ))
     invalid_keys = user_keys - legal_keys
     if invalid_keys:
@@ -1,15 +1,19 @@
 import logging
+import math
 import multiprocessing
 import os
 import pickle
-import queue
 import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List
+from typing import Deque, Dict, List, Optional, Tuple
 
-from parsl.multiprocessing import SpawnContext
-from parsl.serialize import (pack_res_spec_apply_message,
-                             unpack_res_spec_apply_message)
+from parsl.app.errors import RemoteExceptionWrapper
+from parsl.executors.high_throughput.shm_transport import receive
+from parsl.serialize import serialize
 
 logger = logging.getLogger(__name__)
 
@@ -72,7 +76,8 @@ def identify_scheduler() -> Scheduler:
 
 
 class MPINodesUnavailable(Exception):
-    """Raised if there are no free nodes available for an MPI request"""
+    """Raised if an MPI request can never be satisfied by the nodes of the
+    batch job"""
 
     def __init__(self, requested: int, available: int):
         self.requested = requested
@@ -82,6 +87,14 @@ class MPINodesUnavailable(Exception):
         return f"MPINodesUnavailable(requested={self.requested} available={self.available})"
 
 
+class MPISlotsUnavailable(MPINodesUnavailable):
+    """Raised if an MPI request needs more slots on each node than the nodes
+    of the batch job have"""
+
+    def __str__(self):
+        return f"MPISlotsUnavailable(requested={self.requested} per node, available={self.available} per node)"
+
+
 class TaskScheduler:
     """Default TaskScheduler that does no taskscheduling
 
@@ -100,7 +113,31 @@ class TaskScheduler:
         return self.pending_task_q.put(task)
 
     def get_result(self, block: bool, timeout: float):
-        return self.pending_result_q.get(block, timeout=timeout)
+        """Return the next pickled result package, reading it from shared
+        memory if a worker sent it that way"""
+        return receive(self.pending_result_q.get(block, timeout=timeout))
+
+
+@dataclass
+class MPITask:
+    """An MPI task held by the MPITaskScheduler"""
+
+    task_package: dict
+
+    num_nodes: int
+    """Number of nodes the task runs on"""
+
+    slots_per_node: int
+    """Number of slots the task occupies on each of its nodes"""
+
+    walltime: Optional[float]
+    """Expected run time of the task in seconds, if known"""
+
+    nodes: List[int] = field(default_factory=list)
+    """Indices of the nodes allocated to the task, once it is started"""
+
+    expected_end: float = math.inf
+    """Time by which the task is expected to finish, once it is started"""
 
 
 class MPITaskScheduler(TaskScheduler):
@@ -115,103 +152,196 @@ class MPITaskScheduler(TaskScheduler):
         b) if unavailable place tasks into backlog
     3) get_result will fetch a result and relinquish nodes,
        and attempt to schedule tasks in backlog if any.
+
+    Each node has slots_per_node slots, and a task occupies ranks_per_node
+    slots on each of num_nodes nodes, so that tasks with few ranks per node
+    can share nodes. If slots_per_node is None, each task is given whole
+    nodes.
+
+    Backlogged tasks are started in the order they arrived. When the oldest
+    backlogged task does not fit, it is given a reservation: the earliest
+    time at which enough slots are expected to be free for it, judged from
+    the walltime in the resource specification of running tasks. Later
+    tasks are started ahead of it (backfilled) only if that does not delay
+    its reservation, either because they are expected to finish before it,
+    or because they fit on slots which the reserved task will not need.
+    Tasks with no walltime are expected to run indefinitely, so they are
+    only backfilled onto slots which the reserved task will not need.
     """
     def __init__(
         self,
         pending_task_q: multiprocessing.Queue,
         pending_result_q: multiprocessing.Queue,
+        slots_per_node: Optional[int] = None,
     ):
         super().__init__(pending_task_q, pending_result_q)
         self.scheduler = identify_scheduler()
-        # PriorityQueue is threadsafe
-        self._backlog_queue: queue.PriorityQueue = queue.PriorityQueue()
-        self._map_tasks_to_nodes: Dict[str, List[str]] = {}
         self.available_nodes = get_nodes_in_batchjob(self.scheduler)
-        self._free_node_counter = SpawnContext.Value("i", len(self.available_nodes))
-        # mp.Value has issues with mypy
-        # issue https://github.com/python/typeshed/issues/8799
-        # from mypy 0.981 onwards
-        self.nodes_q: queue.Queue = queue.Queue()
-        for node in self.available_nodes:
-            self.nodes_q.put(node)
+        self.slots_per_node = slots_per_node
+
+        # put_task and get_result are called from different manager threads
+        self._lock = threading.Lock()
+        self._free_slots = [slots_per_node or 1] * len(self.available_nodes)
+        self._backlog: Deque[MPITask] = deque()
+        self._running: Dict[int, MPITask] = {}
 
         logger.info(
-            f"Starting MPITaskScheduler with {len(self.available_nodes)}"
+            f"Starting MPITaskScheduler with {len(self.available_nodes)} nodes and {slots_per_node} slots per node"
         )
 
-    def _get_nodes(self, num_nodes: int) -> List[str]:
-        """Thread safe method to acquire num_nodes from free resources
+    def _make_task(self, task_package: dict) -> Optional[MPITask]:
+        """Return the MPITask for a task package, or None if it does not need
+        any nodes"""
+        resource_spec = task_package["resource_spec"]
+        num_nodes = int(resource_spec.get("num_nodes", 0))
+        if not num_nodes:
+            return None
 
-        Raises: MPINodesUnavailable if there aren't enough resources
-        Returns: List of nodenames:str
-        """
-        logger.debug(
-            f"Requesting : {num_nodes=} we have {self._free_node_counter}"
-        )
-        acquired_nodes = []
-        with self._free_node_counter.get_lock():
-            if num_nodes <= self._free_node_counter.value:  # type: ignore[attr-defined]
-                self._free_node_counter.value -= num_nodes  # type: ignore[attr-defined]
-            else:
-                raise MPINodesUnavailable(
-                    requested=num_nodes, available=self._free_node_counter.value  # type: ignore[attr-defined]
-                )
-
-            for i in range(num_nodes):
-                node = self.nodes_q.get()
-                acquired_nodes.append(node)
-        return acquired_nodes
-
-    def _return_nodes(self, nodes: List[str]) -> None:
-        """Threadsafe method to return a list of nodes"""
-        for node in nodes:
-            self.nodes_q.put(node)
-        with self._free_node_counter.get_lock():
-            self._free_node_counter.value += len(nodes)  # type: ignore[attr-defined]
+        if self.slots_per_node is None:
+            slots_per_node = 1
+        else:
+            # ranks_per_node may be given as a string, and may not be whole
+            # if it was derived from num_ranks
+            slots_per_node = math.ceil(float(resource_spec.get("ranks_per_node", self.slots_per_node)))
+
+        walltime = resource_spec.get("walltime")
+        return MPITask(task_package=task_package,
+                       num_nodes=num_nodes,
+                       slots_per_node=slots_per_node,
+                       walltime=None if walltime is None else float(walltime))
+
+    def _place(self, task: MPITask, free_slots: List[int]) -> Optional[List[int]]:
+        """Choose nodes for task given the free slots on each node, or return
+        None if it does not fit. Nodes with the fewest sufficient free slots
+        are chosen first, to leave room on other nodes for larger tasks."""
+        candidates = [i for i, free in enumerate(free_slots) if free >= task.slots_per_node]
+        if len(candidates) < task.num_nodes:
+            return None
+        candidates.sort(key=lambda i: free_slots[i])
+        return sorted(candidates[:task.num_nodes])
+
+    def _reservation(self, task: MPITask, now: float) -> Tuple[float, List[int]]:
+        """Return the earliest time at which task is expected to fit, as
+        running tasks finish, and the free slots on each node at that time.
+
+        Running tasks with no walltime are expected to finish at infinity.
+        Every task fits once all running tasks have finished, as put_task
+        rejects tasks which could never run."""
+        free_slots = list(self._free_slots)
+        if self._place(task, free_slots) is not None:
+            return now, free_slots
+        for running in sorted(self._running.values(), key=lambda t: t.expected_end):
+            for i in running.nodes:
+                free_slots[i] += running.slots_per_node
+            if self._place(task, free_slots) is not None:
+                return max(now, running.expected_end), free_slots
+        return math.inf, free_slots
+
+    def _allocate(self, task: MPITask, nodes: List[int], now: float) -> None:
+        """Record the nodes chosen for task, without claiming them"""
+        task.nodes = nodes
+        if task.walltime is not None:
+            task.expected_end = now + task.walltime
+
+    def _start(self, task: MPITask, nodes: List[int], now: float) -> None:
+        """Claim nodes for task and hand it on to the workers"""
+        self._allocate(task, nodes, now)
+        for i in nodes:
+            self._free_slots[i] -= task.slots_per_node
+        self._running[task.task_package["task_id"]] = task
+
+        node_names = [self.available_nodes[i] for i in nodes]
+        task.task_package["resource_spec"]["MPI_NODELIST"] = ",".join(node_names)
+        logger.debug(f"Starting task {task.task_package['task_id']} on nodes {node_names}")
+        self.pending_task_q.put(task.task_package)
+
+    def _release(self, task: MPITask) -> None:
+        for i in task.nodes:
+            self._free_slots[i] += task.slots_per_node
+
+    def _schedule_backlog_tasks(self) -> None:
+        """Start as many backlogged tasks as can be started without delaying
+        the reservation of the oldest one which cannot. Must be called with
+        the lock held.
+
+        The reservation, and the slots which will be free at its time, are
+        computed once per pass. A later task is backfilled if it is expected
+        to finish by the reservation, or if the reserved task still fits in
+        the slots left free at the reservation once the later task's slots
+        are taken from them. A task with no walltime is never expected to
+        finish, so that it cannot be backfilled onto slots which the
+        reserved task needs."""
+        now = time.monotonic()
+        reserved: Optional[MPITask] = None
+        reservation = math.inf
+        reservation_free_slots: List[int] = []
+        remaining: Deque[MPITask] = deque()
+
+        while self._backlog:
+            task = self._backlog.popleft()
+            nodes = self._place(task, self._free_slots)
+            if nodes is None:
+                if reserved is None:
+                    reserved = task
+                    reservation, reservation_free_slots = self._reservation(task, now)
+                    logger.debug(f"Task {task.task_package['task_id']} is reserved for time {reservation}")
+                remaining.append(task)
+                continue
+
+            if reserved is not None:
+                # Backfill only if the reservation is not delayed
+                self._allocate(task, nodes, now)
+                if task.walltime is None or task.expected_end > reservation:
+                    spare_slots = list(reservation_free_slots)
+                    for i in nodes:
+                        spare_slots[i] -= task.slots_per_node
+                    if self._place(reserved, spare_slots) is None:
+                        task.nodes = []
+                        task.expected_end = math.inf
+                        remaining.append(task)
+                        continue
+                    reservation_free_slots = spare_slots
+
+            self._start(task, nodes, now)
+
+        self._backlog = remaining
 
     def put_task(self, task_package: dict):
         """Schedule task if resources are available otherwise backlog the task"""
-        user_ns = locals()
-        user_ns.update({"__builtins__": __builtins__})
-        _f, _args, _kwargs, resource_spec = unpack_res_spec_apply_message(
-            task_package["buffer"], user_ns, copy=False
-        )
+        # The resource specification is carried in the task header, so the
+        # task buffer is passed on to the worker untouched.
+        task = self._make_task(task_package)
+        if task is None:
+            self.pending_task_q.put(task_package)
+            return
 
-        nodes_needed = resource_spec.get("num_nodes")
-        if nodes_needed:
-            try:
-                allocated_nodes = self._get_nodes(nodes_needed)
-            except MPINodesUnavailable:
-                logger.warning("Not enough resources, placing task into backlog")
-                self._backlog_queue.put((nodes_needed, task_package))
-                return
-            else:
-                resource_spec["MPI_NODELIST"] = ",".join(allocated_nodes)
-                self._map_tasks_to_nodes[task_package["task_id"]] = allocated_nodes
-                buffer = pack_res_spec_apply_message(_f, _args, _kwargs, resource_spec)
-                task_package["buffer"] = buffer
-
-        self.pending_task_q.put(task_package)
-
-    def _schedule_backlog_tasks(self):
-        """Attempt to schedule backlogged tasks"""
-        try:
-            _nodes_requested, task_package = self._backlog_queue.get(block=False)
-            self.put_task(task_package)
-        except queue.Empty:
+        # Check whether this task can ever run in this batch job
+        e: Optional[MPINodesUnavailable] = None
+        if task.num_nodes > len(self.available_nodes):
+            e = MPINodesUnavailable(requested=task.num_nodes, available=len(self.available_nodes))
+        elif task.slots_per_node > (self.slots_per_node or 1):
+            e = MPISlotsUnavailable(requested=task.slots_per_node, available=self.slots_per_node or 1)
+        if e is not None:
+            logger.warning(f"Task {task_package['task_id']} cannot run in this batch job: {e}")
+            result_package = {'type': 'result',
+                              'task_id': task_package["task_id"],
+                              'exception': serialize(RemoteExceptionWrapper(type(e), e, None))}
+            self.pending_result_q.put(pickle.dumps(result_package))
             return
-        else:
-            # Keep attempting to schedule tasks till we are out of resources
+
+        with self._lock:
+            self._backlog.append(task)
             self._schedule_backlog_tasks()
 
     def get_result(self, block: bool, timeout: float):
         """Return result and relinquish provisioned nodes"""
-        result_pkl = self.pending_result_q.get(block, timeout=timeout)
+        result_pkl = receive(self.pending_result_q.get(block, timeout=timeout))
         result_dict = pickle.loads(result_pkl)
         if result_dict["type"] == "result":
-            task_id = result_dict["task_id"]
-            nodes_to_reallocate = self._map_tasks_to_nodes[task_id]
-            self._return_nodes(nodes_to_reallocate)
-            self._schedule_backlog_tasks()
+            with self._lock:
+                task = self._running.pop(result_dict["task_id"], None)
+                if task is not None:
+                    self._release(task)
+                    self._schedule_backlog_tasks()
 
         return result_pkl
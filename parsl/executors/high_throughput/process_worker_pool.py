@@ -5,12 +5,14 @@ import logging
 import os
 import sys
 import platform
+import shutil
+import signal
 import threading
 import pickle
 import time
 import queue
 import uuid
-from typing import Sequence, Optional, Dict, List
+from typing import Any, Sequence, Optional, Dict, List
 
 import zmq
 import math
@@ -24,10 +26,14 @@ from parsl import curvezmq
 from parsl.process_loggers import wrap_with_logs
 from parsl.version import VERSION as PARSL_VERSION
 from parsl.app.errors import RemoteExceptionWrapper
-from parsl.executors.high_throughput.errors import WorkerLost
+from parsl.executors.high_throughput.errors import WorkerLost, MissingFunction
+from parsl.executors.high_throughput import result_cache
+from parsl.executors.high_throughput.function_cache import FunctionCache
 from parsl.executors.high_throughput.probe import probe_addresses
+from parsl.executors.high_throughput.shm_transport import DEFAULT_SHM_DIR, SharedBuffer, SharedMemoryTransport, receive
 from parsl.multiprocessing import SpawnContext
-from parsl.serialize import unpack_res_spec_apply_message, serialize
+from parsl.serialize import unpack_res_spec_apply_message, serialize, deserialize
+from parsl.serialize.buffers import unpack_buffers
 from parsl.executors.high_throughput.mpi_resource_management import (
     TaskScheduler,
     MPITaskScheduler
@@ -73,6 +79,11 @@ class Manager:
                  cpu_affinity,
                  enable_mpi_mode: bool = False,
                  mpi_launcher: str = "mpiexec",
+                 mpi_slots_per_node: Optional[int] = None,
+                 function_cache_size: int = 128,
+                 result_cache_dir: Optional[str] = None,
+                 result_cache_size: Optional[int] = None,
+                 shm_threshold: Optional[int] = None,
                  available_accelerators: Sequence[str],
                  cert_dir: Optional[str],
                  drain_period: Optional[int]):
@@ -138,6 +149,27 @@ class Manager:
         mpi_launcher: str
             Set to one of the supported MPI launchers: ("srun", "aprun", "mpiexec")
 
+        mpi_slots_per_node: int | None
+            Number of MPI ranks which may run on each node at once, shared between
+            tasks. If None, each task is given whole nodes.
+
+        function_cache_size: int
+            Number of distinct functions cached by the manager, and by each worker.
+
+        result_cache_dir: str | None
+            Node-local directory in which workers cache the results of tasks, so that later
+            tasks on this node can read them without them being sent from the submit host.
+            If None, results are not cached.
+
+        result_cache_size: int | None
+            Size in bytes beyond which the least recently used results are removed from the
+            result cache. If None, the cache is not bounded.
+
+        shm_threshold: int | None
+            Size in bytes from which task buffers and results are passed between the manager
+            and workers through files in /dev/shm, rather than through multiprocessing queues.
+            If None, or if /dev/shm does not exist, everything goes through the queues.
+
         cert_dir : str | None
             Path to the certificate directory.
 
@@ -184,6 +216,29 @@ class Manager:
 
         self.enable_mpi_mode = enable_mpi_mode
         self.mpi_launcher = mpi_launcher
+        self.mpi_slots_per_node = mpi_slots_per_node
+
+        # Serialized functions, keyed by digest. The interchange only sends
+        # a function with a task when it is not already cached here.
+        self.function_cache_size = function_cache_size
+        self.function_cache: FunctionCache[bytes] = FunctionCache(function_cache_size)
+
+        # Results cached by this manager's workers are kept in a directory
+        # of its own, so that it can remove them when it exits without
+        # disturbing other managers on the same node.
+        self.result_cache_dir: Optional[str] = None
+        self.result_cache_size = result_cache_size
+        if result_cache_dir:
+            self.result_cache_dir = os.path.join(result_cache_dir, uid)
+            os.makedirs(self.result_cache_dir, exist_ok=True)
+            logger.info("Caching results in {}".format(self.result_cache_dir))
+
+        self.shm_transport: Optional[SharedMemoryTransport] = None
+        if shm_threshold is not None and os.path.isdir(DEFAULT_SHM_DIR):
+            shm_dir = os.path.join(DEFAULT_SHM_DIR, "parsl_{}".format(uid))
+            os.makedirs(shm_dir, exist_ok=True)
+            self.shm_transport = SharedMemoryTransport(shm_dir, shm_threshold)
+            logger.info("Passing buffers of at least {} bytes through {}".format(shm_threshold, shm_dir))
 
         if os.environ.get('PARSL_CORES'):
             cores_on_node = int(os.environ['PARSL_CORES'])
@@ -217,6 +272,7 @@ class Manager:
             self.task_scheduler = MPITaskScheduler(
                 self.pending_task_queue,
                 self.pending_result_queue,
+                slots_per_node=self.mpi_slots_per_node,
             )
         else:
             self.task_scheduler = TaskScheduler(
@@ -262,6 +318,7 @@ class Manager:
                'block_id': self.block_id,
                'prefetch_capacity': self.prefetch_capacity,
                'max_capacity': self.worker_count + self.prefetch_capacity,
+               'function_cache_size': self.function_cache_size,
                'os': platform.system(),
                'hostname': platform.node(),
                'dir': os.getcwd(),
@@ -350,16 +407,37 @@ class Manager:
             socks = dict(poller.poll(timeout=poll_duration_s * 1000))
 
             if self.task_incoming in socks and socks[self.task_incoming] == zmq.POLLIN:
-                _, pkl_msg = self.task_incoming.recv_multipart()
-                tasks = pickle.loads(pkl_msg)
+                # A message from the interchange is either a single pickled
+                # control code, or a batch of tasks as triples of frames: a
+                # pickled task dict without its function and buffer, then the
+                # function (empty if it should already be cached), then the
+                # buffer.
+                _, *frames = self.task_incoming.recv_multipart()
                 last_interchange_contact = time.time()
 
-                if tasks == HEARTBEAT_CODE:
-                    logger.debug("Got heartbeat from interchange")
-                elif tasks == DRAINED_CODE:
-                    logger.info("Got fulled drained message from interchange - setting kill flag")
-                    kill_event.set()
+                if len(frames) == 1:
+                    code = pickle.loads(frames[0])
+                    if code == HEARTBEAT_CODE:
+                        logger.debug("Got heartbeat from interchange")
+                    elif code == DRAINED_CODE:
+                        logger.info("Got fulled drained message from interchange - setting kill flag")
+                        kill_event.set()
+                    else:
+                        logger.error("Got unknown control message from interchange: {}".format(code))
                 else:
+                    tasks = []
+                    for (header_frame, function_frame, buffer_frame) in zip(frames[0::3], frames[1::3], frames[2::3]):
+                        task = pickle.loads(header_frame)
+                        if function_frame:
+                            self.function_cache.put(task['function_digest'], function_frame)
+                            task['function'] = function_frame
+                        else:
+                            task['function'] = self.function_cache.get(task['function_digest'])
+                        task['buffer'] = buffer_frame
+                        if self.shm_transport:
+                            task['buffer'] = self.shm_transport.share(buffer_frame)
+                        tasks.append(task)
+
                     task_recv_counter += len(tasks)
                     logger.debug("Got executor tasks: {}, cumulative count of tasks: {}".format([t['task_id'] for t in tasks], task_recv_counter))
 
@@ -445,6 +523,8 @@ class Manager:
                     try:
                         task = self._tasks_in_progress.pop(worker_id)
                         logger.info("Worker {} was busy when it died".format(worker_id))
+                        if isinstance(task['buffer'], SharedBuffer):
+                            task['buffer'].discard()
                         try:
                             raise WorkerLost(worker_id, platform.node())
                         except Exception:
@@ -501,6 +581,12 @@ class Manager:
         self._kill_event = threading.Event()
         self._tasks_in_progress = self._mp_manager.dict()
 
+        if self.result_cache_dir or self.shm_transport:
+            # Batch jobs, and so managers, are usually ended by a signal,
+            # which would leave cached results and shared memory behind on
+            # the node.
+            signal.signal(signal.SIGTERM, self._remove_node_files_and_exit)
+
         self.procs = {}
         for worker_id in range(self.worker_count):
             p = self._start_worker(worker_id)
@@ -546,10 +632,30 @@ class Manager:
         self.task_incoming.close()
         self.result_outgoing.close()
         self.zmq_context.term()
+        self._remove_node_files()
         delta = time.time() - self._start_time
         logger.info("process_worker_pool ran for {} seconds".format(delta))
         return
 
+    def _remove_node_files(self):
+        """Remove the result cache and shared memory files of this manager."""
+        if self.shm_transport:
+            shutil.rmtree(self.shm_transport.directory, ignore_errors=True)
+        if self.result_cache_dir:
+            shutil.rmtree(self.result_cache_dir, ignore_errors=True)
+            try:
+                # Remove the executor's cache directory too, if this was the
+                # last manager on the node to use it.
+                os.rmdir(os.path.dirname(self.result_cache_dir))
+            except OSError:
+                pass
+
+    def _remove_node_files_and_exit(self, signum, frame):
+        logger.critical("Received signal {}, removing node files".format(signum))
+        self._remove_node_files()
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+
     def _start_worker(self, worker_id: int):
         p = SpawnContext.Process(
             target=worker,
@@ -570,6 +676,10 @@ class Manager:
                 args.logdir,
                 args.debug,
                 self.mpi_launcher,
+                self.function_cache_size,
+                self.result_cache_dir,
+                self.result_cache_size,
+                self.shm_transport,
             ),
             name="HTEX-Worker-{}".format(worker_id),
         )
@@ -583,15 +693,28 @@ def update_resource_spec_env_vars(mpi_launcher: str, resource_spec: Dict, node_i
         os.environ[key] = prefix_table[key]
 
 
-def execute_task(bufs, mpi_launcher: Optional[str] = None):
+def execute_task(bufs, mpi_launcher: Optional[str] = None, function=None, resource_spec: Optional[Dict] = None):
     """Deserialize the buffer and execute the task.
 
+    If function is given, it is called in place of the function packed in
+    the buffer, which is not deserialized, and the buffer holds only the
+    arguments and keyword arguments of the task. Its resource specification
+    is then given by resource_spec.
+
     Returns the result or throws exception.
     """
     user_ns = locals()
     user_ns.update({'__builtins__': __builtins__})
 
-    f, args, kwargs, resource_spec = unpack_res_spec_apply_message(bufs, user_ns, copy=False)
+    if function is None:
+        f, args, kwargs, resource_spec = unpack_res_spec_apply_message(bufs, user_ns, copy=False)
+    else:
+        _, b_args, b_kwargs = unpack_buffers(bufs)
+        f = function
+        args = deserialize(b_args)
+        kwargs = deserialize(b_kwargs)
+    if resource_spec is None:
+        resource_spec = {}
 
     for varname in resource_spec:
         envname = "PARSL_" + str(varname).upper()
@@ -642,6 +765,10 @@ def worker(
     logdir: str,
     debug: bool,
     mpi_launcher: str,
+    function_cache_size: int,
+    result_cache_dir: Optional[str],
+    result_cache_size: Optional[int],
+    shm_transport: Optional[SharedMemoryTransport],
 ):
     """
 
@@ -668,6 +795,9 @@ def worker(
     import parsl.executors.high_throughput.monitoring_info as mi
     mi.result_queue = monitoring_queue
 
+    result_cache.cache_dir = result_cache_dir
+    result_cache.max_size = result_cache_size
+
     logger.info('Worker {} started'.format(worker_id))
     if debug:
         logger.debug("Debug logging enabled")
@@ -738,6 +868,9 @@ def worker(
         else:
             return True
 
+    # Deserialized functions, keyed by digest
+    function_cache: FunctionCache[Any] = FunctionCache(function_cache_size)
+
     worker_enqueued = False
     while manager_is_alive():
         if not worker_enqueued:
@@ -746,7 +879,9 @@ def worker(
             worker_enqueued = True
 
         try:
-            # The worker will receive {'task_id':<tid>, 'buffer':<buf>}
+            # The worker will receive {'task_id':<tid>, 'function_digest':<digest>,
+            #                          'resource_spec':<dict>, 'function':<fn or None>,
+            #                          'buffer':<buf>}
             req = task_queue.get(timeout=task_queue_timeout)
         except queue.Empty:
             continue
@@ -760,13 +895,28 @@ def worker(
         worker_enqueued = False
 
         try:
-            result = execute_task(req['buffer'], mpi_launcher=mpi_launcher)
+            f = function_cache.get(req['function_digest'])
+            if f is None:
+                if req['function'] is None:
+                    raise MissingFunction(req['function_digest'])
+                f = deserialize(req['function'])
+                function_cache.put(req['function_digest'], f)
+            result = execute_task(receive(req['buffer']), mpi_launcher=mpi_launcher, function=f,
+                                  resource_spec=req['resource_spec'])
             serialized_result = serialize(result, buffer_threshold=1000000)
         except Exception as e:
             logger.info('Caught an exception: {}'.format(e))
             result_package = {'type': 'result', 'task_id': tid, 'exception': serialize(RemoteExceptionWrapper(*sys.exc_info()))}
         else:
-            result_package = {'type': 'result', 'task_id': tid, 'result': serialized_result}
+            # An app which raised returns a RemoteExceptionWrapper. That is
+            # reported as an exception, so that the client can tell that a
+            # result is not an exception without deserializing it.
+            if isinstance(result, RemoteExceptionWrapper):
+                result_package = {'type': 'result', 'task_id': tid, 'exception': serialized_result}
+            else:
+                result_package = {'type': 'result', 'task_id': tid, 'result': serialized_result}
+                if result_cache.store(str(tid), serialized_result):
+                    result_package['cached'] = True
             # logger.debug("Result: {}".format(result))
 
         logger.info("Completed executor task {}".format(tid))
@@ -778,7 +928,10 @@ def worker(
                                         'exception': serialize(RemoteExceptionWrapper(*sys.exc_info()))
                                         })
 
-        result_queue.put(pkl_package)
+        if shm_transport:
+            result_queue.put(shm_transport.share(pkl_package))
+        else:
+            result_queue.put(pkl_package)
         tasks_in_progress.pop(worker_id)
         logger.info("All processing finished for executor task {}".format(tid))
 
@@ -866,6 +1019,18 @@ if __name__ == "__main__":
                         help="Enable MPI mode")
     parser.add_argument("--mpi-launcher", type=str, choices=VALID_LAUNCHERS,
                         help="MPI launcher to use iff enable_mpi_mode=true")
+    parser.add_argument("--mpi_slots_per_node", default=None,
+                        help="Number of MPI ranks which may run on each node at once, or None to give tasks whole nodes")
+    parser.add_argument("--function_cache_size", default=128,
+                        help="Number of distinct functions cached by the manager and by each worker")
+    parser.add_argument("--shm_threshold", default=None,
+                        help="Size in bytes from which buffers are passed to and from workers through /dev/shm. "
+                        "By default, they are passed through queues.")
+    parser.add_argument("--result_cache_dir", default=None,
+                        help="Node-local directory in which to cache task results. By default, results are not cached.")
+    parser.add_argument("--result_cache_size", default=None,
+                        help="Size in bytes beyond which least recently used results are removed from the result cache. "
+                        "By default, the cache is not bounded.")
 
     args = parser.parse_args()
 
@@ -898,6 +1063,11 @@ if __name__ == "__main__":
         logger.info("Accelerators: {}".format(" ".join(args.available_accelerators)))
         logger.info("enable_mpi_mode: {}".format(args.enable_mpi_mode))
         logger.info("mpi_launcher: {}".format(args.mpi_launcher))
+        logger.info("mpi_slots_per_node: {}".format(args.mpi_slots_per_node))
+        logger.info("function_cache_size: {}".format(args.function_cache_size))
+        logger.info("result_cache_dir: {}".format(args.result_cache_dir))
+        logger.info("result_cache_size: {}".format(args.result_cache_size))
+        logger.info("shm_threshold: {}".format(args.shm_threshold))
 
         manager = Manager(task_port=args.task_port,
                           result_port=args.result_port,
@@ -919,6 +1089,15 @@ if __name__ == "__main__":
                           cpu_affinity=args.cpu_affinity,
                           enable_mpi_mode=args.enable_mpi_mode,
                           mpi_launcher=args.mpi_launcher,
+                          mpi_slots_per_node=(
+                              None if args.mpi_slots_per_node in (None, "None") else int(args.mpi_slots_per_node)
+                          ),
+                          function_cache_size=int(args.function_cache_size),
+                          result_cache_dir=None if args.result_cache_dir == "None" else args.result_cache_dir,
+                          result_cache_size=(
+                              None if args.result_cache_size in (None, "None") else int(args.result_cache_size)
+                          ),
+                          shm_threshold=None if args.shm_threshold in (None, "None") else int(args.shm_threshold),
                           available_accelerators=args.available_accelerators,
                           cert_dir=None if args.cert_dir == "None" else args.cert_dir)
         manager.start()
@@ -0,0 +1,137 @@
+"""A node-local cache of task results, which lets a task read the result of
+an earlier task that ran on the same node without that result being sent
+back out from the submit host.
+
+Each manager has a directory of its own under the cache directory given to
+the worker pool, into which its workers write the serialized result of each
+task, named by task ID. The directory is removed when the manager exits.
+A worker looks a result up in the directories of all the managers on its
+node.
+
+When the results in a manager's directory grow beyond max_size, the least
+recently used of them are removed. A task which refers to a removed result
+misses the cache, and is sent again with the result included.
+"""
+import logging
+import os
+from typing import Any, Optional, Tuple
+
+from parsl.executors.high_throughput.errors import ResultCacheMiss
+from parsl.serialize import deserialize
+from parsl.serialize.lazy import SerializedResult
+
+logger = logging.getLogger(__name__)
+
+# These are globals that will be worker-specific: the directory into which
+# the worker writes results, and the size in bytes to which results in that
+# directory are limited, set when the worker starts.
+cache_dir: Optional[str] = None
+max_size: Optional[int] = None
+
+
+class CachedResult(SerializedResult):
+    """A SerializedResult which is also held in the result cache of the node
+    on which it was produced.
+
+    cache_id identifies the executor whose workers hold the result, and key
+    identifies the result in their cache.
+    """
+
+    def __init__(self, payload: bytes, cache_id: str, key: str) -> None:
+        super().__init__(payload)
+        self.cache_id = cache_id
+        self.key = key
+
+
+class CachedResultRef:
+    """A reference to a result in the node-local result cache, which is sent
+    to a worker in place of the result itself.
+
+    Unpickling a CachedResultRef loads the result from the cache, raising
+    ResultCacheMiss if it is not held on this node.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    def __reduce__(self) -> Tuple[Any, Tuple[str]]:
+        return (load, (self.key,))
+
+    def __repr__(self) -> str:
+        return "<CachedResultRef {}>".format(self.key)
+
+
+def store(key: str, payload: bytes) -> bool:
+    """Write a serialized result into this worker's cache directory,
+    returning whether it was cached.
+    """
+    if cache_dir is None:
+        return False
+    path = os.path.join(cache_dir, key)
+    # Write under a temporary name, so that a concurrent lookup never sees
+    # a partly written result.
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except OSError:
+        logger.exception("Could not cache result {}".format(key))
+        return False
+    if max_size is not None:
+        _evict(keep=key)
+    return True
+
+
+def _evict(keep: str) -> None:
+    """Remove the least recently used results from this worker's cache
+    directory until it fits in max_size, leaving out the result keep.
+
+    Workers of a manager may evict at the same time, and so remove more
+    than they need to; the tasks which refer to those results miss the
+    cache, which they recover from.
+    """
+    assert cache_dir is not None and max_size is not None
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.tmp') or entry.name == keep:
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for (_, size, _) in entries) + os.path.getsize(os.path.join(cache_dir, keep))
+    for (_, size, path) in sorted(entries):
+        if total <= max_size:
+            break
+        logger.debug("Evicting {} from result cache".format(path))
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def load(key: str) -> Any:
+    """Load and deserialize a result from the cache of any manager on this
+    node.
+    """
+    if cache_dir is not None:
+        root = os.path.dirname(cache_dir)
+        candidates = [cache_dir] + [os.path.join(root, d) for d in os.listdir(root)]
+        for d in candidates:
+            path = os.path.join(d, key)
+            try:
+                with open(path, 'rb') as f:
+                    payload = f.read()
+                # The modification time of a cached result records when it
+                # was last used, for eviction.
+                os.utime(path)
+            except OSError:
+                continue
+            logger.debug("Loaded result {} from cache directory {}".format(key, d))
+            return deserialize(payload)
+    raise ResultCacheMiss(key)
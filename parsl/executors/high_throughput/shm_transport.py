@@ -0,0 +1,79 @@
+"""Transport of large task buffers and results between a manager and its
+workers through files in shared memory, rather than through the
+multiprocessing queues which connect them.
+
+A multiprocessing queue pickles whatever is put on it and copies it through
+a pipe, a page at a time, so a large buffer is copied several times on its
+way and a busy manager can be held up writing to the pipes. Instead, a
+buffer over a size threshold is written to a file in a shared memory
+filesystem such as /dev/shm, and only a small SharedBuffer handle is put on
+the queue. The receiver reads the buffer from the file and removes it.
+"""
+import logging
+import os
+import uuid
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHM_DIR = '/dev/shm'
+
+
+class SharedBuffer:
+    """A handle to a buffer held in a file in shared memory."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def take(self) -> bytes:
+        """Read the buffer and remove its file."""
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        os.unlink(self.path)
+        return data
+
+    def discard(self) -> None:
+        """Remove the file of a buffer which will not be read."""
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __repr__(self) -> str:
+        return "<SharedBuffer {}>".format(self.path)
+
+
+class SharedMemoryTransport:
+    """Moves buffers of at least threshold bytes into files in directory.
+
+    If a buffer cannot be written, for example because the shared memory
+    filesystem is full, it is sent through the queue as usual.
+    """
+
+    def __init__(self, directory: str, threshold: int) -> None:
+        self.directory = directory
+        self.threshold = threshold
+
+    def share(self, data: bytes) -> Union[bytes, SharedBuffer]:
+        """Return a SharedBuffer holding data, or data itself if it is
+        below the threshold or cannot be written to shared memory.
+        """
+        if len(data) < self.threshold:
+            return data
+        path = os.path.join(self.directory, uuid.uuid4().hex)
+        try:
+            with open(path, 'xb') as f:
+                f.write(data)
+        except OSError:
+            logger.warning("Could not write {} bytes to shared memory, sending them through the queue".format(len(data)),
+                           exc_info=True)
+            SharedBuffer(path).discard()
+            return data
+        return SharedBuffer(path)
+
+
+def receive(item: Union[bytes, SharedBuffer]) -> bytes:
+    """Return the buffer an item taken off a queue stands for."""
+    if isinstance(item, SharedBuffer):
+        return item.take()
+    return item
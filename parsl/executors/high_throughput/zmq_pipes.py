@@ -2,6 +2,7 @@
 
 import zmq
 import logging
+import pickle
 import threading
 
 from parsl import curvezmq
@@ -106,6 +107,9 @@ class TasksOutgoing:
                                                         max_port=port_range[1])
         self.poller = zmq.Poller()
         self.poller.register(self.zmq_socket, zmq.POLLOUT)
+        # Tasks are sent from the submitting thread, and resent from the
+        # result processing threads, but ZMQ sockets are not thread-safe.
+        self._lock = threading.Lock()
 
     def put(self, message):
         """ This function needs to be fast at the same time aware of the possibility of
@@ -116,18 +120,41 @@ class TasksOutgoing:
         in ZMQ sockets reaching a broken state once there are ~10k tasks in flight.
         This issue can be magnified if each the serialized buffer itself is larger.
         """
+        self.put_many([message])
+
+    def put_many(self, messages):
+        """ Send a batch of task messages to the interchange as a single
+        multipart ZMQ message.
+
+        This amortizes the pipe readiness polling and ZMQ framing over the
+        whole batch, rather than paying them once per task.
+
+        Each message is a dict with a 'function' entry holding the
+        serialized function and a 'buffer' entry holding the serialized
+        arguments. Each message is sent as three frames: the pickled dict
+        without its function and buffer, then the function, then the buffer,
+        so that the (possibly large) function and buffer are not copied again
+        into a pickle.
+        """
+        frames = []
+        for message in messages:
+            header = {k: v for k, v in message.items() if k not in ('function', 'buffer')}
+            frames.append(pickle.dumps(header))
+            frames.append(message['function'])
+            frames.append(message['buffer'])
         timeout_ms = 1
-        while True:
-            socks = dict(self.poller.poll(timeout=timeout_ms))
-            if self.zmq_socket in socks and socks[self.zmq_socket] == zmq.POLLOUT:
-                # The copy option adds latency but reduces the risk of ZMQ overflow
-                logger.debug("Sending TasksOutgoing message")
-                self.zmq_socket.send_pyobj(message, copy=True)
-                logger.debug("Sent TasksOutgoing message")
-                return
-            else:
-                timeout_ms *= 2
-                logger.debug("Not sending due to non-ready zmq pipe, timeout: {} ms".format(timeout_ms))
+        with self._lock:
+            while True:
+                socks = dict(self.poller.poll(timeout=timeout_ms))
+                if self.zmq_socket in socks and socks[self.zmq_socket] == zmq.POLLOUT:
+                    # The copy option adds latency but reduces the risk of ZMQ overflow
+                    logger.debug("Sending TasksOutgoing message with {} frames".format(len(frames)))
+                    self.zmq_socket.send_multipart(frames, copy=True)
+                    logger.debug("Sent TasksOutgoing message")
+                    return
+                else:
+                    timeout_ms *= 2
+                    logger.debug("Not sending due to non-ready zmq pipe, timeout: {} ms".format(timeout_ms))
 
     def close(self):
         self.zmq_socket.close()
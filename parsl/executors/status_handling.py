@@ -10,7 +10,7 @@ from parsl.executors.base import ParslExecutor
 from parsl.executors.errors import BadStateException, ScalingFailed
 from parsl.jobs.states import JobStatus, JobState
 from parsl.jobs.error_handlers import simple_error_handler, noop_error_handler
-from parsl.providers.base import ExecutionProvider
+from parsl.providers.base import BulkSubmit, ExecutionProvider
 from parsl.utils import AtomicIDCounter
 
 logger = logging.getLogger(__name__)
@@ -120,11 +120,38 @@ class BlockProviderExecutor(ParslExecutor):
 
         :return: a dictionary mapping block ids (in string) to job status
         """
+        job_ids = self.status_job_ids()
+        job_status = {}  # type: Dict[Any, JobStatus]
+        if self._provider and job_ids:
+            job_status = dict(zip(job_ids, self._provider.status(job_ids)))
+        return self.status_from_jobs(job_status)
+
+    def status_job_ids(self) -> List[Any]:
+        """Return the ids of the jobs which the provider must be asked the
+        status of, for status_from_jobs to give the status of every block.
+
+        Together with status_from_jobs, this lets executors which share a
+        provider have the status of all of their jobs queried at once.
+        """
+        if not self._provider:
+            return []
+        _, job_ids = self._get_block_and_job_ids()
+        return job_ids
+
+    def status_from_jobs(self, job_status: Dict[Any, JobStatus]) -> Dict[str, JobStatus]:
+        """Return the status of all jobs/blocks currently known to this
+        executor, given the status reported by the provider for the jobs
+        returned by status_job_ids.
+
+        A block launched since status_job_ids was called is pending.
+
+        :return: a dictionary mapping block ids (in string) to job status
+        """
+        status = {}  # type: Dict[str, JobStatus]
         if self._provider:
             block_ids, job_ids = self._get_block_and_job_ids()
-            status = self._make_status_dict(block_ids, self._provider.status(job_ids))
-        else:
-            status = {}
+            for block_id, job_id in zip(block_ids, job_ids):
+                status[block_id] = job_status.get(job_id, JobStatus(JobState.PENDING))
         status.update(self._simulated_status)
 
         return status
@@ -184,14 +211,22 @@ class BlockProviderExecutor(ParslExecutor):
 
     def scale_out(self, blocks: int = 1) -> List[str]:
         """Scales out the number of blocks by "blocks"
+
+        If the provider supports it, several blocks are submitted together
+        with a single scheduler command.
         """
         if not self.provider:
             raise ScalingFailed(self, "No execution provider available")
-        block_ids = []
         logger.info(f"Scaling out by {blocks} blocks")
-        for _ in range(blocks):
-            block_id = str(self._block_id_counter.get_id())
+        new_block_ids = [str(self._block_id_counter.get_id()) for _ in range(blocks)]
+        for block_id in new_block_ids:
             logger.info(f"Allocated block ID {block_id}")
+
+        if blocks > 1 and isinstance(self.provider, BulkSubmit):
+            return self._launch_blocks(new_block_ids)
+
+        block_ids = []
+        for block_id in new_block_ids:
             try:
                 job_id = self._launch_block(block_id)
                 self.blocks[block_id] = job_id
@@ -224,6 +259,27 @@ class BlockProviderExecutor(ParslExecutor):
                                 "Attempt to provision nodes did not return a job ID")
         return job_id
 
+    def _launch_blocks(self, block_ids: List[str]) -> List[str]:
+        """Launch several blocks with a single call to the provider,
+        returning the ids of the blocks which were launched."""
+        assert isinstance(self.provider, BulkSubmit)
+        launch_cmds = [self._get_launch_command(block_id) for block_id in block_ids]
+        job_name = f"parsl.{self.label}.blocks-{block_ids[0]}-{block_ids[-1]}"
+        logger.debug("Submitting %s blocks to provider with job_name %s", len(block_ids), job_name)
+        try:
+            job_ids = self.provider.submit_many(launch_cmds, 1, job_name)
+        except Exception as ex:
+            for block_id in block_ids:
+                self._fail_job_async(block_id,
+                                     "Failed to start block {}: {}".format(block_id, ex))
+            return []
+
+        for block_id, job_id in zip(block_ids, job_ids):
+            logger.debug(f"Launched block {block_id} on executor {self.label} with job ID {job_id}")
+            self.blocks[block_id] = job_id
+            self.block_mapping[job_id] = block_id
+        return block_ids
+
     @abstractmethod
     def _get_launch_command(self, block_id: str) -> str:
         pass
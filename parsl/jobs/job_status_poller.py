@@ -1,13 +1,17 @@
+import functools
 import logging
 import parsl
+import threading
 import time
 import zmq
-from typing import Dict, List, Sequence, Optional, Union
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Sequence, Optional, Tuple, Union
 
 from parsl.jobs.states import JobStatus, JobState
 from parsl.jobs.strategy import Strategy
 from parsl.executors.status_handling import BlockProviderExecutor
 from parsl.monitoring.message_type import MessageType
+from parsl.providers.base import ExecutionProvider
 
 
 from parsl.utils import Timer
@@ -42,17 +46,22 @@ class PollItem:
 
     def poll(self, now: float) -> None:
         if self._should_poll(now):
-            previous_status = self._status
-            self._status = self._executor.status()
-            self._last_poll_time = now
-            delta_status = {}
-            for block_id in self._status:
-                if block_id not in previous_status \
-                   or previous_status[block_id].state != self._status[block_id].state:
-                    delta_status[block_id] = self._status[block_id]
-
-            if delta_status:
-                self.send_monitoring_info(delta_status)
+            self.update_status(now, self._executor.status())
+
+    def update_status(self, now: float, status: Dict[str, JobStatus]) -> None:
+        """Record the status of the blocks of the executor, as queried at
+        time now."""
+        previous_status = self._status
+        self._status = status
+        self._last_poll_time = now
+        delta_status = {}
+        for block_id in self._status:
+            if block_id not in previous_status \
+               or previous_status[block_id].state != self._status[block_id].state:
+                delta_status[block_id] = self._status[block_id]
+
+        if delta_status:
+            self.send_monitoring_info(delta_status)
 
     def send_monitoring_info(self, status: Dict) -> None:
         # Send monitoring info for HTEX when monitoring enabled
@@ -107,6 +116,21 @@ class PollItem:
 
 
 class JobStatusPoller(Timer):
+    """Periodically polls the status of the blocks of each executor, and
+    runs the scaling strategy.
+
+    Status queries, which may shell out to a batch scheduler, run in a
+    thread pool, so that a slow scheduler holds up neither the other
+    executors nor the timer thread. The jobs of all executors which share a
+    provider are queried together, with a single call to its status method,
+    and a provider is never queried again while a query is running. Each
+    query records its results as it completes, and every strategy period the
+    error handlers and the strategy are run once over all executors, using
+    the most recent status of each. Between queries, which are made at most
+    once every status_polling_interval of the executor, the most recent
+    status is used.
+    """
+
     def __init__(self, *, strategy: Optional[str], max_idletime: float,
                  strategy_period: Union[float, int],
                  dfk: Optional["parsl.dataflow.dflow.DataFlowKernel"] = None) -> None:
@@ -114,21 +138,80 @@ class JobStatusPoller(Timer):
         self.dfk = dfk
         self._strategy = Strategy(strategy=strategy,
                                   max_idletime=max_idletime)
+        self._status_queries = ThreadPoolExecutor(thread_name_prefix="JobStatusPoller-Query")
+        # Queries are keyed by the id of the provider they query
+        self._in_flight = {}  # type: Dict[int, Future]
+        self._results_lock = threading.Lock()
+        self._results = {}  # type: Dict[PollItem, Tuple[float, Dict[str, JobStatus]]]
         super().__init__(self.poll, interval=strategy_period, name="JobStatusPoller")
 
     def poll(self) -> None:
-        self._update_state()
+        self._record_results()
+        self._start_queries(time.time())
         self._run_error_handlers(self._poll_items)
         self._strategy.strategize(self._poll_items)
 
+    def _start_queries(self, now: float) -> None:
+        """Start a status query for each provider with executors which are
+        due one, unless a query of that provider is already running."""
+        due = {}  # type: Dict[int, List[PollItem]]
+        for item in self._poll_items:
+            if item._should_poll(now):
+                due.setdefault(id(item.executor.provider), []).append(item)
+
+        for key, items in due.items():
+            with self._results_lock:
+                if key in self._in_flight:
+                    continue
+                query = self._status_queries.submit(self._query, items[0].executor.provider, items)
+                self._in_flight[key] = query
+            query.add_done_callback(functools.partial(self._finish_query, key))
+
+    def _query(self, provider: ExecutionProvider,
+               items: List[PollItem]) -> Dict[PollItem, Tuple[float, Dict[str, JobStatus]]]:
+        """Query the status of the blocks of each of items, which share
+        provider, with a single call to the provider."""
+        labels = [item.executor.label for item in items]
+        try:
+            job_ids = [job_id for item in items for job_id in item.executor.status_job_ids()]
+            job_status: Dict[Any, JobStatus] = {}
+            if job_ids:
+                job_status = dict(zip(job_ids, provider.status(job_ids)))
+            now = time.time()
+            return {item: (now, item.executor.status_from_jobs(job_status)) for item in items}
+        except Exception:
+            logger.exception("Status query for executors {} failed".format(labels))
+            return {}
+
+    def _finish_query(self, key: int, query: Future) -> None:
+        """Keep the results of a completed query for the next poll."""
+        with self._results_lock:
+            del self._in_flight[key]
+            if not query.cancelled():
+                self._results.update(query.result())
+
+    def _record_results(self) -> None:
+        """Record the status of each executor whose query has completed since
+        the last poll."""
+        with self._results_lock:
+            results, self._results = self._results, {}
+        for item, (now, status) in results.items():
+            item.update_status(now, status)
+
     def _run_error_handlers(self, status: List[PollItem]) -> None:
         for es in status:
             es.executor.handle_errors(es.status)
 
-    def _update_state(self) -> None:
-        now = time.time()
-        for item in self._poll_items:
-            item.poll(now)
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop polling, cancelling status queries which have not started and
+        waiting up to timeout for those which have."""
+        super().close(timeout=timeout)
+        with self._results_lock:
+            queries = list(self._in_flight.values())
+        for query in queries:
+            query.cancel()
+        wait(queries, timeout=timeout)
+        self._status_queries.shutdown(wait=False)
 
     def add_executors(self, executors: Sequence[BlockProviderExecutor]) -> None:
         for executor in executors:
@@ -3,14 +3,14 @@ import logging
 import time
 import math
 import warnings
-from typing import Dict, List, Optional, Sequence, TypedDict
+from typing import Dict, List, Optional, Sequence, Set, TypedDict
 
 import parsl.jobs.job_status_poller as jsp
 
 from parsl.executors import HighThroughputExecutor
 from parsl.executors.base import ParslExecutor
 from parsl.executors.status_handling import BlockProviderExecutor
-from parsl.jobs.states import JobState
+from parsl.jobs.states import JobState, JobStatus
 from parsl.process_loggers import wrap_with_logs
 
 
@@ -27,6 +27,83 @@ class ExecutorState(TypedDict):
     """
 
 
+class DemandModel:
+    """A model of the demand on an executor, used by the 'predictive'
+    strategy to forecast how many tasks will be outstanding by the time a
+    newly requested block starts running.
+
+    The model keeps exponentially weighted moving averages of the task
+    arrival rate, the task completion rate, and the startup latency of
+    blocks (the time from a block first being seen as PENDING to it being
+    seen as RUNNING).
+
+    Arrivals and completions are counted from the changes in the set of
+    task IDs held by the executor between observations, so a task which
+    arrives and completes between two observations is counted in neither.
+    """
+
+    def __init__(self, smoothing: float = 0.3) -> None:
+        self.smoothing = smoothing
+
+        self.arrival_rate = 0.0
+        """Tasks arriving at the executor per second."""
+
+        self.completion_rate = 0.0
+        """Tasks completed by the executor per second."""
+
+        self.startup_latency: Optional[float] = None
+        """Seconds for a block to go from PENDING to RUNNING, or None if
+        no block has been seen starting yet."""
+
+        self._task_ids: Optional[Set[object]] = None
+        self._last_observed: Optional[float] = None
+        self._pending_since: Dict[str, float] = {}
+        self._started: Set[str] = set()
+
+    def _smooth(self, average: float, sample: float) -> float:
+        return self.smoothing * sample + (1 - self.smoothing) * average
+
+    def observe_tasks(self, now: float, task_ids: Set[object]) -> None:
+        """Update the arrival and completion rates from the IDs of the
+        tasks held by the executor at time now."""
+        if self._task_ids is not None and self._last_observed is not None and now > self._last_observed:
+            elapsed = now - self._last_observed
+            arrivals = len(task_ids - self._task_ids)
+            completions = len(self._task_ids - task_ids)
+            self.arrival_rate = self._smooth(self.arrival_rate, arrivals / elapsed)
+            self.completion_rate = self._smooth(self.completion_rate, completions / elapsed)
+        self._task_ids = task_ids
+        self._last_observed = now
+
+    def observe_blocks(self, now: float, status: Dict[str, JobStatus]) -> None:
+        """Update the block startup latency from the status of the blocks
+        of the executor at time now."""
+        for block_id, job_status in status.items():
+            if job_status.state == JobState.PENDING:
+                self._pending_since.setdefault(block_id, now)
+            elif job_status.state == JobState.RUNNING and block_id not in self._started:
+                self._started.add(block_id)
+                pending_since = self._pending_since.pop(block_id, None)
+                if pending_since is not None:
+                    latency = now - pending_since
+                    if self.startup_latency is None:
+                        self.startup_latency = latency
+                    else:
+                        self.startup_latency = self._smooth(self.startup_latency, latency)
+                    logger.debug(f"Block {block_id} started after {latency}s; startup latency estimate is now {self.startup_latency}s")
+
+        for block_id in list(self._pending_since):
+            if block_id not in status:
+                del self._pending_since[block_id]
+        self._started.intersection_update(status)
+
+    def forecast(self, outstanding: int) -> float:
+        """Forecast the number of outstanding tasks one block startup
+        latency from now, given the number outstanding now."""
+        horizon = self.startup_latency or 0.0
+        return max(0.0, outstanding + (self.arrival_rate - self.completion_rate) * horizon)
+
+
 class Strategy:
     """Scaling strategy.
 
@@ -127,12 +204,14 @@ class Strategy:
         """Initialize strategy."""
         self.executors: Dict[str, ExecutorState]
         self.executors = {}
+        self.demand_models: Dict[str, DemandModel] = {}
         self.max_idletime = max_idletime
 
         self.strategies = {None: self._strategy_init_only,
                            'none': self._strategy_init_only,
                            'simple': self._strategy_simple,
-                           'htex_auto_scale': self._strategy_htex_auto_scale}
+                           'htex_auto_scale': self._strategy_htex_auto_scale,
+                           'predictive': self._strategy_predictive}
 
         if strategy is None:
             warnings.warn("literal None for strategy choice is deprecated. Use string 'none' instead.",
@@ -145,6 +224,7 @@ class Strategy:
     def add_executors(self, executors: Sequence[ParslExecutor]) -> None:
         for executor in executors:
             self.executors[executor.label] = {'idle_since': None}
+            self.demand_models[executor.label] = DemandModel()
 
     def _strategy_init_only(self, status_list: List[jsp.PollItem]) -> None:
         """Scale up to init_blocks at the start, then nothing more.
@@ -178,6 +258,87 @@ class Strategy:
         """
         self._general_strategy(status_list, strategy_type='htex')
 
+    def _strategy_predictive(self, status_list: List[jsp.PollItem]) -> None:
+        """Scaling strategy which provisions blocks for forecast demand.
+
+        Block requests to batch systems can take many minutes to start
+        running, so a strategy which only reacts to the current number of
+        outstanding tasks will under-provision as a workload ramps up, and
+        hold on to blocks while it drains. This strategy uses a
+        :class:`DemandModel` for each executor to forecast the number of
+        outstanding tasks one block startup latency ahead, and sizes the
+        executor for the larger of that forecast and the current number of
+        outstanding tasks, using the provider's parallelism in the same way
+        as the 'simple' strategy.
+
+        Scaling in is gradual: on each strategy period, at most half of the
+        excess blocks are released, and only blocks which have been idle for
+        max_idletime, so a lull between bursts does not lose blocks which
+        would be slow to replace. Scaling in while there are outstanding
+        tasks is only supported for the HighThroughputExecutor; other
+        executors are scaled in to min_blocks once they have had no
+        outstanding tasks for max_idletime.
+        """
+        now = time.time()
+        for exec_status in status_list:
+            executor = exec_status.executor
+            label = executor.label
+            model = self.demand_models[label]
+
+            if exec_status.first:
+                logger.debug(f"Scaling out {executor.provider.init_blocks} initial blocks for {label}")
+                exec_status.scale_out(executor.provider.init_blocks)
+                exec_status.first = False
+
+            model.observe_tasks(now, set(executor.tasks.copy()))
+            model.observe_blocks(now, exec_status.status)
+
+            active_tasks = executor.outstanding
+            forecast_tasks = model.forecast(active_tasks)
+            demand = max(float(active_tasks), forecast_tasks)
+
+            min_blocks = executor.provider.min_blocks
+            max_blocks = executor.provider.max_blocks
+            slots_per_block = executor.workers_per_node * executor.provider.nodes_per_block
+            parallelism = executor.provider.parallelism
+
+            status = exec_status.status
+            active_blocks = sum(1 for x in status.values() if x.state in (JobState.RUNNING, JobState.PENDING))
+
+            target_blocks = math.ceil(demand * parallelism / slots_per_block)
+            if demand > 0:
+                target_blocks = max(target_blocks, 1)
+            target_blocks = min(max(target_blocks, min_blocks), max_blocks)
+
+            logger.debug(f"Executor {label} has {active_tasks} active tasks, forecast {forecast_tasks} "
+                         f"(arrival rate {model.arrival_rate}/s, completion rate {model.completion_rate}/s, "
+                         f"startup latency {model.startup_latency}s), {active_blocks} active blocks "
+                         f"and target {target_blocks} blocks")
+
+            if demand > 0:
+                self.executors[label]['idle_since'] = None
+
+            if target_blocks > active_blocks:
+                logger.debug(f"Requesting {target_blocks - active_blocks} more blocks")
+                exec_status.scale_out(target_blocks - active_blocks)
+                model.observe_blocks(now, exec_status.status)
+
+            elif demand == 0 and active_blocks > min_blocks:
+                if not self.executors[label]['idle_since']:
+                    logger.debug(f"Starting idle timer for executor. If idle time exceeds {self.max_idletime}s, blocks will be scaled in")
+                    self.executors[label]['idle_since'] = now
+
+                idle_since = self.executors[label]['idle_since']
+                assert idle_since is not None
+                if now - idle_since > self.max_idletime:
+                    logger.debug(f"Idle time has reached {self.max_idletime}s for executor {label}; scaling in")
+                    exec_status.scale_in(active_blocks - min_blocks)
+
+            elif target_blocks < active_blocks and isinstance(executor, HighThroughputExecutor):
+                excess_blocks = math.ceil((active_blocks - target_blocks) / 2)
+                logger.debug(f"Requesting scaling in by {excess_blocks} blocks with idle time {self.max_idletime}s")
+                exec_status.scale_in(excess_blocks, max_idletime=self.max_idletime)
+
     @wrap_with_logs
     def _general_strategy(self, status_list, *, strategy_type):
         logger.debug(f"general strategy starting with strategy_type {strategy_type} for {len(status_list)} executors")
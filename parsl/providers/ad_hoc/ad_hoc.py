@@ -204,13 +204,21 @@ class AdHocProvider(ExecutionProvider, RepresentationMixin):
         -------
         list of JobStatus objects
         """
+        # Query all of the jobs on each channel in one batch, so that
+        # channels which can run commands concurrently do so
+        jobs_by_channel = {}
         for job_id in job_ids:
             channel = self.resources[job_id]['channel']
-            status_command = "ps --pid {} | grep {}".format(self.resources[job_id]['job_id'],
-                                                            self.resources[job_id]['cmd'].split()[0])
-            retcode, stdout, stderr = channel.execute_wait(status_command)
-            if retcode != 0 and self.resources[job_id]['status'].state == JobState.RUNNING:
-                self.resources[job_id]['status'] = JobStatus(JobState.FAILED)
+            jobs_by_channel.setdefault(id(channel), (channel, []))[1].append(job_id)
+
+        for channel, channel_job_ids in jobs_by_channel.values():
+            status_commands = ["ps --pid {} | grep {}".format(self.resources[job_id]['job_id'],
+                                                              self.resources[job_id]['cmd'].split()[0])
+                               for job_id in channel_job_ids]
+            results = channel.execute_many(status_commands)
+            for job_id, (retcode, stdout, stderr) in zip(channel_job_ids, results):
+                if retcode != 0 and self.resources[job_id]['status'].state == JobState.RUNNING:
+                    self.resources[job_id]['status'] = JobStatus(JobState.FAILED)
 
         return [self.resources[job_id]['status'] for job_id in job_ids]
 
@@ -169,3 +169,35 @@ class MultiChanneled():
     def __init__(self) -> None:
         self.channels: List[Channel]
         pass
+
+
+class BulkSubmit(metaclass=ABCMeta):
+    """A mixin for providers which can submit several jobs with a single
+    scheduler command, for example as the elements of a job array.
+
+    Executors use this when scaling out by more than one block, instead of
+    calling ``submit`` once per block.
+    """
+
+    @abstractmethod
+    def submit_many(self, commands: List[str], tasks_per_node: int, job_name: str = "parsl.auto") -> List[Any]:
+        ''' Submit one job for each of the commands, with a single scheduler
+        command.
+
+        Args :
+             - commands (list of str) : The bash command strings to be executed, one per job
+             - tasks_per_node (int) : command invocations to be launched per node
+
+        KWargs:
+             - job_name (str) : Human friendly name to be assigned to the jobs
+
+        Returns:
+             - A list of job identifiers, one for each command, in the same
+               order as the commands.
+
+        Raises:
+             - ExecutionProviderException or its subclasses, if the jobs could
+               not be submitted. In that case, none of the jobs were submitted.
+        '''
+
+        pass
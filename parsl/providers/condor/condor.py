@@ -246,14 +246,15 @@ class CondorProvider(RepresentationMixin, ClusterProvider):
         with open(userscript_path, 'w') as f:
             f.write(job_config["worker_init"] + '\n' + wrapped_command)
 
-        user_script_path = self.channel.push_file(userscript_path, self.channel.script_dir)
+        user_script_path = os.path.join(self.channel.script_dir, os.path.basename(userscript_path))
         the_input_files = [user_script_path] + self.transfer_input_files
         job_config["input_files"] = ','.join(the_input_files)
         job_config["job_script"] = os.path.basename(user_script_path)
 
-        # Construct and move the submit script
+        # Construct the submit script, and move it together with the user
+        # script, in a single transfer where the channel supports that
         self._write_submit_script(template_string, script_path, job_name, job_config)
-        channel_script_path = self.channel.push_file(script_path, self.channel.script_dir)
+        _, channel_script_path = self.channel.push_files([userscript_path, script_path], self.channel.script_dir)
 
         cmd = "condor_submit {0}".format(channel_script_path)
         try:
@@ -5,13 +5,14 @@ import logging
 import re
 import typeguard
 
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 from parsl.channels import LocalChannel
 from parsl.channels.base import Channel
 from parsl.jobs.states import JobState, JobStatus
 from parsl.launchers import SingleNodeLauncher
 from parsl.launchers.base import Launcher
+from parsl.providers.base import BulkSubmit
 from parsl.providers.cluster_provider import ClusterProvider
 from parsl.providers.errors import SubmitException
 from parsl.providers.slurm.template import template_string
@@ -34,7 +35,7 @@ translate_table = {
 }
 
 
-class SlurmProvider(ClusterProvider, RepresentationMixin):
+class SlurmProvider(ClusterProvider, BulkSubmit, RepresentationMixin):
     """Slurm Execution Provider
 
     This provider uses sbatch to submit, squeue for status and scancel to cancel
@@ -168,7 +169,8 @@ class SlurmProvider(ClusterProvider, RepresentationMixin):
             logger.debug('No active jobs, skipping status update')
             return
 
-        cmd = "squeue --noheader --format='%i %t' --job '{0}'".format(job_id_list)
+        # --array lists each element of a job array on a line of its own
+        cmd = "squeue --noheader --array --format='%i %t' --job '{0}'".format(job_id_list)
         logger.debug("Executing %s", cmd)
         retcode, stdout, stderr = self.execute_wait(cmd)
         logger.debug("squeue returned %s %s", stdout, stderr)
@@ -218,6 +220,90 @@ class SlurmProvider(ClusterProvider, RepresentationMixin):
             A string identifier for the job
         """
 
+        job_name = "{0}.{1}".format(job_name, time.time())
+        script_path = self._script_path(job_name)
+        job_stdout_path = script_path + ".stdout"
+        job_stderr_path = script_path + ".stderr"
+
+        logger.debug("Requesting one block with {} nodes".format(self.nodes_per_block))
+
+        job_config = self._job_config(tasks_per_node, job_stdout_path, job_stderr_path)
+
+        # Wrap the command
+        job_config["user_script"] = self.launcher(command,
+                                                  tasks_per_node,
+                                                  self.nodes_per_block)
+
+        job_id = self._sbatch(job_name, script_path, job_config)
+        self.resources[job_id] = {'job_id': job_id,
+                                  'status': JobStatus(JobState.PENDING),
+                                  'job_stdout_path': job_stdout_path,
+                                  'job_stderr_path': job_stderr_path,
+                                  }
+        return job_id
+
+    def submit_many(self, commands: List[str], tasks_per_node: int, job_name="parsl.slurm") -> List[str]:
+        """Submit the commands as the elements of a single slurm job array,
+        with one call to sbatch.
+
+        Each element of the array is a job of its own, with an id of the form
+        ``<array job id>_<index>``, which can be queried and cancelled
+        independently of the other elements.
+
+        Parameters
+        ----------
+        commands : list of str
+            Commands to be made on the remote side, one per array element.
+        tasks_per_node : int
+            Command invocations to be launched per node
+        job_name : str
+            Name for the job array
+        Returns
+        -------
+        job ids : list of str
+            A string identifier for the job running each command
+        """
+
+        job_name = "{0}.{1}".format(job_name, time.time())
+        script_path = self._script_path(job_name)
+
+        logger.debug("Requesting {} blocks with {} nodes".format(len(commands), self.nodes_per_block))
+
+        # %a is replaced by slurm with the index of the array element
+        job_config = self._job_config(tasks_per_node, script_path + ".%a.stdout", script_path + ".%a.stderr")
+        job_config["scheduler_options"] = "#SBATCH --array=0-{}\n".format(len(commands) - 1) + job_config["scheduler_options"]
+
+        # Each element runs its own command. The job name is extended with
+        # the index of the element, so that launchers which write files named
+        # after the job do not clash between elements sharing a directory.
+        user_script = ('export JOBNAME="$JOBNAME.$SLURM_ARRAY_TASK_ID"\n'
+                       'export SLURM_JOB_NAME="$SLURM_JOB_NAME.$SLURM_ARRAY_TASK_ID"\n'
+                       'case "$SLURM_ARRAY_TASK_ID" in\n')
+        for index, command in enumerate(commands):
+            launch_cmd = self.launcher(command, tasks_per_node, self.nodes_per_block)
+            user_script += "{})\n{}\n;;\n".format(index, launch_cmd)
+        user_script += "esac\n"
+        job_config["user_script"] = user_script
+
+        array_job_id = self._sbatch(job_name, script_path, job_config)
+        job_ids = []
+        for index in range(len(commands)):
+            job_id = "{}_{}".format(array_job_id, index)
+            self.resources[job_id] = {'job_id': job_id,
+                                      'status': JobStatus(JobState.PENDING),
+                                      'job_stdout_path': "{}.{}.stdout".format(script_path, index),
+                                      'job_stderr_path': "{}.{}.stderr".format(script_path, index),
+                                      }
+            job_ids.append(job_id)
+        return job_ids
+
+    def _script_path(self, job_name: str) -> str:
+        assert self.script_dir, "Expected script_dir to be set"
+        return os.path.abspath(os.path.join(self.script_dir, job_name))
+
+    def _job_config(self, tasks_per_node: int, job_stdout_path: str, job_stderr_path: str) -> Dict[str, Any]:
+        """Return the settings, other than the user script, to fill in the
+        submit script template with."""
         scheduler_options = self.scheduler_options
         worker_init = self.worker_init
         if self.mem_per_node is not None:
@@ -228,32 +314,20 @@ class SlurmProvider(ClusterProvider, RepresentationMixin):
             scheduler_options += '#SBATCH --cpus-per-task={}'.format(cpus_per_task)
             worker_init += 'export PARSL_CORES={}\n'.format(cpus_per_task)
 
-        job_name = "{0}.{1}".format(job_name, time.time())
-
-        assert self.script_dir, "Expected script_dir to be set"
-        script_path = os.path.join(self.script_dir, job_name)
-        script_path = os.path.abspath(script_path)
-        job_stdout_path = script_path + ".stdout"
-        job_stderr_path = script_path + ".stderr"
-
-        logger.debug("Requesting one block with {} nodes".format(self.nodes_per_block))
-
-        job_config = {}
+        job_config: Dict[str, Any] = {}
         job_config["submit_script_dir"] = self.channel.script_dir
         job_config["nodes"] = self.nodes_per_block
         job_config["tasks_per_node"] = tasks_per_node
         job_config["walltime"] = wtime_to_minutes(self.walltime)
         job_config["scheduler_options"] = scheduler_options
         job_config["worker_init"] = worker_init
-        job_config["user_script"] = command
         job_config["job_stdout_path"] = job_stdout_path
         job_config["job_stderr_path"] = job_stderr_path
+        return job_config
 
-        # Wrap the command
-        job_config["user_script"] = self.launcher(command,
-                                                  tasks_per_node,
-                                                  self.nodes_per_block)
-
+    def _sbatch(self, job_name: str, script_path: str, job_config: Dict[str, Any]) -> str:
+        """Write the submit script, submit it with sbatch and return the
+        job id reported by sbatch."""
         logger.debug("Writing submit script")
         self._write_submit_script(template_string, script_path, job_name, job_config)
 
@@ -270,13 +344,7 @@ class SlurmProvider(ClusterProvider, RepresentationMixin):
             for line in stdout.split('\n'):
                 match = re.match(self.regex_job_id, line)
                 if match:
-                    job_id = match.group("id")
-                    self.resources[job_id] = {'job_id': job_id,
-                                              'status': JobStatus(JobState.PENDING),
-                                              'job_stdout_path': job_stdout_path,
-                                              'job_stderr_path': job_stderr_path,
-                                              }
-                    return job_id
+                    return match.group("id")
             else:
                 logger.error("Could not read job ID from submit command standard output.")
                 logger.error("Retcode:%s STDOUT:%s STDERR:%s", retcode, stdout.strip(), stderr.strip())
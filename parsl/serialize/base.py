@@ -2,7 +2,7 @@ from abc import abstractmethod
 from functools import cached_property
 import logging
 
-from typing import Any
+from typing import Any, Union
 
 logger = logging.getLogger(__name__)
 
@@ -35,5 +35,9 @@ class SerializerBase:
         pass
 
     @abstractmethod
-    def deserialize(self, payload: bytes) -> Any:
+    def deserialize(self, payload: Union[bytes, memoryview]) -> Any:
+        """Deserialize a payload. The payload may be a memoryview onto a
+        larger buffer, so implementations should not keep a reference to it
+        once deserialization is complete.
+        """
         pass
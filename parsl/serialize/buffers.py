@@ -0,0 +1,54 @@
+import struct
+from typing import List, Sequence, Union
+
+# Each buffer packed by pack_buffers is preceded by its length, as an
+# unsigned 64-bit big-endian integer.
+_BUFFER_HEADER = struct.Struct('>Q')
+
+
+def pack_buffers(buffers: Sequence[Union[bytes, memoryview]]) -> bytes:
+    """Pack a list of byte sequences into a single byte sequence.
+
+    Each buffer is preceded by a fixed width header holding its length, so
+    that unpack_buffers can find buffer boundaries without scanning the
+    payload. The packed result is built with a single join, rather than by
+    repeated concatenation.
+
+    Parameters
+    ----------
+    buffers: list of byte strings or memoryviews
+    """
+    parts = []
+    for buf in buffers:
+        parts.append(_BUFFER_HEADER.pack(len(buf)))
+        parts.append(buf)
+
+    return b''.join(parts)
+
+
+def unpack_buffers(packed_buffer: Union[bytes, memoryview]) -> List[memoryview]:
+    """Unpack a byte sequence made by pack_buffers.
+
+    The returned buffers are memoryviews onto packed_buffer, so no payload
+    bytes are copied; they remain valid for as long as packed_buffer does.
+
+    Parameters
+    ----------
+    packed_buffers : packed buffer as byte sequence
+    """
+    view = memoryview(packed_buffer)
+    total_length = len(view)
+    header_length = _BUFFER_HEADER.size
+
+    unpacked = []
+    offset = 0
+    while offset < total_length:
+        (i_length,) = _BUFFER_HEADER.unpack_from(view, offset)
+        offset += header_length
+        if offset + i_length > total_length:
+            raise ValueError("Packed buffer is truncated: expected {} bytes at offset {}, but only {} remain".format(
+                i_length, offset, total_length - offset))
+        unpacked.append(view[offset:offset + i_length])
+        offset += i_length
+
+    return unpacked
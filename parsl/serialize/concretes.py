@@ -6,7 +6,7 @@ import logging
 logger = logging.getLogger(__name__)
 from parsl.serialize.base import SerializerBase
 
-from typing import Any
+from typing import Any, Union
 
 
 class PickleSerializer(SerializerBase):
@@ -22,7 +22,7 @@ class PickleSerializer(SerializerBase):
     def serialize(self, data: Any) -> bytes:
         return pickle.dumps(data)
 
-    def deserialize(self, body: bytes) -> Any:
+    def deserialize(self, body: Union[bytes, memoryview]) -> Any:
         return pickle.loads(body)
 
 
@@ -43,7 +43,7 @@ class DillSerializer(SerializerBase):
     def serialize(self, data: Any) -> bytes:
         return dill.dumps(data)
 
-    def deserialize(self, body: bytes) -> Any:
+    def deserialize(self, body: Union[bytes, memoryview]) -> Any:
         return dill.loads(body)
 
 
@@ -59,6 +59,12 @@ class DillCallableSerializer(SerializerBase):
     def serialize(self, data: Any) -> bytes:
         return dill.dumps(data)
 
+    def deserialize(self, body: Union[bytes, memoryview]) -> Any:
+        # A memoryview body would keep its whole underlying buffer (including
+        # any task arguments packed alongside it) alive in the cache, so the
+        # cache is keyed on a copy of the body instead.
+        return self._deserialize_cached(bytes(body))
+
     @functools.lru_cache
-    def deserialize(self, body: bytes) -> Any:
+    def _deserialize_cached(self, body: bytes) -> Any:
         return dill.loads(body)
@@ -1,9 +1,10 @@
 import importlib
 import logging
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Tuple, Union
 
 import parsl.serialize.concretes as concretes
 from parsl.serialize.base import SerializerBase
+from parsl.serialize.buffers import pack_buffers, unpack_buffers
 from parsl.serialize.errors import DeserializerPluginError
 
 logger = logging.getLogger(__name__)
@@ -35,6 +36,10 @@ register_method_for_data(concretes.DillSerializer())
 # cause it to be used for future serializations.
 additional_methods_for_deserialization: Dict[bytes, SerializerBase] = {}
 
+# Serializer identifiers are short, so deserialize first looks for the end
+# of the header in a prefix of this many bytes, to avoid copying the payload.
+_HEADER_SEARCH_LENGTH = 256
+
 
 def pack_apply_message(func: Any, args: Any, kwargs: Any, buffer_threshold: int = int(128 * 1e6)) -> bytes:
     """Serialize and pack function and parameters
@@ -87,13 +92,13 @@ def pack_res_spec_apply_message(func: Any, args: Any, kwargs: Any, resource_spec
     return pack_apply_message(func, args, (kwargs, resource_specification), buffer_threshold=buffer_threshold)
 
 
-def unpack_apply_message(packed_buffer: bytes, user_ns: Any = None, copy: Any = False) -> List[Any]:
+def unpack_apply_message(packed_buffer: Union[bytes, memoryview], user_ns: Any = None, copy: Any = False) -> List[Any]:
     """ Unpack and deserialize function and parameters
     """
     return [deserialize(buf) for buf in unpack_buffers(packed_buffer)]
 
 
-def unpack_res_spec_apply_message(packed_buffer: bytes, user_ns: Any = None, copy: Any = False) -> List[Any]:
+def unpack_res_spec_apply_message(packed_buffer: Union[bytes, memoryview], user_ns: Any = None, copy: Any = False) -> List[Any]:
     """ Unpack and deserialize function, parameters, and resource_specification
     """
     func, args, (kwargs, resource_spec) = unpack_apply_message(packed_buffer, user_ns=user_ns, copy=copy)
@@ -129,15 +134,16 @@ def serialize(obj: Any, buffer_threshold: int = int(1e6)) -> bytes:
         return result
 
 
-def deserialize(payload: bytes) -> Any:
+def deserialize(payload: Union[bytes, memoryview]) -> Any:
     """
     Parameters
     ----------
-    payload : str
-       Payload object to be deserialized
+    payload : bytes or memoryview
+       Payload object to be deserialized. The body of the payload is passed
+       to the deserializer without being copied.
 
     """
-    header, body = payload.split(b'\n', 1)
+    header, body = _split_header(payload)
 
     if header in methods_for_code:
         deserializer = methods_for_code[header]
@@ -163,50 +169,30 @@ def deserialize(payload: bytes) -> Any:
     return result
 
 
-def pack_buffers(buffers: List[bytes]) -> bytes:
-    """
-    Parameters
-    ----------
-    buffers: list of byte strings
-    """
-    packed = b''
-    for buf in buffers:
-        s_length = bytes(str(len(buf)) + '\n', 'utf-8')
-        packed += s_length + buf
-
-    return packed
-
-
-def unpack_buffers(packed_buffer: bytes) -> List[bytes]:
+def _split_header(payload: Union[bytes, memoryview]) -> Tuple[bytes, memoryview]:
+    """Split a serialized payload into its serializer identifier and body,
+    without copying the body.
     """
-    Parameters
-    ----------
-    packed_buffers : packed buffer as byte sequence
-    """
-    unpacked = []
-    while packed_buffer:
-        s_length, buf = packed_buffer.split(b'\n', 1)
-        i_length = int(s_length.decode('utf-8'))
-        current, packed_buffer = buf[:i_length], buf[i_length:]
-        unpacked.extend([current])
-
-    return unpacked
-
-
-def unpack_and_deserialize(packed_buffer: bytes) -> Any:
+    view = memoryview(payload)
+    search_length = _HEADER_SEARCH_LENGTH
+    while True:
+        prefix = bytes(view[:search_length])
+        newline = prefix.find(b'\n')
+        if newline >= 0:
+            return prefix[:newline], view[newline + 1:]
+        if search_length >= len(view):
+            raise ValueError("Serialized payload has no header")
+        search_length *= 2
+
+
+def unpack_and_deserialize(packed_buffer: Union[bytes, memoryview]) -> Any:
     """ Unpacks a packed buffer of 3 byte sequences and returns the
     deserialized contents for use in function application.
     Parameters
     ----------
     packed_buffers : packed buffer of 3 byte sequences
     """
-    unpacked = []
-    while packed_buffer:
-        s_length, buf = packed_buffer.split(b'\n', 1)
-        i_length = int(s_length.decode('utf-8'))
-        current, packed_buffer = buf[:i_length], buf[i_length:]
-        deserialized = deserialize(current)
-        unpacked.extend([deserialized])
+    unpacked = [deserialize(buf) for buf in unpack_buffers(packed_buffer)]
 
     assert len(unpacked) == 3, "Unpack expects 3 buffers, got {}".format(len(unpacked))
 
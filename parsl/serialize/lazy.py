@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional, Tuple
+
+from parsl.serialize.facade import deserialize
+
+
+class SerializedResult:
+    """The result of a task, as serialized by :func:`~parsl.serialize.serialize`,
+    which is only deserialized when its value is needed.
+
+    Pickling a SerializedResult embeds the serialized bytes, and unpickling
+    it deserializes them. So a SerializedResult passed as an argument to a
+    task on an executor which pickles task arguments reaches the task as the
+    value it stands for, without being deserialized and serialized again on
+    the way.
+    """
+
+    def __init__(self, payload: bytes) -> None:
+        self._payload: Optional[bytes] = payload
+        self._value: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def deserialized(self) -> bool:
+        return self._payload is None
+
+    def value(self) -> Any:
+        """Return the deserialized value, deserializing it on the first call."""
+        with self._lock:
+            if self._payload is not None:
+                self._value = deserialize(self._payload)
+                self._payload = None
+            return self._value
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any]]:
+        with self._lock:
+            if self._payload is not None:
+                return (deserialize, (self._payload,))
+        return (_identity, (self._value,))
+
+    def __repr__(self) -> str:
+        if self.deserialized:
+            return "<SerializedResult deserialized>"
+        return "<SerializedResult {} bytes>".format(len(self._payload or b''))
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def result_value(result: Any) -> Any:
+    """Return the value of a result, deserializing it if it is a SerializedResult."""
+    if isinstance(result, SerializedResult):
+        return result.value()
+    return result
+
+
+class LazyResultFuture(Future):
+    """A Future whose result may be set to a :class:`SerializedResult`.
+
+    ``result()`` returns the deserialized value, deserializing it on first
+    use, while ``serialized_result()`` returns the result as it was set, so
+    that it can be passed on to another task without being deserialized.
+    """
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return result_value(super().result(timeout))
+
+    def serialized_result(self, timeout: Optional[float] = None) -> Any:
+        """Return the result of this future, without deserializing it if it
+        is a SerializedResult."""
+        return super().result(timeout)
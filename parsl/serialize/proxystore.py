@@ -43,7 +43,7 @@ class ProxyStoreSerializer(SerializerBase):
         pickler.dump(data)
         return f.getvalue()
 
-    def deserialize(self, body: bytes) -> t.Any:
+    def deserialize(self, body: t.Union[bytes, memoryview]) -> t.Any:
         # because we aren't customising deserialization, use regular
         # dill for deserialization
         return dill.loads(body)
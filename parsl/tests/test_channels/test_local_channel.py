@@ -0,0 +1,30 @@
+import os
+
+import pytest
+
+from parsl.channels.local.local import LocalChannel
+
+
+@pytest.mark.local
+def test_execute_many():
+    c = LocalChannel()
+
+    results = c.execute_many(["echo -n one", "echo -n two 1>&2; exit 3"])
+
+    assert results == [(0, 'one', ''), (3, '', 'two')]
+
+
+@pytest.mark.local
+def test_push_files(tmpd_cwd):
+    sources = []
+    for name in ('a.sh', 'b.sh'):
+        path = tmpd_cwd / name
+        path.write_text(name)
+        sources.append(str(path))
+    dest_dir = tmpd_cwd / 'dest'
+    os.makedirs(dest_dir)
+
+    dests = LocalChannel().push_files(sources, str(dest_dir))
+
+    assert dests == [str(dest_dir / 'a.sh'), str(dest_dir / 'b.sh')]
+    assert (dest_dir / 'b.sh').read_text() == 'b.sh'
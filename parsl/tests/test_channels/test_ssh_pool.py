@@ -0,0 +1,69 @@
+from unittest import mock
+
+import pytest
+
+from parsl.channels import SSHChannel
+
+
+def connected_client():
+    client = mock.Mock()
+    client.get_transport.return_value.is_active.return_value = True
+    return client
+
+
+@pytest.fixture
+def channel():
+    c = SSHChannel('example.com', max_connections=2)
+    c.ssh_client = connected_client()
+    with mock.patch.object(c, '_new_ssh_client', side_effect=connected_client), \
+            mock.patch.object(c, '_connect_client'):
+        yield c
+
+
+@pytest.mark.local
+def test_pool_opens_connections_when_busy(channel):
+    first = channel._acquire_ssh_client()
+    second = channel._acquire_ssh_client()
+    assert first is channel.ssh_client
+    assert second is not first
+
+    # The pool is full, so the least busy connection is shared
+    channel._release_ssh_client(second)
+    assert channel._acquire_ssh_client() is second
+    assert channel._acquire_ssh_client() in (first, second)
+    assert len(channel._pool_clients) == 1
+
+
+@pytest.mark.local
+def test_pool_reuses_idle_connection(channel):
+    first = channel._acquire_ssh_client()
+    channel._release_ssh_client(first)
+    assert channel._acquire_ssh_client() is first
+    assert channel._pool_clients == []
+
+
+@pytest.mark.local
+def test_execute_many(channel):
+    def execute_wait(cmd, walltime, envs):
+        return 0, cmd.upper(), ''
+
+    with mock.patch.object(channel, 'execute_wait', side_effect=execute_wait):
+        results = channel.execute_many(['a', 'b', 'c'])
+
+    assert results == [(0, 'A', ''), (0, 'B', ''), (0, 'C', '')]
+
+
+@pytest.mark.local
+def test_pool_connects_outside_lock(channel):
+    channel._connect_client.side_effect = lambda client: assert_unlocked(channel)
+    first = channel._acquire_ssh_client()
+    second = channel._acquire_ssh_client()
+
+    channel._connect_client.assert_called_once_with(second)
+    for client in (first, second):
+        channel._release_ssh_client(client)
+    assert channel._pool_sessions == {}, "Idle clients should not be tracked"
+
+
+def assert_unlocked(channel):
+    assert not channel._pool_lock.locked()
@@ -0,0 +1,134 @@
+import os
+import pickle
+from concurrent.futures import Future
+
+import pytest
+
+import parsl
+from parsl import python_app
+from parsl.dataflow.memostore import CheckpointIndex, SQLiteMemoStore, write_checkpoint_record
+from parsl.tests.configs.local_threads_checkpoint import fresh_config
+
+
+@python_app(cache=True)
+def uuid_app():
+    import uuid
+    return uuid.uuid4()
+
+
+def completed(result):
+    fu = Future()
+    fu.set_result(result)
+    return fu
+
+
+@pytest.mark.local
+def test_sqlite_store_persists(tmpd_cwd):
+    path = str(tmpd_cwd / "memo.db")
+
+    store = SQLiteMemoStore(path)
+    store.put("abc", completed([1, 2, 3]))
+    store.close()
+
+    store = SQLiteMemoStore(path)
+    assert store.get("abc").result() == [1, 2, 3]
+    assert store.get("def") is None
+    store.close()
+
+
+@pytest.mark.local
+def test_sqlite_store_keeps_failures_in_memory(tmpd_cwd):
+    path = str(tmpd_cwd / "memo.db")
+    failed = Future()
+    failed.set_exception(ValueError())
+
+    store = SQLiteMemoStore(path)
+    store.put("abc", failed)
+    assert store.get("abc") is failed
+    store.close()
+
+    assert SQLiteMemoStore(path).get("abc") is None
+
+
+@pytest.mark.local
+def test_sqlite_store_memory_bounded(tmpd_cwd):
+    store = SQLiteMemoStore(str(tmpd_cwd / "memo.db"), memory_size=2)
+    failures = {}
+    for hashsum in ("a", "b", "c"):
+        failures[hashsum] = Future()
+        failures[hashsum].set_exception(ValueError())
+        store.put(hashsum, failures[hashsum])
+        store.get("a")
+    store.put("d", completed(4))
+
+    assert store.get("a") is failures["a"]
+    assert store.get("b") is None, "Least recently used failure should be evicted"
+    assert store.get("c") is failures["c"]
+    assert store.get("d").result() == 4
+    assert len(store._futures) == 2, "Persisted results should not be held in memory"
+    store.close()
+
+
+@pytest.mark.local
+def test_sqlite_store_across_runs(tmpd_cwd):
+    results = []
+    for _ in range(2):
+        config = fresh_config()
+        config.run_dir = str(tmpd_cwd)
+        config.checkpoint_mode = None
+        config.memo_store = SQLiteMemoStore(str(tmpd_cwd / "memo.db"))
+        with parsl.load(config):
+            results.append(uuid_app().result())
+        parsl.clear()
+
+    assert results[0] == results[1], "Expected the second run to reuse the stored result"
+
+
+@pytest.mark.local
+@pytest.mark.parametrize("compress", [False, True])
+def test_checkpoint_index_lazy(tmpd_cwd, compress):
+    checkpoint_file = str(tmpd_cwd / "tasks.pkl")
+    with open(checkpoint_file, 'wb') as f:
+        write_checkpoint_record(f, str(tmpd_cwd), "first", {'a': 1}, compress=compress)
+        # a record in the format used before results were stored separately
+        pickle.dump({'hash': 'second', 'exception': None, 'result': 2}, f)
+        write_checkpoint_record(f, str(tmpd_cwd), "third", [3] * 1000, compress=compress)
+
+    index = CheckpointIndex()
+    index.load(checkpoint_file)
+
+    assert len(index) == 3
+    assert index.get("first").result() == {'a': 1}
+    assert index.get("second").result() == 2
+    assert index.get("third").result() == [3] * 1000
+    assert index.get("fourth") is None
+
+
+@pytest.mark.local
+def test_checkpoint_results_deduplicated(tmpd_cwd):
+    checkpoint_file = str(tmpd_cwd / "tasks.pkl")
+    with open(checkpoint_file, 'wb') as f:
+        for hashsum in ("first", "second"):
+            write_checkpoint_record(f, str(tmpd_cwd), hashsum, "x" * 10000)
+
+    assert len(os.listdir(tmpd_cwd / "results")) == 1
+
+    index = CheckpointIndex()
+    index.load(checkpoint_file)
+    assert index.get("first").result() == index.get("second").result() == "x" * 10000
+
+
+@pytest.mark.local
+def test_checkpoint_index_without_compression_flag(tmpd_cwd):
+    # a record in the format used before results could be compressed
+    os.makedirs(tmpd_cwd / "results")
+    with open(tmpd_cwd / "results" / "digest", 'wb') as f:
+        pickle.dump("uncompressed", f)
+    checkpoint_file = str(tmpd_cwd / "tasks.pkl")
+    with open(checkpoint_file, 'wb') as f:
+        pickle.dump({'hash': 'first', 'exception': None, 'result_file': os.path.join('results', 'digest')}, f)
+
+    index = CheckpointIndex()
+    index.load(checkpoint_file)
+
+    assert index.get("first").result() == "uncompressed"
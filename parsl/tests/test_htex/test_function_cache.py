@@ -0,0 +1,95 @@
+import collections
+import pickle
+from unittest import mock
+
+import pytest
+
+from parsl import curvezmq
+from parsl.executors import HighThroughputExecutor
+from parsl.executors.high_throughput.function_cache import FunctionCache, function_digest
+from parsl.executors.high_throughput.interchange import Interchange
+from parsl.executors.high_throughput.process_worker_pool import execute_task
+from parsl.serialize import serialize
+from parsl.serialize.buffers import pack_buffers
+
+
+def double(x):
+    return 2 * x
+
+
+@pytest.mark.local
+def test_lru_eviction():
+    cache = FunctionCache(2)
+    cache.put(b'a', 1)
+    cache.put(b'b', 2)
+    assert cache.get(b'a') == 1
+
+    cache.put(b'c', 3)
+
+    assert cache.get(b'b') is None, "Least recently used entry should be evicted"
+    assert cache.get(b'a') == 1
+    assert cache.get(b'c') == 3
+    assert len(cache) == 2
+
+
+@pytest.mark.local
+def test_zero_size_caches_nothing():
+    cache = FunctionCache(0)
+    cache.put(b'a', 1)
+
+    assert cache.get(b'a') is None
+
+
+@pytest.mark.local
+def test_digest_identifies_function():
+    assert function_digest(b'abc') == function_digest(b'abc')
+    assert function_digest(b'abc') != function_digest(b'abd')
+
+
+@pytest.mark.local
+@mock.patch.object(curvezmq.ServerContext, "socket", return_value=mock.MagicMock())
+def test_function_sent_once_per_manager(mock_socket, tmpd_cwd):
+    ix = Interchange(logdir=str(tmpd_cwd))
+    for manager_id in (b'm1', b'm2'):
+        ix._ready_managers[manager_id] = {'max_capacity': 2, 'tasks': [], 'active': True,
+                                          'draining': False, 'idle_since': None}
+        ix._manager_functions[manager_id] = FunctionCache(8)
+
+    for task_id in range(4):
+        header = pickle.dumps({'task_id': task_id, 'function_digest': b'digest'})
+        ix.pending_task_queue.append((task_id, b'digest', header, b'function', b'buffer'))
+
+    ix.process_tasks_to_send(collections.OrderedDict([(b'm1', None), (b'm2', None)]))
+
+    sent = {frames[0]: frames[3::3] for ((frames,), _) in ix.task_outgoing.send_multipart.call_args_list}
+    assert sent == {b'm1': [b'function', b''], b'm2': [b'function', b'']}
+
+
+@pytest.mark.local
+def test_execute_task_with_cached_function():
+    buf = pack_buffers([b'', serialize((1,)), serialize({'y': 3})])
+
+    assert execute_task(buf, function=lambda x, y: x + y, resource_spec={}) == 4
+
+
+@pytest.mark.local
+def test_function_sent_once_to_interchange():
+    htex = HighThroughputExecutor(function_cache_size=8)
+    htex.outgoing_q = mock.Mock()
+
+    htex.submit_many([(double, {}, (i,), {}) for i in range(2)])
+    htex.submit(double, {}, 2)
+
+    sent = [msg for ((msgs,), _) in htex.outgoing_q.put_many.call_args_list for msg in msgs]
+    assert [msg['function'] for msg in sent[1:]] == [b'', b'']
+    assert sent[0]['function'] and len({msg['function_digest'] for msg in sent}) == 1
+
+
+@pytest.mark.local
+@mock.patch.object(curvezmq.ServerContext, "socket", return_value=mock.MagicMock())
+def test_interchange_fills_in_function(mock_socket, tmpd_cwd):
+    ix = Interchange(logdir=str(tmpd_cwd), function_cache_size=8)
+
+    assert ix._function_body(b'digest', b'function') == b'function'
+    assert ix._function_body(b'digest', b'') == b'function'
+    assert ix._function_body(b'unknown', b'') == b''
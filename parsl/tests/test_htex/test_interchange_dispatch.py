@@ -0,0 +1,95 @@
+import collections
+import pickle
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from parsl import curvezmq
+from parsl.executors.high_throughput.function_cache import FunctionCache
+from parsl.executors.high_throughput.interchange import Interchange
+
+
+def add_manager(ix, manager_id, max_capacity, function_cache_size=0):
+    ix._ready_managers[manager_id] = {'max_capacity': max_capacity,
+                                      'tasks': [],
+                                      'active': True,
+                                      'draining': False,
+                                      'idle_since': None}
+    ix._manager_functions[manager_id] = FunctionCache(function_cache_size)
+
+
+def add_task(ix, task_id, digest=b'digest', function=b'function'):
+    header = pickle.dumps({'task_id': task_id, 'function_digest': digest})
+    ix.pending_task_queue.append((task_id, digest, header, function, b'buffer-%d' % task_id))
+
+
+@pytest.mark.local
+@mock.patch.object(curvezmq.ServerContext, "socket", return_value=mock.MagicMock())
+def test_tasks_forwarded_as_frames(mock_socket, tmpd_cwd):
+    ix = Interchange(logdir=str(tmpd_cwd))
+    add_manager(ix, b'm1', 2)
+    add_task(ix, 1)
+    add_task(ix, 2)
+    interesting = collections.OrderedDict([(b'm1', None)])
+
+    ix.process_tasks_to_send(interesting)
+
+    (frames,), _ = ix.task_outgoing.send_multipart.call_args
+    assert frames[0] == b'm1'
+    assert pickle.loads(frames[2])['task_id'] == 1
+    assert frames[3] == b'function'
+    assert frames[4] == b'buffer-1'
+    assert pickle.loads(frames[5])['task_id'] == 2
+    assert frames[6] == b'function'
+    assert frames[7] == b'buffer-2'
+    assert ix._ready_managers[b'm1']['tasks'] == [1, 2]
+    assert b'm1' not in interesting, "Saturated manager should no longer be interesting"
+
+
+@pytest.mark.local
+@mock.patch.object(curvezmq.ServerContext, "socket", return_value=mock.MagicMock())
+def test_managers_take_turns(mock_socket, tmpd_cwd):
+    ix = Interchange(logdir=str(tmpd_cwd))
+    add_manager(ix, b'm1', 1)
+    add_manager(ix, b'm2', 2)
+    add_manager(ix, b'm3', 1)
+    interesting = collections.OrderedDict([(b'm1', None), (b'm2', None), (b'm3', None)])
+
+    add_task(ix, 1)
+    add_task(ix, 2)
+    ix.process_tasks_to_send(interesting)
+
+    assert ix._ready_managers[b'm1']['tasks'] == [1]
+    assert ix._ready_managers[b'm2']['tasks'] == [2]
+    assert ix._ready_managers[b'm3']['tasks'] == []
+
+    # m3 has been waiting longest, then m2 which still has capacity
+    assert list(interesting) == [b'm3', b'm2']
+
+
+@pytest.mark.local
+@mock.patch.object(curvezmq.ServerContext, "socket", return_value=mock.MagicMock())
+def test_task_receipt_paused_while_queue_full(mock_socket, tmpd_cwd):
+    ix = Interchange(logdir=str(tmpd_cwd), max_pending_tasks=2)
+    add_task(ix, 1)
+    add_task(ix, 2)
+    received = threading.Event()
+
+    def recv_multipart():
+        received.set()
+        header = pickle.dumps({'task_id': 3, 'function_digest': b'digest'})
+        return [header, b'function', b'buffer-3']
+    ix.task_incoming.recv_multipart.side_effect = recv_multipart
+
+    threading.Thread(target=ix.task_puller, daemon=True).start()
+    assert not received.wait(0.5), "Tasks should not be received while the queue is full"
+
+    assert [task[0] for task in ix.get_tasks(1)] == [1]
+    assert received.wait(5)
+    deadline = time.monotonic() + 5
+    while len(ix.pending_task_queue) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert [task[0] for task in ix.pending_task_queue] == [2, 3], "Receipt should pause again once full"
@@ -0,0 +1,149 @@
+import collections
+import pickle
+import time
+from unittest import mock
+
+import pytest
+import zmq
+
+from parsl import curvezmq
+from parsl.executors import HighThroughputExecutor
+from parsl.executors.high_throughput.function_cache import FunctionCache
+from parsl.executors.high_throughput.interchange import Interchange
+from parsl.jobs.states import JobState, JobStatus
+from parsl.providers import LocalProvider
+
+
+def sent_events(ix):
+    return [pickle.loads(args[0]) for args, _ in ix.results_outgoing.send.call_args_list]
+
+
+@pytest.mark.local
+@mock.patch.object(curvezmq.ServerContext, "socket", return_value=mock.MagicMock())
+def test_interchange_sends_manager_events(mock_socket, tmpd_cwd):
+    ix = Interchange(logdir=str(tmpd_cwd), heartbeat_threshold=10)
+    ix._ready_managers[b'm1'] = {'block_id': '0',
+                                 'hostname': 'localhost',
+                                 'last_heartbeat': time.time(),
+                                 'max_capacity': 1,
+                                 'tasks': [],
+                                 'active': True,
+                                 'draining': False,
+                                 'idle_since': time.time()}
+    ix._send_manager_event('registered', b'm1', ix._ready_managers[b'm1'])
+
+    ix._ready_managers[b'm1']['last_heartbeat'] = 0
+    ix.expire_bad_managers({}, None)
+
+    events = sent_events(ix)
+    assert [e['event'] for e in events] == ['registered', 'lost']
+    assert all(e['type'] == 'manager' and e['manager'] == 'm1' and e['block_id'] == '0' for e in events)
+
+
+def make_executor():
+    htex = HighThroughputExecutor(provider=LocalProvider())
+    htex.provider.status = mock.Mock(side_effect=lambda job_ids: [JobStatus(JobState.PENDING) for _ in job_ids])
+    for block_id in ('0', '1'):
+        htex.blocks[block_id] = 'job-' + block_id
+        htex.block_mapping['job-' + block_id] = block_id
+    return htex
+
+
+def event(event, manager, block_id):
+    return {'type': 'manager', 'event': event, 'manager': manager, 'block_id': block_id, 'timestamp': time.time()}
+
+
+@pytest.mark.local
+def test_status_only_queries_unconnected_blocks():
+    htex = make_executor()
+
+    assert {block_id: s.state for block_id, s in htex.status().items()} == {'0': JobState.PENDING, '1': JobState.PENDING}
+    htex.provider.status.assert_called_once_with(['job-0', 'job-1'])
+
+    htex._handle_manager_event(event('registered', 'm1', '0'))
+    htex.provider.status.reset_mock()
+    assert htex.status()['0'].state == JobState.RUNNING
+    htex.provider.status.assert_called_once_with(['job-1'])
+
+    htex._handle_manager_event(event('registered', 'm2', '1'))
+    htex.provider.status.reset_mock()
+    assert {s.state for s in htex.status().values()} == {JobState.RUNNING}
+    htex.provider.status.assert_not_called()
+
+    assert sorted(htex.connected_blocks()) == ['0', '1']
+
+    # once its manager is lost, a block is queried again
+    htex._handle_manager_event(event('lost', 'm2', '1'))
+    htex.provider.status.side_effect = lambda job_ids: [JobStatus(JobState.COMPLETED) for _ in job_ids]
+    assert htex.status()['1'].state == JobState.COMPLETED
+    htex.provider.status.assert_called_once_with(['job-1'])
+
+    # and, being finished, is not queried after that
+    htex.provider.status.reset_mock()
+    htex.status()
+    htex.provider.status.assert_not_called()
+
+
+@pytest.mark.local
+def test_blocks_which_never_connect_are_missing():
+    htex = make_executor()
+    htex.provider.status.side_effect = lambda job_ids: [JobStatus(JobState.COMPLETED) for _ in job_ids]
+    htex._handle_manager_event(event('registered', 'm1', '0'))
+    htex._handle_manager_event(event('lost', 'm1', '0'))
+
+    status = htex.status()
+
+    assert status['0'].state == JobState.COMPLETED
+    assert status['1'].state == JobState.MISSING
+
+
+@pytest.mark.local
+def test_idle_blocks():
+    htex = make_executor()
+    htex._handle_manager_event(event('registered', 'm1', '0'))
+    htex._handle_manager_event(event('registered', 'm2', '1'))
+    htex._handle_manager_event(event('registered', 'm3', '1'))
+    htex._handle_manager_event(event('busy', 'm3', '1'))
+
+    assert htex._idle_blocks(-1) == ['0']
+    assert htex._idle_blocks(60) == []
+
+    # scale_in does not need to ask the interchange about its managers
+    # when no block has been idle for long enough
+    htex.command_client = mock.Mock()
+    assert htex.scale_in(1, max_idletime=60) == []
+    htex.command_client.run.assert_not_called()
+
+
+@pytest.mark.local
+@mock.patch.object(curvezmq.ServerContext, "socket", return_value=mock.MagicMock())
+def test_idle_event_delayed(mock_socket, tmpd_cwd):
+    ix = Interchange(logdir=str(tmpd_cwd), manager_idle_delay=0.5)
+    ix._ready_managers[b'm1'] = {'block_id': '0', 'max_capacity': 1, 'tasks': [], 'active': True,
+                                 'draining': False, 'idle_since': time.time()}
+    ix._manager_functions[b'm1'] = FunctionCache(0)
+    ix._reported_idle.add(b'm1')
+    ix.socks = {ix.results_incoming: zmq.POLLIN}
+
+    def run_task(task_id):
+        header = pickle.dumps({'task_id': task_id, 'function_digest': b'digest'})
+        ix.pending_task_queue.append((task_id, b'digest', header, b'function', b'buffer'))
+        ix.process_tasks_to_send(collections.OrderedDict([(b'm1', None)]))
+        ix.results_incoming.recv_multipart.return_value = [b'm1', pickle.dumps({'type': 'result', 'task_id': task_id})]
+        ix.process_results_incoming({}, None)
+        ix.report_idle_managers()
+
+    # only the first task makes the manager busy, as it is not idle for
+    # long enough between tasks to be reported idle again
+    for task_id in range(3):
+        run_task(task_id)
+    assert [e['event'] for e in sent_events(ix)] == ['busy']
+
+    idle_since = ix._ready_managers[b'm1']['idle_since']
+    time.sleep(0.5)
+    ix.report_idle_managers()
+    run_task(3)
+
+    events = sent_events(ix)
+    assert [e['event'] for e in events] == ['busy', 'idle', 'busy']
+    assert events[1]['timestamp'] == idle_since
@@ -0,0 +1,70 @@
+import collections
+import pickle
+from unittest import mock
+
+import pytest
+
+from parsl import curvezmq
+from parsl.executors.high_throughput.function_cache import FunctionCache
+from parsl.executors.high_throughput.interchange import Interchange
+from parsl.executors.high_throughput.manager_selector import (
+    LeastLoadedManagerSelector,
+    PackingManagerSelector,
+    RandomManagerSelector,
+    RoundRobinManagerSelector
+)
+
+
+def make_managers(loads):
+    return {manager_id: {'max_capacity': capacity,
+                         'tasks': list(range(in_flight)),
+                         'active': True,
+                         'draining': False,
+                         'idle_since': None}
+            for manager_id, (in_flight, capacity) in loads.items()}
+
+
+@pytest.mark.local
+def test_round_robin_limited_to_task_count():
+    managers = make_managers({b'a': (0, 1), b'b': (0, 1), b'c': (0, 1)})
+
+    assert RoundRobinManagerSelector().sort_managers(managers, [b'a', b'b', b'c'], 2) == [b'a', b'b']
+
+
+@pytest.mark.local
+def test_random_returns_all_managers():
+    managers = make_managers({b'a': (0, 1), b'b': (0, 1), b'c': (0, 1)})
+
+    assert sorted(RandomManagerSelector().sort_managers(managers, [b'a', b'b', b'c'], 1)) == [b'a', b'b', b'c']
+
+
+@pytest.mark.local
+def test_least_loaded():
+    managers = make_managers({b'a': (3, 4), b'b': (1, 4), b'c': (1, 2)})
+
+    assert LeastLoadedManagerSelector().sort_managers(managers, [b'a', b'b', b'c'], 1) == [b'b', b'c', b'a']
+
+
+@pytest.mark.local
+def test_packing():
+    managers = make_managers({b'a': (1, 4), b'b': (3, 4), b'c': (0, 4)})
+
+    assert PackingManagerSelector().sort_managers(managers, [b'a', b'b', b'c'], 1) == [b'b', b'a', b'c']
+
+
+@pytest.mark.local
+@mock.patch.object(curvezmq.ServerContext, "socket", return_value=mock.MagicMock())
+def test_interchange_uses_selector(mock_socket, tmpd_cwd):
+    ix = Interchange(logdir=str(tmpd_cwd), manager_selector=PackingManagerSelector())
+    ix._ready_managers.update(make_managers({b'idle': (0, 4), b'busy': (2, 4)}))
+    ix._manager_functions.update({b'idle': FunctionCache(0), b'busy': FunctionCache(0)})
+    for task_id in range(3):
+        header = pickle.dumps({'task_id': task_id, 'function_digest': b''})
+        ix.pending_task_queue.append((task_id, b'', header, b'', b''))
+    interesting = collections.OrderedDict([(b'idle', None), (b'busy', None)])
+
+    ix.process_tasks_to_send(interesting)
+
+    assert ix._ready_managers[b'busy']['tasks'] == [0, 1, 0, 1]
+    assert ix._ready_managers[b'idle']['tasks'] == [2]
+    assert list(interesting) == [b'idle']
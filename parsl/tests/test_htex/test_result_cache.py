@@ -0,0 +1,138 @@
+import os
+import pickle
+import sys
+import tempfile
+from unittest import mock
+
+import pytest
+
+from parsl.app.app import python_app
+from parsl.app.errors import RemoteExceptionWrapper
+from parsl.executors import HighThroughputExecutor
+from parsl.executors.high_throughput import result_cache
+from parsl.executors.high_throughput.errors import ResultCacheMiss
+from parsl.executors.high_throughput.result_cache import CachedResult, CachedResultRef
+from parsl.serialize import deserialize, serialize
+from parsl.serialize.buffers import unpack_buffers
+from parsl.serialize.lazy import LazyResultFuture
+
+
+def local_config():
+    from parsl.tests.configs.htex_local import fresh_config
+    config = fresh_config()
+    config.executors[0].result_cache_dir = os.path.join(tempfile.gettempdir(), 'parsl_test_result_cache')
+    return config
+
+
+@python_app
+def produce(n):
+    return list(range(n))
+
+
+@python_app
+def consume(values):
+    from parsl.executors.high_throughput import result_cache
+    return sum(values), os.listdir(result_cache.cache_dir)
+
+
+@pytest.mark.local
+def test_dependent_task_reads_cached_result():
+    first = produce(1000)
+    total, cached = consume(first).result()
+
+    assert total == sum(range(1000))
+    assert str(first.task_record['exec_fu'].parsl_executor_task_id) in cached
+    assert first.result() == list(range(1000))
+
+
+@pytest.mark.local
+def test_cached_results_sent_as_references():
+    htex = HighThroughputExecutor(result_cache_dir='/cache')
+    htex._result_cache_id = 'run'
+    cached = CachedResult(serialize(1), 'run', '7')
+    elsewhere = CachedResult(serialize(2), 'other', '8')
+
+    args, kwargs = htex._reference_cached_results((cached, elsewhere), {'inputs': [cached]})
+
+    assert isinstance(args[0], CachedResultRef) and args[0].key == '7'
+    assert args[1] is elsewhere
+    assert isinstance(kwargs['inputs'][0], CachedResultRef)
+
+    plain_args: tuple = (1, 2)
+    plain_kwargs: dict = {'inputs': [3]}
+    assert htex._reference_cached_results(plain_args, plain_kwargs) == (plain_args, plain_kwargs)
+    assert htex._reference_cached_results(plain_args, plain_kwargs)[0] is plain_args
+
+
+@pytest.mark.local
+def test_load_from_other_manager_on_node(tmp_path):
+    (tmp_path / 'manager-a').mkdir()
+    (tmp_path / 'manager-b').mkdir()
+    with mock.patch.object(result_cache, 'cache_dir', str(tmp_path / 'manager-a')):
+        assert not os.path.exists(tmp_path / 'manager-a' / '1')
+        with mock.patch.object(result_cache, 'cache_dir', str(tmp_path / 'manager-b')):
+            assert result_cache.store('1', serialize('value'))
+
+        assert pickle.loads(pickle.dumps(CachedResultRef('1'))) == 'value'
+        with pytest.raises(ResultCacheMiss):
+            pickle.loads(pickle.dumps(CachedResultRef('2')))
+
+
+@pytest.mark.local
+def test_least_recently_used_results_evicted(tmp_path):
+    cache_dir = tmp_path / 'manager'
+    cache_dir.mkdir()
+    with mock.patch.object(result_cache, 'cache_dir', str(cache_dir)), \
+         mock.patch.object(result_cache, 'max_size', 60):
+        for key in ['a', 'b']:
+            assert result_cache.store(key, serialize('x' * 10))
+            os.utime(cache_dir / key, (0, 0))
+        # use a, so that b is the least recently used
+        result_cache.load('a')
+        assert result_cache.store('c', serialize('x' * 10))
+
+        assert sorted(os.listdir(cache_dir)) == ['a', 'c']
+        with pytest.raises(ResultCacheMiss):
+            result_cache.load('b')
+
+
+@pytest.mark.local
+def test_cache_miss_resends_task_with_results():
+    htex = HighThroughputExecutor(result_cache_dir='/cache', result_threads=0)
+    htex._result_cache_id = 'run'
+    htex.outgoing_q = mock.Mock()
+    cached = CachedResult(serialize('value'), 'run', '7')
+
+    fut, msg = htex._prepare_task(len, {}, (cached,), {})
+    task_id = msg['task_id']
+    assert task_id in htex._cache_fallbacks
+
+    try:
+        raise ResultCacheMiss('7')
+    except ResultCacheMiss:
+        miss = RemoteExceptionWrapper(*sys.exc_info())
+
+    fallback = htex._cache_fallbacks.pop(task_id)
+    del htex.tasks[task_id]
+    htex._complete_task(fut, {'type': 'result', 'task_id': task_id, 'exception': serialize(miss)}, fallback)
+
+    assert not fut.done()
+    assert htex.tasks[task_id] is fut
+    (resent,), = htex.outgoing_q.put_many.call_args[0]
+    _, b_args, _ = unpack_buffers(resent['buffer'])
+    assert deserialize(b_args) == ('value',)
+
+
+@pytest.mark.local
+def test_cache_miss_without_fallback_fails_task():
+    htex = HighThroughputExecutor(result_threads=0)
+    fut = LazyResultFuture()
+    try:
+        raise ResultCacheMiss('7')
+    except ResultCacheMiss:
+        miss = RemoteExceptionWrapper(*sys.exc_info())
+
+    htex._complete_task(fut, {'type': 'result', 'task_id': 1, 'exception': serialize(miss)})
+
+    with pytest.raises(ResultCacheMiss):
+        fut.result()
@@ -0,0 +1,66 @@
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+from parsl.executors import HighThroughputExecutor
+from parsl.serialize import serialize
+from parsl.serialize.lazy import LazyResultFuture
+
+
+def result_message(task_id, result):
+    return pickle.dumps({'type': 'result', 'task_id': task_id, 'result': serialize(result)})
+
+
+def run_queue_management_worker(htex, messages):
+    htex.incoming_q = mock.Mock()
+    htex.incoming_q.get.side_effect = [messages, None]
+    htex._queue_management_worker()
+
+
+@pytest.mark.local
+def test_slow_callback_does_not_delay_other_results():
+    htex = HighThroughputExecutor()
+    htex._result_pool = ThreadPoolExecutor(max_workers=2)
+    slow: LazyResultFuture = LazyResultFuture()
+    fast: LazyResultFuture = LazyResultFuture()
+    htex.tasks[1] = slow
+    htex.tasks[2] = fast
+
+    release = threading.Event()
+    slow.add_done_callback(lambda fut: release.wait(10))
+
+    run_queue_management_worker(htex, [result_message(1, 'slow'), result_message(2, 'fast')])
+
+    try:
+        assert fast.result(timeout=5) == 'fast'
+        assert slow.result(timeout=5) == 'slow'
+        assert not htex.tasks
+    finally:
+        release.set()
+        htex._result_pool.shutdown()
+
+
+@pytest.mark.local
+def test_results_completed_inline_without_threads():
+    htex = HighThroughputExecutor(result_threads=0)
+    fut: LazyResultFuture = LazyResultFuture()
+    htex.tasks[1] = fut
+
+    run_queue_management_worker(htex, [result_message(1, 42)])
+
+    assert fut.result(timeout=0) == 42
+
+
+@pytest.mark.local
+def test_undeserializable_result_fails_task():
+    htex = HighThroughputExecutor(result_threads=0)
+    fut: LazyResultFuture = LazyResultFuture()
+    htex.tasks[1] = fut
+
+    run_queue_management_worker(htex, [pickle.dumps({'type': 'result', 'task_id': 1, 'result': b'bad'})])
+
+    with pytest.raises(Exception):
+        fut.result(timeout=0)
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from parsl.app.app import python_app
+from parsl.executors.high_throughput.shm_transport import DEFAULT_SHM_DIR, SharedBuffer, SharedMemoryTransport, receive
+
+
+def local_config():
+    from parsl.tests.configs.htex_local import fresh_config
+    config = fresh_config()
+    config.executors[0].shared_memory_threshold = 1000
+    return config
+
+
+@python_app
+def double(data):
+    return data * 2
+
+
+@pytest.mark.local
+@pytest.mark.skipif(not os.path.isdir(DEFAULT_SHM_DIR), reason="needs /dev/shm")
+def test_large_buffers_through_shared_memory():
+    data = os.urandom(5 * 1024 * 1024)
+    assert double(data).result() == data * 2
+    assert double(b'small').result() == b'smallsmall'
+
+
+@pytest.mark.local
+def test_share_above_threshold(tmp_path):
+    transport = SharedMemoryTransport(str(tmp_path), threshold=10)
+
+    assert transport.share(b'short') == b'short'
+
+    handle = transport.share(b'long enough to share')
+    assert isinstance(handle, SharedBuffer)
+    assert os.listdir(tmp_path)
+
+    assert receive(handle) == b'long enough to share'
+    assert not os.listdir(tmp_path), "Buffer file should be removed once read"
+
+
+@pytest.mark.local
+def test_share_falls_back_to_queue(tmp_path):
+    transport = SharedMemoryTransport(str(tmp_path / 'missing'), threshold=1)
+    assert transport.share(b'data') == b'data'
+
+
+@pytest.mark.local
+def test_discard(tmp_path):
+    transport = SharedMemoryTransport(str(tmp_path), threshold=1)
+    handle = transport.share(b'data')
+    assert isinstance(handle, SharedBuffer)
+
+    handle.discard()
+    handle.discard()
+    assert not os.listdir(tmp_path)
@@ -3,9 +3,10 @@ import os
 from unittest import mock
 import pytest
 import pickle
-from parsl.executors.high_throughput.mpi_resource_management import TaskScheduler, MPITaskScheduler
+import queue
+from parsl.executors.high_throughput.mpi_resource_management import TaskScheduler, MPITaskScheduler, MPISlotsUnavailable
 from parsl.multiprocessing import SpawnContext
-from parsl.serialize import pack_res_spec_apply_message, unpack_res_spec_apply_message
+from parsl.serialize import deserialize
 
 
 @pytest.fixture(autouse=True)
@@ -35,17 +36,14 @@ def test_MPISched_put_task():
 
     assert scheduler.available_nodes
     assert len(scheduler.available_nodes) == 8
-    assert scheduler._free_node_counter.value == 8
-
-    mock_task_buffer = pack_res_spec_apply_message("func",
-                                                   "args",
-                                                   "kwargs",
-                                                   resource_specification={"num_nodes": 2,
-                                                                           "ranks_per_node": 2})
-    task_package = {"task_id": 1, "buffer": mock_task_buffer}
+    assert sum(scheduler._free_slots) == 8
+
+    task_package = {"task_id": 1,
+                    "resource_spec": {"num_nodes": 2, "ranks_per_node": 2},
+                    "buffer": b"BUFFER"}
     scheduler.put_task(task_package)
 
-    assert scheduler._free_node_counter.value == 6
+    assert sum(scheduler._free_slots) == 6
 
 
 @pytest.mark.local
@@ -55,18 +53,17 @@ def test_MPISched_get_result():
 
     assert scheduler.available_nodes
     assert len(scheduler.available_nodes) == 8
-    assert scheduler._free_node_counter.value == 8
+    assert sum(scheduler._free_slots) == 8
 
-    nodes = [scheduler.nodes_q.get() for _ in range(4)]
-    scheduler._free_node_counter.value = 4
-    scheduler._map_tasks_to_nodes[1] = nodes
+    scheduler.put_task({"task_id": 1, "resource_spec": {"num_nodes": 4}, "buffer": b"BUFFER"})
+    assert sum(scheduler._free_slots) == 4
 
     result_package = pickle.dumps({"task_id": 1, "type": "result", "buffer": "Foo"})
     result_q.put(result_package)
     result_received = scheduler.get_result(block=True, timeout=1)
     assert result_received == result_package
 
-    assert scheduler._free_node_counter.value == 8
+    assert sum(scheduler._free_slots) == 8
 
 
 @pytest.mark.local
@@ -78,17 +75,14 @@ def test_MPISched_roundtrip():
     assert len(scheduler.available_nodes) == 8
 
     for round in range(1, 9):
-        assert scheduler._free_node_counter.value == 8
-
-        mock_task_buffer = pack_res_spec_apply_message("func",
-                                                       "args",
-                                                       "kwargs",
-                                                       resource_specification={"num_nodes": round,
-                                                                               "ranks_per_node": 2})
-        task_package = {"task_id": round, "buffer": mock_task_buffer}
+        assert sum(scheduler._free_slots) == 8
+
+        task_package = {"task_id": round,
+                        "resource_spec": {"num_nodes": round, "ranks_per_node": 2},
+                        "buffer": b"BUFFER"}
         scheduler.put_task(task_package)
 
-        assert scheduler._free_node_counter.value == 8 - round
+        assert sum(scheduler._free_slots) == 8 - round
 
         # Pop in a mock result
         result_pkl = pickle.dumps({"task_id": round, "type": "result", "buffer": "RESULT BUF"})
@@ -107,39 +101,29 @@ def test_MPISched_contention():
     assert scheduler.available_nodes
     assert len(scheduler.available_nodes) == 8
 
-    assert scheduler._free_node_counter.value == 8
+    assert sum(scheduler._free_slots) == 8
 
-    mock_task_buffer = pack_res_spec_apply_message("func",
-                                                   "args",
-                                                   "kwargs",
-                                                   resource_specification={
-                                                       "num_nodes": 8,
-                                                       "ranks_per_node": 2
-                                                   })
-    task_package = {"task_id": 1, "buffer": mock_task_buffer}
+    task_package = {"task_id": 1,
+                    "resource_spec": {"num_nodes": 8, "ranks_per_node": 2},
+                    "buffer": b"BUFFER"}
     scheduler.put_task(task_package)
 
-    assert scheduler._free_node_counter.value == 0
-    assert scheduler._backlog_queue.empty()
-
-    mock_task_buffer = pack_res_spec_apply_message("func",
-                                                   "args",
-                                                   "kwargs",
-                                                   resource_specification={
-                                                       "num_nodes": 8,
-                                                       "ranks_per_node": 2
-                                                   })
-    task_package = {"task_id": 2, "buffer": mock_task_buffer}
+    assert sum(scheduler._free_slots) == 0
+    assert not scheduler._backlog
+
+    task_package = {"task_id": 2,
+                    "resource_spec": {"num_nodes": 8, "ranks_per_node": 2},
+                    "buffer": b"BUFFER"}
     scheduler.put_task(task_package)
 
     # Second task should now be in the backlog_queue
-    assert not scheduler._backlog_queue.empty()
+    assert scheduler._backlog
 
     # Confirm that the first task is available and has all 8 nodes provisioned
     task_on_worker_side = task_q.get()
     assert task_on_worker_side['task_id'] == 1
-    _, _, _, resource_spec = unpack_res_spec_apply_message(task_on_worker_side['buffer'])
-    assert len(resource_spec['MPI_NODELIST'].split(',')) == 8
+    assert len(task_on_worker_side['resource_spec']['MPI_NODELIST'].split(',')) == 8
+    assert task_on_worker_side['buffer'] == b"BUFFER"
     assert task_q.empty()  # Confirm that task 2 is not yet scheduled
 
     # Simulate worker returning result and the scheduler picking up result
@@ -149,10 +133,122 @@ def test_MPISched_contention():
     assert got_result == result_pkl
 
     # Now task2 must be scheduled
-    assert scheduler._backlog_queue.empty()
+    assert not scheduler._backlog
 
     # Pop in a mock result
     task_on_worker_side = task_q.get()
     assert task_on_worker_side['task_id'] == 2
-    _, _, _, resource_spec = unpack_res_spec_apply_message(task_on_worker_side['buffer'])
-    assert len(resource_spec['MPI_NODELIST'].split(',')) == 8
+    assert len(task_on_worker_side['resource_spec']['MPI_NODELIST'].split(',')) == 8
+    assert task_on_worker_side['buffer'] == b"BUFFER"
+
+
+def mpi_task(task_id, num_nodes, **resource_spec):
+    return {"task_id": task_id,
+            "resource_spec": {"num_nodes": num_nodes, **resource_spec},
+            "buffer": b"BUFFER"}
+
+
+def started_task_ids(task_q):
+    task_ids = []
+    while True:
+        try:
+            task_ids.append(task_q.get(timeout=0.5)["task_id"])
+        except queue.Empty:
+            return task_ids
+
+
+def complete(scheduler, result_q, task_id):
+    result_q.put(pickle.dumps({"task_id": task_id, "type": "result", "buffer": "RESULT BUF"}))
+    scheduler.get_result(True, 1)
+
+
+@pytest.mark.local
+def test_MPISched_fifo_reservation():
+    """A large task is not starved by later small tasks"""
+    task_q, result_q = SpawnContext.Queue(), SpawnContext.Queue()
+    scheduler = MPITaskScheduler(task_q, result_q)
+
+    scheduler.put_task(mpi_task(1, 6))
+    scheduler.put_task(mpi_task(2, 8))
+    # Task 3 has no walltime and would hold nodes which task 2 needs
+    scheduler.put_task(mpi_task(3, 2))
+    assert started_task_ids(task_q) == [1]
+
+    complete(scheduler, result_q, 1)
+    assert started_task_ids(task_q) == [2]
+
+    complete(scheduler, result_q, 2)
+    assert started_task_ids(task_q) == [3]
+
+
+@pytest.mark.local
+def test_MPISched_backfill_by_walltime():
+    task_q, result_q = SpawnContext.Queue(), SpawnContext.Queue()
+    scheduler = MPITaskScheduler(task_q, result_q)
+
+    scheduler.put_task(mpi_task(1, 6, walltime=1000))
+    scheduler.put_task(mpi_task(2, 8))
+    # Task 3 is expected to finish before task 1 frees the nodes that task 2
+    # is waiting for, so it is backfilled; task 4 would delay task 2.
+    scheduler.put_task(mpi_task(3, 2, walltime=10))
+    scheduler.put_task(mpi_task(4, 2, walltime=10000))
+
+    assert started_task_ids(task_q) == [1, 3]
+    assert [t.task_package["task_id"] for t in scheduler._backlog] == [2, 4]
+
+
+@pytest.mark.local
+def test_MPISched_backfill_onto_spare_nodes():
+    task_q, result_q = SpawnContext.Queue(), SpawnContext.Queue()
+    scheduler = MPITaskScheduler(task_q, result_q)
+
+    scheduler.put_task(mpi_task(1, 6))
+    scheduler.put_task(mpi_task(2, 4))
+    # Once task 1 completes, task 2 needs only 4 of its 6 nodes, so task 3 can
+    # use the 2 nodes left free now.
+    scheduler.put_task(mpi_task(3, 2))
+
+    assert started_task_ids(task_q) == [1, 3]
+
+
+@pytest.mark.local
+def test_MPISched_shared_nodes():
+    task_q, result_q = SpawnContext.Queue(), SpawnContext.Queue()
+    scheduler = MPITaskScheduler(task_q, result_q, slots_per_node=4)
+
+    for task_id in range(1, 5):
+        scheduler.put_task(mpi_task(task_id, 8, ranks_per_node=2))
+
+    assert started_task_ids(task_q) == [1, 2]
+    assert sum(scheduler._free_slots) == 0
+
+    complete(scheduler, result_q, 1)
+    assert started_task_ids(task_q) == [3]
+    assert [t.task_package["task_id"] for t in scheduler._backlog] == [4]
+
+
+@pytest.mark.local
+def test_MPISched_impossible_task():
+    task_q, result_q = SpawnContext.Queue(), SpawnContext.Queue()
+    scheduler = MPITaskScheduler(task_q, result_q)
+
+    scheduler.put_task(mpi_task(1, 9))
+
+    result = pickle.loads(scheduler.get_result(True, 1))
+    assert result["task_id"] == 1
+    assert "exception" in result
+    assert task_q.empty()
+    assert not scheduler._backlog
+
+
+@pytest.mark.local
+def test_MPISched_too_many_slots_per_node():
+    task_q, result_q = SpawnContext.Queue(), SpawnContext.Queue()
+    scheduler = MPITaskScheduler(task_q, result_q, slots_per_node=4)
+
+    scheduler.put_task(mpi_task(1, 2, ranks_per_node=6))
+
+    result = pickle.loads(scheduler.get_result(True, 1))
+    with pytest.raises(MPISlotsUnavailable, match="requested=6 per node, available=4 per node"):
+        deserialize(result["exception"]).reraise()
+    assert task_q.empty()
@@ -6,9 +6,11 @@ import typing
 
 import pytest
 import unittest
+import unittest.mock
 
 import parsl
 from parsl.app.app import python_app
+from parsl.executors import HighThroughputExecutor
 from parsl.tests.configs.htex_local import fresh_config
 from typing import Dict
 from parsl.executors.high_throughput.mpi_resource_management import (
@@ -143,3 +145,17 @@ def test_resource_spec(resource_spec: Dict, exception):
     else:
         result = validate_resource_spec(resource_spec)
         assert result is None
+
+
+@pytest.mark.local
+def test_invalid_resource_spec_fails_only_its_task():
+    htex = HighThroughputExecutor()
+    htex.outgoing_q = unittest.mock.Mock()
+
+    futs = htex.submit_many([(double, {"BAD_OPT": 1}, (1,), {}),
+                             (double, {}, (2,), {})])
+
+    assert isinstance(futs[0].exception(), InvalidResourceSpecification)
+    assert not futs[1].done()
+    ((msgs,), _), = htex.outgoing_q.put_many.call_args_list
+    assert [msg['task_id'] for msg in msgs] == [futs[1].parsl_executor_task_id]
@@ -0,0 +1,27 @@
+from unittest import mock
+
+import pytest
+
+from parsl.channels import LocalChannel
+from parsl.providers import CondorProvider
+
+
+@pytest.mark.local
+def test_scripts_pushed_together(tmp_path):
+    script_dir = str(tmp_path)
+    channel = LocalChannel(script_dir=script_dir)
+    channel.push_files = mock.Mock(wraps=channel.push_files)
+    provider = CondorProvider(channel=channel)
+    provider.script_dir = script_dir
+    provider.execute_wait = mock.Mock(spec=CondorProvider.execute_wait)
+    provider.execute_wait.return_value = (0, "1 job(s) submitted to cluster 118907.", "")
+
+    assert provider.submit("test", tasks_per_node=1) == "118907.0"
+
+    (sources, dest_dir), _ = channel.push_files.call_args
+    assert [source.rsplit('.', 1)[1] for source in sources] == ['script', 'submit']
+    assert dest_dir == script_dir
+    (cmd,), _ = provider.execute_wait.call_args
+    assert cmd == "condor_submit {}".format(sources[1])
+    with open(sources[1]) as f:
+        assert sources[0] in f.read(), "The submit script should name the pushed user script"
@@ -102,6 +102,39 @@ def test_ssh_channel():
             _stop_sshd(sshd_thread)
 
 
+@pytest.mark.local
+@pytest.mark.sshd_required
+def test_ssh_channel_pool():
+    with tempfile.TemporaryDirectory() as config_dir:
+        sshd_thread, priv_key, server_port = _start_sshd(config_dir)
+        try:
+            with tempfile.TemporaryDirectory() as remote_script_dir:
+                pathlib.Path('{}/known.hosts'.format(config_dir)).touch(mode=0o600)
+                channel = SSHChannel('127.0.0.1', port=server_port,
+                                     script_dir=remote_script_dir,
+                                     host_keys_filename='{}/known.hosts'.format(config_dir),
+                                     key_filename=priv_key,
+                                     max_connections=2)
+
+                results = channel.execute_many(['sleep 1; echo -n {}'.format(i) for i in range(4)])
+                assert [stdout for (_, stdout, _) in results] == ['0', '1', '2', '3']
+
+                sources = []
+                for name in ('a.sh', 'b.sh'):
+                    sources.append('{}/{}'.format(config_dir, name))
+                    with open(sources[-1], 'w') as f:
+                        f.write(name)
+                dest_dir = '{}/scripts'.format(remote_script_dir)
+                dests = channel.push_files(sources, dest_dir)
+                assert dests == ['{}/a.sh'.format(dest_dir), '{}/b.sh'.format(dest_dir)]
+                with open(dests[1]) as f:
+                    assert f.read() == 'b.sh'
+                assert os.stat(dests[0]).st_mode & 0o777 == 0o700
+                channel.close()
+        finally:
+            _stop_sshd(sshd_thread)
+
+
 def _stop_sshd(sshd_thread):
     sshd_thread.stop()
 
@@ -27,3 +27,27 @@ def test_submit_script_basic(tmp_path):
     job_info = provider.resources[job_id]
     assert "job_stdout_path" in job_info
     assert "job_stderr_path" in job_info
+
+
+@pytest.mark.local
+def test_submit_many_as_job_array(tmp_path):
+    provider = SlurmProvider(
+        partition="debug", channel=LocalChannel(script_dir=tmp_path)
+    )
+    provider.script_dir = tmp_path
+    provider.execute_wait = mock.MagicMock(spec=SlurmProvider.execute_wait)
+    provider.execute_wait.return_value = (0, "Submitted batch job 1234", "")
+
+    job_ids = provider.submit_many(["cmd-0", "cmd-1", "cmd-2"], tasks_per_node=1)
+
+    assert job_ids == ["1234_0", "1234_1", "1234_2"]
+    provider.execute_wait.assert_called_once()
+    for index, job_id in enumerate(job_ids):
+        assert provider.resources[job_id]["job_stdout_path"].endswith(".{}.stdout".format(index))
+
+    (script_path,) = [p for p in tmp_path.iterdir() if p.suffix not in ('.stdout', '.stderr')]
+    script = script_path.read_text()
+    assert "#SBATCH --array=0-2\n" in script
+    assert "#SBATCH --output={}.%a.stdout\n".format(script_path) in script
+    assert 'case "$SLURM_ARRAY_TASK_ID" in' in script
+    assert script.index("0)\n") < script.index("cmd-0") < script.index("1)\n") < script.index("cmd-1")
@@ -0,0 +1,55 @@
+from unittest import mock
+
+import pytest
+
+import parsl
+from parsl.config import Config
+from parsl.dataflow.executor_selection import DataLocalitySelector
+from parsl.executors import ThreadPoolExecutor
+from parsl.executors.status_handling import BlockProviderExecutor
+
+
+def local_config():
+    return Config(executors=[ThreadPoolExecutor(label='a'), ThreadPoolExecutor(label='b')],
+                  executor_selector=DataLocalitySelector())
+
+
+@parsl.python_app(executors=['a'])
+def produce():
+    return 1
+
+
+@parsl.python_app
+def consume(x):
+    return x
+
+
+def busy_executor(label, outstanding, blocks=1, workers_per_node=4):
+    executor = mock.Mock(spec=BlockProviderExecutor)
+    executor.label = label
+    executor.outstanding = outstanding
+    executor.blocks = {str(i): str(i) for i in range(blocks)}
+    executor.workers_per_node = workers_per_node
+    return executor
+
+
+@pytest.mark.local
+def test_task_follows_its_input():
+    x = produce()
+    for _ in range(10):
+        fut = consume(x)
+        fut.result()
+        assert fut.task_record['executor'] == 'a'
+
+
+@pytest.mark.local
+def test_busy_executor_avoided():
+    near, far = busy_executor('near', outstanding=12), busy_executor('far', outstanding=0)
+    selector = DataLocalitySelector()
+
+    # near holds an input, but has a backlog of 3 tasks per worker
+    assert selector.select([near, far], ['near']) is far
+    assert selector.select([near, far], ['near'] * 4) is near
+
+    # without any inputs to place, the least busy executor is chosen
+    assert DataLocalitySelector().select([near, far], []) is far
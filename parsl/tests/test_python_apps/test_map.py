@@ -0,0 +1,84 @@
+from unittest import mock
+
+import parsl
+from parsl.dataflow.errors import DependencyError
+
+
+@parsl.python_app
+def add(x, y=0):
+    return x + y
+
+
+@parsl.python_app
+def fails(x):
+    raise ValueError("Deliberate failure")
+
+
+def test_map():
+    futs = add.map(range(100))
+
+    assert len(futs) == 100
+    assert [f.result() for f in futs] == list(range(100))
+
+
+def test_map_multiple_iterables():
+    futs = add.map(range(10), range(10, 20))
+
+    assert [f.result() for f in futs] == [x + x + 10 for x in range(10)]
+
+
+def test_map_shared_kwargs():
+    futs = add.map(range(10), y=5)
+
+    assert [f.result() for f in futs] == [x + 5 for x in range(10)]
+
+
+def test_map_empty():
+    assert add.map([]) == []
+
+
+def test_map_with_dependencies():
+    """Tasks which depend on unfinished futures in a batch are launched as
+    their dependencies complete, alongside tasks which can run immediately."""
+    parent = add(1)
+    futs = add.map([parent, 2, parent])
+
+    assert [f.result() for f in futs] == [1, 2, 1]
+
+
+def test_map_dependency_failure():
+    failed = fails(0)
+    futs = add.map([failed, 1])
+
+    assert isinstance(futs[0].exception(), DependencyError)
+    assert futs[1].result() == 1
+
+
+def test_map_task_records():
+    futs = add.map(range(3))
+
+    tids = [f.tid for f in futs]
+    assert len(set(tids)) == 3
+    for f in futs:
+        f.result()
+        assert f.task_status() == 'exec_done'
+
+
+def test_map_launch_holds_no_task_locks(monkeypatch):
+    """Tasks in a batch are launched without their launch locks held, and
+    are not launched a second time by launch_if_ready meanwhile."""
+    dfk = parsl.dfk()
+    launch_tasks = dfk.launch_tasks
+
+    def checked_launch_tasks(task_records):
+        for task_record in task_records:
+            assert not task_record['task_launch_lock'].locked()
+            dfk.launch_if_ready(task_record)
+        return launch_tasks(task_records)
+
+    monkeypatch.setattr(dfk, 'launch_tasks', checked_launch_tasks)
+    monkeypatch.setattr(dfk, 'launch_task', mock.Mock(side_effect=AssertionError("launched again")))
+
+    futs = add.map(range(3))
+
+    assert [f.result() for f in futs] == [0, 1, 2]
@@ -0,0 +1,80 @@
+import hashlib
+import pickle
+
+import pytest
+
+from parsl.data_provider.files import File
+from parsl.dataflow.memoization import Memoizer, id_for_memo
+from parsl.errors import OptionalModuleMissing
+
+
+def task_record(*args, **kwargs):
+    return {'id': 0, 'func': task_record, 'args': args, 'kwargs': kwargs,
+            'ignore_for_cache': [], 'memoize': True}
+
+
+@pytest.mark.local
+def test_md5_hash_unchanged():
+    """The default hash should be the MD5 of the concatenated ids, as it was
+    before hashing was streamed, so that existing checkpoints stay valid."""
+    task = task_record(1, "two", three=[3.0])
+    expected = hashlib.md5(b''.join(map(id_for_memo, (task['kwargs'], task['func'], task['args'])))).hexdigest()
+
+    assert Memoizer(None).make_hash(task) == expected
+
+
+@pytest.mark.local
+def test_hash_algorithm():
+    task = task_record(1, 2)
+    blake = Memoizer(None, hash_algorithm='blake2b')
+
+    assert blake.make_hash(task) == blake.make_hash(task_record(1, 2))
+    assert blake.make_hash(task) != blake.make_hash(task_record(2, 1))
+    assert blake.make_hash(task) != Memoizer(None).make_hash(task)
+
+
+@pytest.mark.local
+def test_unknown_hash_algorithm():
+    with pytest.raises(ValueError):
+        Memoizer(None, hash_algorithm='no-such-hash')
+
+
+@pytest.mark.local
+def test_xxhash_missing():
+    try:
+        import xxhash  # noqa: F401
+    except ImportError:
+        with pytest.raises(OptionalModuleMissing):
+            Memoizer(None, hash_algorithm='xxhash')
+    else:
+        Memoizer(None, hash_algorithm='xxhash').make_hash(task_record(1))
+
+
+@pytest.mark.local
+def test_bytes():
+    assert id_for_memo(b'abc') == id_for_memo(bytearray(b'abc')) == id_for_memo(memoryview(b'abc'))
+    assert id_for_memo(b'abc') != id_for_memo(b'abd')
+    assert id_for_memo(b'abc') != id_for_memo('abc')
+
+
+@pytest.mark.local
+def test_ndarray():
+    np = pytest.importorskip("numpy")
+    a = np.arange(12)
+
+    assert id_for_memo(a) == id_for_memo(np.arange(12))
+    assert id_for_memo(a) != id_for_memo(a.reshape(3, 4))
+    assert id_for_memo(a) != id_for_memo(a.astype(np.float64))
+    assert id_for_memo(a.reshape(3, 4).T) == id_for_memo(np.ascontiguousarray(a.reshape(3, 4).T))
+
+    with pytest.raises(ValueError):
+        id_for_memo(np.array([object()]))
+
+
+@pytest.mark.local
+def test_file_id_cached():
+    f = File("file:///tmp/data.txt")
+    memo_id = id_for_memo(f)
+
+    assert pickle.loads(memo_id) == ["parsl.File", "file:///tmp/data.txt"]
+    assert id_for_memo(f) is memo_id
@@ -0,0 +1,56 @@
+from unittest import mock
+
+import pytest
+
+from parsl.executors import HighThroughputExecutor
+from parsl.jobs.states import JobState
+from parsl.providers import LocalProvider
+from parsl.providers.base import BulkSubmit
+
+
+class BulkLocalProvider(LocalProvider, BulkSubmit):
+    def submit_many(self, commands, tasks_per_node, job_name="parsl.auto"):
+        pass
+
+
+def make_executor():
+    provider = BulkLocalProvider()
+    provider.submit = mock.Mock(return_value='job')
+    provider.submit_many = mock.Mock(side_effect=lambda cmds, tasks_per_node, job_name: ['job-' + c for c in cmds])
+    htex = HighThroughputExecutor(provider=provider)
+    htex.launch_cmd = '{block_id}'
+    return htex
+
+
+@pytest.mark.local
+def test_scale_out_submits_blocks_together():
+    htex = make_executor()
+
+    assert htex.scale_out(3) == ['0', '1', '2']
+
+    htex.provider.submit.assert_not_called()
+    htex.provider.submit_many.assert_called_once_with(['0', '1', '2'], 1, 'parsl.HighThroughputExecutor.blocks-0-2')
+    assert htex.blocks == {'0': 'job-0', '1': 'job-1', '2': 'job-2'}
+    assert htex.block_mapping == {'job-0': '0', 'job-1': '1', 'job-2': '2'}
+
+
+@pytest.mark.local
+def test_scale_out_single_block():
+    htex = make_executor()
+
+    assert htex.scale_out(1) == ['0']
+
+    htex.provider.submit_many.assert_not_called()
+    htex.provider.submit.assert_called_once()
+
+
+@pytest.mark.local
+def test_failed_bulk_submit_fails_all_blocks():
+    htex = make_executor()
+    htex.provider.submit_many.side_effect = RuntimeError("sbatch failed")
+
+    assert htex.scale_out(2) == []
+
+    status = htex.status()
+    assert set(status) == {'0', '1'}
+    assert all(s.state == JobState.FAILED for s in status.values())
@@ -0,0 +1,117 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from parsl.jobs.job_status_poller import JobStatusPoller
+from parsl.jobs.states import JobState, JobStatus
+from parsl.utils import Timer
+
+
+def wait_for(condition):
+    deadline = time.time() + 10
+    while not condition():
+        assert time.time() < deadline
+        time.sleep(0.01)
+
+
+def make_provider(status):
+    provider = mock.Mock()
+    provider.status.side_effect = status
+    return provider
+
+
+def make_executor(label, provider, job_ids):
+    """Make an executor whose blocks are named after their jobs."""
+    executor = mock.Mock()
+    executor.label = label
+    executor.provider = provider
+    executor.status_polling_interval = 0.01
+    executor.status_job_ids.return_value = job_ids
+    executor.status_from_jobs.side_effect = lambda job_status: {job_id: job_status[job_id] for job_id in job_ids}
+    return executor
+
+
+def make_poller(executors):
+    poller = JobStatusPoller(strategy='none', max_idletime=0, strategy_period=0.2)
+    # Stop the timer thread, so that the test drives poll() itself
+    Timer.close(poller)
+    poller._strategy = mock.Mock()
+    poller.add_executors(executors)
+    return poller
+
+
+@pytest.mark.local
+def test_slow_status_query_does_not_block_other_executors():
+    release = threading.Event()
+
+    def slow_status(job_ids):
+        release.wait()
+        return [JobStatus(JobState.RUNNING)]
+
+    slow_provider = make_provider(slow_status)
+    fast_provider = make_provider(lambda job_ids: [JobStatus(JobState.PENDING)])
+    slow = make_executor('slow', slow_provider, ['1'])
+    fast = make_executor('fast', fast_provider, ['2'])
+
+    poller = make_poller([slow, fast])
+    slow_item, fast_item = poller._poll_items
+
+    try:
+        poller.poll()
+        # The poll returns without waiting for the queries, and strategizes
+        # once over all executors
+        poller._strategy.strategize.assert_called_once_with([slow_item, fast_item])
+        wait_for(lambda: fast_item in poller._results)
+
+        # The slow query is still running, so is not started again
+        time.sleep(0.02)
+        poller._strategy.reset_mock()
+        poller.poll()
+        assert fast_item.status['2'].state == JobState.PENDING
+        assert slow_item.status == {}
+        assert slow_provider.status.call_count == 1
+        wait_for(lambda: fast_provider.status.call_count == 2)
+        poller._strategy.strategize.assert_called_once_with([slow_item, fast_item])
+
+        release.set()
+        wait_for(lambda: slow_item in poller._results)
+        poller.poll()
+        assert slow_item.status['1'].state == JobState.RUNNING
+    finally:
+        release.set()
+        poller.close()
+
+
+@pytest.mark.local
+def test_executors_sharing_provider_queried_together():
+    release = threading.Event()
+
+    def status(job_ids):
+        release.wait()
+        return [JobStatus(JobState.RUNNING) for _ in job_ids]
+
+    provider = make_provider(status)
+    first = make_executor('first', provider, ['1', '2'])
+    second = make_executor('second', provider, ['3'])
+
+    poller = make_poller([first, second])
+    first_item, second_item = poller._poll_items
+
+    try:
+        poller.poll()
+        wait_for(lambda: provider.status.call_count == 1)
+        poller.poll()
+        assert len(poller._in_flight) == 1
+
+        release.set()
+        wait_for(lambda: not poller._in_flight)
+        provider.status.assert_called_once_with(['1', '2', '3'])
+
+        poller.poll()
+        assert set(first_item.status) == {'1', '2'}
+        assert set(second_item.status) == {'3'}
+    finally:
+        release.set()
+        poller.close()
@@ -0,0 +1,113 @@
+from unittest import mock
+
+import pytest
+
+from parsl.executors import HighThroughputExecutor
+from parsl.jobs.states import JobState, JobStatus
+from parsl.jobs.strategy import DemandModel, Strategy
+
+
+def make_status(**states):
+    return {block_id: JobStatus(state) for block_id, state in states.items()}
+
+
+@pytest.mark.local
+def test_demand_model_rates():
+    model = DemandModel(smoothing=1)
+    model.observe_tasks(0, {1, 2, 3})
+    model.observe_tasks(10, {3, 4, 5, 6, 7})
+
+    assert model.arrival_rate == 0.4
+    assert model.completion_rate == 0.2
+
+
+@pytest.mark.local
+def test_demand_model_startup_latency():
+    model = DemandModel(smoothing=0.5)
+    model.observe_blocks(0, make_status(a=JobState.PENDING))
+    model.observe_blocks(60, make_status(a=JobState.PENDING, b=JobState.PENDING))
+    model.observe_blocks(100, make_status(a=JobState.RUNNING, b=JobState.PENDING))
+    assert model.startup_latency == 100
+
+    model.observe_blocks(120, make_status(a=JobState.RUNNING, b=JobState.RUNNING))
+    assert model.startup_latency == 80
+
+    # blocks seen running without being seen pending do not give a latency
+    model.observe_blocks(130, make_status(c=JobState.RUNNING))
+    assert model.startup_latency == 80
+
+
+@pytest.mark.local
+def test_demand_model_forecast():
+    model = DemandModel(smoothing=1)
+    assert model.forecast(10) == 10
+
+    model.startup_latency = 100
+    model.arrival_rate = 0.5
+    model.completion_rate = 0.1
+    assert model.forecast(10) == 50
+
+    model.completion_rate = 1
+    assert model.forecast(10) == 0
+
+
+def make_poll_item(status, outstanding, task_ids=()):
+    executor = mock.Mock(spec=HighThroughputExecutor)
+    executor.label = 'htex'
+    executor.outstanding = outstanding
+    executor.tasks = {task_id: None for task_id in task_ids}
+    executor.workers_per_node = 4
+    executor.provider.init_blocks = 0
+    executor.provider.min_blocks = 0
+    executor.provider.max_blocks = 10
+    executor.provider.nodes_per_block = 1
+    executor.provider.parallelism = 1
+
+    poll_item = mock.Mock()
+    poll_item.executor = executor
+    poll_item.status = status
+    poll_item.first = False
+    return poll_item
+
+
+@pytest.mark.local
+def test_scale_out_for_forecast():
+    s = Strategy(strategy='predictive', max_idletime=60)
+    poll_item = make_poll_item(make_status(a=JobState.RUNNING), outstanding=4)
+    s.add_executors([poll_item.executor])
+    model = s.demand_models['htex']
+    model.startup_latency = 100
+    model.arrival_rate = 0.2
+
+    with mock.patch.object(model, 'observe_tasks'):
+        s.strategize([poll_item])
+
+    # 4 outstanding tasks plus 20 more expected by the time a new block
+    # starts needs 6 blocks of 4 workers.
+    poll_item.scale_out.assert_called_once_with(5)
+    poll_item.scale_in.assert_not_called()
+
+
+@pytest.mark.local
+def test_scale_in_gradually():
+    s = Strategy(strategy='predictive', max_idletime=60)
+    status = make_status(**{str(i): JobState.RUNNING for i in range(5)})
+    poll_item = make_poll_item(status, outstanding=4, task_ids=range(4))
+    s.add_executors([poll_item.executor])
+
+    s.strategize([poll_item])
+
+    poll_item.scale_out.assert_not_called()
+    poll_item.scale_in.assert_called_once_with(2, max_idletime=60)
+
+
+@pytest.mark.local
+def test_scale_in_when_idle():
+    s = Strategy(strategy='predictive', max_idletime=0)
+    poll_item = make_poll_item(make_status(a=JobState.RUNNING, b=JobState.RUNNING), outstanding=0)
+    s.add_executors([poll_item.executor])
+
+    s.strategize([poll_item])  # starts the idle timer
+    s.strategize([poll_item])
+
+    poll_item.scale_in.assert_called_once_with(2)
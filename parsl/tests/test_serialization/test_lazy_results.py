@@ -0,0 +1,65 @@
+import pickle
+from concurrent.futures import Future
+from unittest import mock
+
+import pytest
+
+from parsl.dataflow.dflow import DataFlowKernel
+from parsl.serialize import deserialize, serialize
+from parsl.serialize.lazy import LazyResultFuture, SerializedResult
+
+
+@pytest.mark.local
+def test_value_is_deserialized_once():
+    result = SerializedResult(serialize([1, 2, 3]))
+    assert not result.deserialized
+
+    with mock.patch('parsl.serialize.lazy.deserialize', wraps=deserialize) as d:
+        assert result.value() == [1, 2, 3]
+        assert result.value() == [1, 2, 3]
+    assert d.call_count == 1
+    assert result.deserialized
+
+
+@pytest.mark.local
+def test_pickle_round_trip():
+    result = SerializedResult(serialize({'a': 1}))
+    assert pickle.loads(pickle.dumps(result)) == {'a': 1}
+    assert not result.deserialized
+
+    result.value()
+    assert pickle.loads(pickle.dumps(result)) == {'a': 1}
+
+
+@pytest.mark.local
+def test_lazy_result_future():
+    fut = LazyResultFuture()
+    fut.set_result(SerializedResult(serialize(42)))
+
+    assert isinstance(fut.serialized_result(), SerializedResult)
+    assert fut.result() == 42
+
+    plain = LazyResultFuture()
+    plain.set_result(42)
+    assert plain.result() == 42
+    assert plain.serialized_result() == 42
+
+
+@pytest.mark.local
+def test_unwrap_futures_forwards_serialized_results():
+    lazy = LazyResultFuture()
+    lazy.set_result(SerializedResult(serialize('x')))
+    plain: Future = Future()
+    plain.set_result('y')
+
+    dfk = mock.Mock(spec=DataFlowKernel)
+    dfk._dependency_result = DataFlowKernel._dependency_result
+
+    args, kwargs, _ = DataFlowKernel._unwrap_futures(dfk, (lazy, plain), {'k': lazy}, forward_serialized=True)
+    assert isinstance(args[0], SerializedResult)
+    assert args[1] == 'y'
+    assert isinstance(kwargs['k'], SerializedResult)
+
+    args, kwargs, _ = DataFlowKernel._unwrap_futures(dfk, (lazy,), {'k': lazy})
+    assert args == ['x']
+    assert kwargs['k'] == 'x'
@@ -0,0 +1,49 @@
+import pytest
+
+from parsl.serialize import serialize, deserialize
+from parsl.serialize.buffers import pack_buffers, unpack_buffers
+from parsl.serialize.facade import unpack_and_deserialize
+
+
+@pytest.mark.local
+def test_pack_unpack_roundtrip():
+    buffers = [b'', b'abc', b'\n\n', bytes(range(256)) * 1000]
+
+    packed = pack_buffers(buffers)
+    unpacked = unpack_buffers(packed)
+
+    assert [bytes(b) for b in unpacked] == buffers
+
+
+@pytest.mark.local
+def test_unpack_does_not_copy():
+    packed = pack_buffers([b'x' * 1000, b'y' * 1000])
+    unpacked = unpack_buffers(packed)
+
+    for buf in unpacked:
+        assert isinstance(buf, memoryview)
+        assert buf.obj is packed
+
+
+@pytest.mark.local
+def test_unpack_truncated():
+    packed = pack_buffers([b'abcdef'])
+
+    with pytest.raises(ValueError):
+        unpack_buffers(packed[:-1])
+
+
+@pytest.mark.local
+def test_deserialize_memoryview():
+    payload = serialize({'a': list(range(10))})
+
+    assert deserialize(memoryview(payload)) == {'a': list(range(10))}
+
+
+@pytest.mark.local
+def test_unpack_and_deserialize():
+    args = (1, 'two')
+    kwargs = {'three': 3.0}
+    packed = pack_buffers([serialize(len), serialize(args), serialize(kwargs)])
+
+    assert unpack_and_deserialize(packed) == [len, args, kwargs]
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from parsl.data_provider.globus import TransferBatcher
+
+
+class FakeTransferClient:
+    """Completes each submitted transfer task on the poll after the one in
+    which it was first seen active, transferring its first file early."""
+
+    def __init__(self, fail_task=None):
+        self.fail_task = fail_task
+        self.submitted = []
+        self.polls = {}
+        self.lock = threading.Lock()
+
+    def submit_transfer(self, td):
+        with self.lock:
+            task_id = 'task{}'.format(len(self.submitted))
+            self.submitted.append(td)
+        return {'task_id': task_id}
+
+    def _items(self, task_id):
+        return self.submitted[int(task_id[len('task'):])]['DATA']
+
+    def get_task(self, task_id):
+        self.polls[task_id] = self.polls.get(task_id, 0) + 1
+        if task_id == self.fail_task:
+            return {'task_id': task_id, 'status': 'FAILED'}
+        if self.polls[task_id] == 1:
+            return {'task_id': task_id, 'status': 'ACTIVE', 'files_transferred': 1, 'nice_status': 'OK'}
+        return {'task_id': task_id, 'status': 'SUCCEEDED'}
+
+    def task_successful_transfers(self, task_id):
+        return [{'destination_path': self._items(task_id)[0]['destination_path']}]
+
+    def task_event_list(self, task_id):
+        class Events:
+            data = [{'details': 'permission denied'}]
+        return Events()
+
+
+@pytest.mark.local
+def test_transfers_batched_by_endpoints():
+    tc = FakeTransferClient()
+    batcher = TransferBatcher(lambda: tc, batch_window=0.2, poll_period=0.01)
+
+    futs = [batcher.transfer('src', 'dst', '/in/{}'.format(i), '/out/{}'.format(i)) for i in range(5)]
+    futs.append(batcher.transfer('src', 'dst', '/in/0', '/out/0'))
+    futs.append(batcher.transfer('dst', 'src', '/out/x', '/in/x'))
+
+    for fut in futs:
+        assert fut.result(timeout=10) is None
+
+    assert len(tc.submitted) == 2
+    by_endpoints = {(td['source_endpoint'], td['destination_endpoint']): td for td in tc.submitted}
+    assert len(by_endpoints['src', 'dst']['DATA']) == 5, "Duplicate requests should be transferred once"
+    assert len(by_endpoints['dst', 'src']['DATA']) == 1
+
+
+@pytest.mark.local
+def test_failed_transfer_fails_futures():
+    tc = FakeTransferClient(fail_task='task0')
+    batcher = TransferBatcher(lambda: tc, batch_window=0.2, poll_period=0.01)
+
+    futs = [batcher.transfer('src', 'dst', '/in/{}'.format(i), '/out/{}'.format(i)) for i in range(2)]
+    for fut in futs:
+        with pytest.raises(Exception, match='permission denied'):
+            fut.result(timeout=10)
+
+    # the poller thread stops once there is nothing to do, and is started
+    # again by later requests
+    assert batcher.transfer('src', 'dst', '/in/a', '/out/a').result(timeout=10) is None
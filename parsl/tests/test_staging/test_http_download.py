@@ -0,0 +1,114 @@
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from parsl.data_provider import http
+from parsl.data_provider.http import _http_download
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Serves the server's content, honouring range requests if the
+    server accepts them, and dropping the connection part way through a
+    response the first time each range end is requested if the server is
+    flaky."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.server.content)))
+        if self.server.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+
+    def do_GET(self):
+        content = self.server.content
+        start, end = 0, len(content)
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if match and self.server.ranges:
+            start = int(match.group(1))
+            if match.group(2):
+                end = int(match.group(2)) + 1
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(start, end - 1, len(content)))
+        else:
+            self.send_response(200)
+        if self.server.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start))
+        self.end_headers()
+
+        with self.server.lock:
+            self.server.requests.append((start, end))
+            drop = self.server.flaky and end not in self.server.dropped
+            self.server.dropped.add(end)
+        if drop:
+            self.wfile.write(content[start:(start + end) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(content[start:end])
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.content = os.urandom(1000)
+    httpd.ranges = True
+    httpd.flaky = False
+    httpd.lock = threading.Lock()
+    httpd.requests = []
+    httpd.dropped = set()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url(server):
+    return 'http://127.0.0.1:{}/file'.format(server.server_address[1])
+
+
+@pytest.mark.local
+def test_parallel_ranges(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(http, 'MIN_RANGE_SIZE', 100)
+    path = str(tmp_path / 'file')
+
+    _http_download(url(server), path, streams=4)
+
+    with open(path, 'rb') as f:
+        assert f.read() == server.content
+    assert sorted(server.requests) == [(0, 250), (250, 500), (500, 750), (750, 1000)]
+
+
+@pytest.mark.local
+def test_resume_after_dropped_connection(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(http, 'MIN_RANGE_SIZE', 100)
+    monkeypatch.setattr(http, 'CHUNK_SIZE', 50)
+    server.flaky = True
+    path = str(tmp_path / 'file')
+
+    _http_download(url(server), path, streams=2)
+
+    with open(path, 'rb') as f:
+        assert f.read() == server.content
+    # each range is resumed from where its first response stopped
+    assert sorted(server.requests) == [(0, 500), (250, 500), (500, 1000), (750, 1000)]
+
+
+@pytest.mark.local
+def test_restart_without_range_support(server, tmp_path):
+    server.ranges = False
+    server.flaky = True
+    path = str(tmp_path / 'file')
+
+    _http_download(url(server), path, streams=4)
+
+    with open(path, 'rb') as f:
+        assert f.read() == server.content
+    assert server.requests == [(0, 1000), (0, 1000)]
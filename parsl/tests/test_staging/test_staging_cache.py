@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from parsl.data_provider.staging_cache import StagingCache
+
+
+class Fetcher:
+    def __init__(self, content=b'content', delay=0.0):
+        self.content = content
+        self.delay = delay
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, path):
+        with self.lock:
+            self.count += 1
+        time.sleep(self.delay)
+        with open(path, 'wb') as f:
+            f.write(self.content)
+
+
+@pytest.mark.local
+def test_downloads_once(tmp_path):
+    cache = StagingCache(cache_dir=str(tmp_path / 'cache'))
+    fetch = Fetcher()
+
+    for i in range(3):
+        dest = tmp_path / 'file{}'.format(i)
+        cache.stage('http://example.com/file', str(dest), fetch, {'etag': 'a', 'size': 7})
+        assert dest.read_bytes() == b'content'
+
+    assert fetch.count == 1
+
+
+@pytest.mark.local
+def test_changed_validator_downloads_again(tmp_path):
+    cache = StagingCache(cache_dir=str(tmp_path / 'cache'))
+    dest = str(tmp_path / 'file')
+
+    cache.stage('http://example.com/file', dest, Fetcher(b'old'), {'etag': 'a', 'size': 3})
+    new = Fetcher(b'newer')
+    cache.stage('http://example.com/file', dest, new, {'etag': 'b', 'size': 5})
+
+    assert new.count == 1
+    with open(dest, 'rb') as f:
+        assert f.read() == b'newer'
+
+    # without a validator, any cached copy is used
+    cache.stage('http://example.com/file', dest, new, None)
+    assert new.count == 1
+
+
+@pytest.mark.local
+def test_short_download_is_not_cached(tmp_path):
+    cache = StagingCache(cache_dir=str(tmp_path / 'cache'))
+    dest = str(tmp_path / 'file')
+
+    with pytest.raises(IOError):
+        cache.stage('http://example.com/file', dest, Fetcher(b'trunc'), {'etag': 'a', 'size': 100})
+
+    fetch = Fetcher(b'x' * 100)
+    cache.stage('http://example.com/file', dest, fetch, {'etag': 'a', 'size': 100})
+    assert fetch.count == 1
+
+
+@pytest.mark.local
+def test_concurrent_stages_download_once(tmp_path):
+    cache = StagingCache(cache_dir=str(tmp_path / 'cache'))
+    fetch = Fetcher(delay=0.2)
+
+    threads = [threading.Thread(target=cache.stage,
+                                args=('http://example.com/file', str(tmp_path / 'file{}'.format(i)), fetch))
+               for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert fetch.count == 1
+    for i in range(8):
+        assert (tmp_path / 'file{}'.format(i)).read_bytes() == b'content'
+
+
+@pytest.mark.local
+def test_least_recently_used_evicted(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    cache = StagingCache(cache_dir=str(cache_dir), max_size=25)
+    dest = str(tmp_path / 'file')
+
+    for name in ['a', 'b']:
+        cache.stage('http://example.com/' + name, dest, Fetcher(b'x' * 10))
+    # use a again, so that b is the least recently used
+    time.sleep(0.01)
+    cache.stage('http://example.com/a', dest, Fetcher(b'x' * 10))
+    time.sleep(0.01)
+    cache.stage('http://example.com/c', dest, Fetcher(b'x' * 10))
+
+    fetch_a, fetch_b = Fetcher(b'x' * 10), Fetcher(b'x' * 10)
+    cache.stage('http://example.com/a', dest, fetch_a)
+    assert fetch_a.count == 0
+    cache.stage('http://example.com/b', dest, fetch_b)
+    assert fetch_b.count == 1
+
+    cached = [n for n in os.listdir(cache_dir) if n.endswith('.json')]
+    assert len(cached) == 2
+
+
+@pytest.mark.local
+def test_http_in_task_staging_uses_cache(tmp_path):
+    from parsl.data_provider.files import File
+    from parsl.data_provider.http import in_task_transfer_wrapper
+
+    file = File('http://example.com/data.txt')
+    file.local_path = str(tmp_path / 'data.txt')
+    cache = StagingCache(cache_dir=str(tmp_path / 'cache'))
+
+    with mock.patch('parsl.data_provider.http._get_session') as get_session:
+        session = get_session.return_value
+        session.head.return_value.headers = {'ETag': '"1"', 'Content-Length': '4'}
+        session.get.return_value.__enter__.return_value.iter_content.return_value = [b'da', b'ta']
+
+        wrapped = in_task_transfer_wrapper(lambda: open(file.local_path).read(), [file], None, cache)
+        assert wrapped() == 'data'
+        assert wrapped() == 'data'
+
+    assert session.get.call_count == 1
+    assert session.head.call_count == 2
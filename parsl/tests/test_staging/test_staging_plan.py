@@ -0,0 +1,57 @@
+import pytest
+
+import parsl
+from parsl.config import Config
+from parsl.data_provider.file_noop import NoOpFileStaging
+from parsl.data_provider.files import File
+from parsl.data_provider.staging import Staging
+from parsl.executors import ThreadPoolExecutor
+
+
+class CountingStaging(Staging):
+    """Accepts sp3: files, counting how often it is asked, and wraps each
+    task once for all of its sp3: files."""
+
+    def __init__(self):
+        self.checks = 0
+        self.wrapped = []
+
+    def can_stage_in(self, file):
+        self.checks += 1
+        return file.scheme == 'sp3'
+
+    def replace_task_many(self, dm, executor, files, func):
+        self.wrapped.append([f.url for f in files])
+
+        def wrapper(*args, **kwargs):
+            return (len(files), func(*args, **kwargs))
+        return wrapper
+
+
+provider = CountingStaging()
+
+
+def local_config():
+    return Config(executors=[ThreadPoolExecutor(storage_access=[provider, NoOpFileStaging()])])
+
+
+@parsl.python_app
+def count_inputs(f, inputs=[], g=None):
+    return len(inputs)
+
+
+@pytest.mark.local
+def test_task_wrapped_once_for_all_files():
+    provider.checks = 0
+    provider.wrapped = []
+
+    inputs = [File('sp3://host/{}'.format(i)) for i in range(10)]
+    fut = count_inputs(File('sp3://host/arg'), inputs=inputs, g=File('sp3://other/kwarg'))
+
+    assert fut.result() == (12, 10)
+    assert provider.wrapped == [['sp3://host/{}'.format(i) for i in range(10)] + ['sp3://other/kwarg', 'sp3://host/arg']]
+    # one check for each network location
+    assert provider.checks == 2
+
+    count_inputs(File('sp3://host/arg'), inputs=inputs).result()
+    assert provider.checks == 2
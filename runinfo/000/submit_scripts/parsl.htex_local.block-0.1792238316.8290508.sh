@@ -0,0 +1,3 @@
+
+export JOBNAME=$parsl.htex_local.block-0.1792238316.8290508
+process_worker_pool.py --debug  -a 127.0.0.1 -p 0 -c 1 -m None --poll 10 --task_port=54348 --result_port=54914 --cert_dir /root/package/runinfo/000/htex_local/certificates --logdir=/root/package/.pytest/parsltest-current/test_one_block-dvx97flt/htex_local --block_id=0 --hb_period=30  --hb_threshold=120 --drain_period=None --cpu-affinity none  --mpi-launcher=mpiexec --mpi_slots_per_node=None --function_cache_size=128 --result_cache_dir=None --result_cache_size=1073741824 --shm_threshold=1048576 --available-accelerators 
\ No newline at end of file